@@ -0,0 +1,392 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+
+# プロジェクトのルートディレクトリ
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# src パッケージをインポートできるよう、プロジェクトのルートディレクトリをパスに追加する
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.profiling import PhaseProfiler
+from src.generate_sample_data import COUNTRY_DISTRIBUTIONS
+from src.count_by_country import (
+    read_country_column,
+    aggregate_country_column,
+    scan_country_counts,
+    resolve_country_names,
+    rollup_country_counts,
+    CountResult,
+    render_text
+)
+
+# サンプルデータの生成スクリプト
+GENERATE_SCRIPT = os.path.join(PROJECT_ROOT, "src", "generate_sample_data.py")
+
+# 計測する行数の組み合わせ
+SCALES = {
+    'small': [10 ** 4, 10 ** 6],
+    'full': [10 ** 4, 10 ** 6, 10 ** 7, 10 ** 8],
+}
+
+# デフォルトのフィクスチャの保存先と計測結果の出力先
+DEFAULT_FIXTURES_DIR = os.path.join(PROJECT_ROOT, ".cache", "benchmarks")
+DEFAULT_OUTPUT = os.path.join(PROJECT_ROOT, ".cache", "benchmarks", "results.json")
+
+# この行数を超えるフィクスチャは、全体をDataFrameに読み込まずにチャンク単位で集計する
+# （読み込みと国別集計は分けずに scan として計測する）
+STAGED_MAX_ROWS = 10 ** 7
+SCAN_CHUNKSIZE = 10 ** 6
+
+# 比較時に無視する差（これより小さい処理時間・メモリ使用量の差は誤差とみなす）
+DEFAULT_MIN_SECONDS = 0.005
+MIN_MEMORY_BYTES = 4 * 1024 * 1024
+
+def get_fixture_path(fixtures_dir, rows, distribution):
+    """
+    フィクスチャのCSVファイルのパスを取得する
+    
+    Args:
+        fixtures_dir: フィクスチャの保存先
+        rows: 行数
+        distribution: 国の分布
+    
+    Returns:
+        str: フィクスチャのパス
+    """
+    return os.path.join(fixtures_dir, f"{distribution}-{rows}.csv")
+
+def generate_fixture(file_path, rows, distribution):
+    """
+    サンプルデータの生成スクリプトでフィクスチャを生成し、生成の計測結果を取得する
+    
+    Args:
+        file_path: 生成するCSVファイルのパス
+        rows: 行数
+        distribution: 国の分布
+    
+    Returns:
+        dict: 生成の計測結果（PhaseRecord.to_dict() の形式）
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        profile_path = os.path.join(temp_dir, "profile.jsonl")
+        command = [sys.executable, GENERATE_SCRIPT, "--rows", str(rows), "--output", file_path, "--seed", "0",
+                   "--country-distribution", distribution, "--profile", profile_path]
+        subprocess.run(command, capture_output=True, text=True, cwd=PROJECT_ROOT, check=True)
+        with open(profile_path, "r", encoding="utf-8") as f:
+            report = json.loads(f.readline())
+    return report['phases'][0]
+
+def measure_stages(file_path, chunksize=None, trace_memory=False):
+    """
+    1つのフィクスチャについて、集計の各段階の処理時間とメモリ使用量を計測する
+    
+    各段階は count_by_country と同じ関数で処理し、表示は標準出力の代わりに文字列に変換する。
+    pandas と NumPy のインポートは最初の段階に含めず、import として計測する。
+    
+    Args:
+        file_path: フィクスチャのパス
+        chunksize: 指定した場合は読み込みと国別集計をチャンク単位でまとめて行い、scan として計測する
+        trace_memory: Trueの場合は tracemalloc によるピークメモリも計測する
+    
+    Returns:
+        dict: PhaseProfiler.report() の計測結果
+    """
+    profiler = PhaseProfiler('pipeline_benchmark', trace_memory=trace_memory)
+    with profiler.phase('import'):
+        # count_by_country は pandas と NumPy を初回の使用時にインポートする
+        import numpy
+        import pandas
+    if chunksize:
+        with profiler.phase('scan') as phase:
+            country_counts = scan_country_counts(file_path, chunksize)
+            phase.rows = int(country_counts.sum())
+    else:
+        with profiler.phase('read') as phase:
+            df = read_country_column(file_path)
+            phase.rows = len(df)
+        with profiler.phase('country_agg', rows=len(df)):
+            country_counts = aggregate_country_column(df)
+        del df
+    rows = int(country_counts.sum())
+    
+    with profiler.phase('region_agg'):
+        country_counts = resolve_country_names(country_counts)
+        region_counts = rollup_country_counts(country_counts)
+    with profiler.phase('ordering'):
+        result = CountResult(country_counts, region_counts)
+    with profiler.phase('display'):
+        render_text(result)
+    return profiler.report(rows=rows)
+
+def run_measure(file_path, chunksize=None, trace_memory=False):
+    """
+    別プロセスで集計の各段階を計測する（フィクスチャごとにメモリ使用量を独立して計測するため）
+    
+    Args:
+        file_path: フィクスチャのパス
+        chunksize: チャンク単位で集計する場合の1チャンクあたりの行数
+        trace_memory: Trueの場合は tracemalloc によるピークメモリも計測する
+    
+    Returns:
+        dict: measure_stages() の計測結果
+    """
+    command = [sys.executable, os.path.abspath(__file__), "measure", file_path]
+    if chunksize:
+        command += ["--chunksize", str(chunksize)]
+    if trace_memory:
+        command.append("--trace-memory")
+    result = subprocess.run(command, capture_output=True, text=True, cwd=PROJECT_ROOT, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+def make_entry(rows, distribution, phase):
+    """
+    計測結果の1段階分を、ベースラインの1件の形式に変換する
+    
+    Args:
+        rows: フィクスチャの行数
+        distribution: 国の分布
+        phase: PhaseRecord.to_dict() の計測結果
+    
+    Returns:
+        dict: ベースラインの1件
+    """
+    entry = {
+        'rows': rows,
+        'distribution': distribution,
+        'stage': phase['name'],
+        'seconds': phase['wall_seconds'],
+        'cpu_seconds': phase['cpu_seconds'],
+        'peak_rss_bytes': phase['peak_rss_bytes'],
+        'rss_growth_bytes': phase.get('rss_growth_bytes'),
+    }
+    if phase.get('rows'):
+        entry['rows_per_sec'] = round(phase['rows'] / phase['wall_seconds'], 1) if phase['wall_seconds'] > 0 else None
+    if 'tracemalloc_peak_bytes' in phase:
+        entry['tracemalloc_peak_bytes'] = phase['tracemalloc_peak_bytes']
+    return entry
+
+def merge_repeats(reports):
+    """
+    繰り返し計測した結果を段階ごとにまとめる（処理時間は最小値、メモリ使用量は最大値）
+    
+    Args:
+        reports: measure_stages() の計測結果のリスト
+    
+    Returns:
+        list: 段階ごとの計測結果（PhaseRecord.to_dict() の形式）
+    """
+    merged = {}
+    for report in reports:
+        for phase in report['phases']:
+            best = merged.setdefault(phase['name'], dict(phase))
+            if phase['wall_seconds'] < best['wall_seconds']:
+                best.update(wall_seconds=phase['wall_seconds'], cpu_seconds=phase['cpu_seconds'])
+            for key in ('peak_rss_bytes', 'rss_growth_bytes', 'tracemalloc_peak_bytes'):
+                if phase.get(key) is not None:
+                    best[key] = max(best.get(key) or 0, phase[key])
+    return list(merged.values())
+
+def run_suite(sizes, distributions, fixtures_dir=DEFAULT_FIXTURES_DIR, repeat=3, regenerate=False,
+              trace_memory=False):
+    """
+    行数と国の分布の組み合わせごとに、フィクスチャの生成と集計の各段階を計測する
+    
+    Args:
+        sizes: 行数のリスト
+        distributions: 国の分布のリスト
+        fixtures_dir: フィクスチャの保存先（既存のフィクスチャは再利用する）
+        repeat: 集計の各段階を計測する回数
+        regenerate: Trueの場合は既存のフィクスチャも生成し直す
+        trace_memory: Trueの場合は tracemalloc によるピークメモリも計測する
+    
+    Returns:
+        dict: ベースライン（環境の情報と計測結果のリスト）
+    """
+    os.makedirs(fixtures_dir, exist_ok=True)
+    results = []
+    for rows in sizes:
+        for distribution in distributions:
+            file_path = get_fixture_path(fixtures_dir, rows, distribution)
+            
+            # 生成の計測は、フィクスチャを生成した場合のみ行う
+            if regenerate or not os.path.exists(file_path):
+                results.append(make_entry(rows, distribution, generate_fixture(file_path, rows, distribution)))
+            
+            chunksize = SCAN_CHUNKSIZE if rows > STAGED_MAX_ROWS else None
+            reports = [run_measure(file_path, chunksize, trace_memory) for _ in range(repeat)]
+            results.extend(make_entry(rows, distribution, phase) for phase in merge_repeats(reports))
+            print(f"{rows:,}行 ({distribution}) を計測しました", file=sys.stderr)
+    
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+def compare_results(baseline, current, threshold=0.1, min_seconds=DEFAULT_MIN_SECONDS):
+    """
+    ベースラインと今回の計測結果を比較し、処理時間またはメモリ使用量の劣化を検出する
+    
+    ピークRSSはプロセス開始時からの累積の最大値のため、後の段階に前の段階の増加が含まれる。
+    メモリ使用量は段階ごとのピークRSSの増加量（rss_growth_bytes）で比較する。
+    
+    Args:
+        baseline: ベースライン（run_suite() の戻り値）
+        current: 今回の計測結果（run_suite() の戻り値）
+        threshold: 劣化とみなす増加率（0.1 の場合は10%を超えて増加した場合）
+        min_seconds: これより短い処理時間の差は誤差とみなす
+    
+    Returns:
+        list: 両方に含まれる段階ごとの比較結果
+              {'rows', 'distribution', 'stage', 'baseline_seconds', 'current_seconds', 'time_ratio',
+               'baseline_rss_growth_bytes', 'current_rss_growth_bytes', 'regressions'}
+    """
+    baseline_entries = {(entry['rows'], entry['distribution'], entry['stage']): entry
+                        for entry in baseline['results']}
+    comparisons = []
+    for entry in current['results']:
+        key = (entry['rows'], entry['distribution'], entry['stage'])
+        base = baseline_entries.get(key)
+        if base is None:
+            continue
+        
+        regressions = []
+        time_ratio = entry['seconds'] / base['seconds'] if base['seconds'] > 0 else None
+        if entry['seconds'] - base['seconds'] > max(min_seconds, base['seconds'] * threshold):
+            regressions.append('time')
+        base_rss, current_rss = base.get('rss_growth_bytes'), entry.get('rss_growth_bytes')
+        if base_rss is not None and current_rss is not None and \
+                current_rss - base_rss > max(MIN_MEMORY_BYTES, base_rss * threshold):
+            regressions.append('memory')
+        
+        comparisons.append({
+            'rows': key[0],
+            'distribution': key[1],
+            'stage': key[2],
+            'baseline_seconds': base['seconds'],
+            'current_seconds': entry['seconds'],
+            'time_ratio': time_ratio,
+            'baseline_rss_growth_bytes': base_rss,
+            'current_rss_growth_bytes': current_rss,
+            'regressions': regressions,
+        })
+    return comparisons
+
+def format_comparison(comparison):
+    """
+    比較結果を1行の文字列にする
+    
+    Args:
+        comparison: compare_results() の比較結果の1件
+    
+    Returns:
+        str: 表示用の文字列
+    """
+    ratio = comparison['time_ratio']
+    change = f"{ratio - 1:+.1%}" if ratio is not None else "-"
+    rss = ""
+    if comparison['baseline_rss_growth_bytes'] is not None and comparison['current_rss_growth_bytes'] is not None:
+        rss = (f"  RSS増加 {comparison['baseline_rss_growth_bytes'] / 2 ** 20:.0f}MiB -> "
+               f"{comparison['current_rss_growth_bytes'] / 2 ** 20:.0f}MiB")
+    mark = f"  劣化: {', '.join(comparison['regressions'])}" if comparison['regressions'] else ""
+    return (f"{comparison['rows']:>12,} {comparison['distribution']:<8} {comparison['stage']:<12} "
+            f"{comparison['baseline_seconds']:.4f}s -> {comparison['current_seconds']:.4f}s ({change}){rss}{mark}")
+
+def load_results(file_path):
+    """
+    JSON形式の計測結果を読み込む
+    
+    Args:
+        file_path: 計測結果のファイルパス
+    
+    Returns:
+        dict: 計測結果
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_results(results, file_path):
+    """
+    計測結果をJSON形式で保存する
+    
+    Args:
+        results: 計測結果
+        file_path: 保存先のファイルパス
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='サンプルデータの生成と国別・地域別集計の各段階の性能を計測します。')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    run_parser = subparsers.add_parser('run', help='フィクスチャを生成して各段階を計測し、JSON形式で保存する')
+    run_parser.add_argument('--scale', type=str, choices=list(SCALES), default='small',
+                            help='計測する行数の組み合わせ (small: 1万・100万行, full: 1万〜1億行) (デフォルト: small)')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=None,
+                            help='計測する行数（指定した場合は --scale より優先する）')
+    run_parser.add_argument('--distributions', type=str, nargs='+', choices=COUNTRY_DISTRIBUTIONS,
+                            default=COUNTRY_DISTRIBUTIONS, help='国の分布 (デフォルト: uniform skewed)')
+    run_parser.add_argument('--repeat', type=int, default=3,
+                            help='各段階を計測する回数（処理時間は最小値を使用する） (デフォルト: 3)')
+    run_parser.add_argument('--fixtures-dir', type=str, default=DEFAULT_FIXTURES_DIR,
+                            help='フィクスチャの保存先 (デフォルト: .cache/benchmarks)')
+    run_parser.add_argument('--regenerate', action='store_true',
+                            help='既存のフィクスチャも生成し直す（生成の計測は生成した場合のみ行う）')
+    run_parser.add_argument('--trace-memory', action='store_true',
+                            help='tracemalloc によるPythonオブジェクトのピークメモリも計測する')
+    run_parser.add_argument('--output', type=str, default=DEFAULT_OUTPUT,
+                            help='計測結果の保存先 (デフォルト: .cache/benchmarks/results.json)')
+    
+    measure_parser = subparsers.add_parser('measure', help='1つのCSVファイルについて集計の各段階を計測する')
+    measure_parser.add_argument('file', type=str, help='計測するCSVファイル')
+    measure_parser.add_argument('--chunksize', type=int, default=None,
+                                help='チャンク単位で読み込んで集計する場合の1チャンクあたりの行数')
+    measure_parser.add_argument('--trace-memory', action='store_true',
+                                help='tracemalloc によるPythonオブジェクトのピークメモリも計測する')
+    
+    compare_parser = subparsers.add_parser('compare', help='ベースラインと計測結果を比較し、劣化があれば終了コード1で終了する')
+    compare_parser.add_argument('baseline', type=str, help='ベースラインの計測結果')
+    compare_parser.add_argument('current', type=str, help='今回の計測結果')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help='劣化とみなす増加率 (デフォルト: 0.1)')
+    compare_parser.add_argument('--min-seconds', type=float, default=DEFAULT_MIN_SECONDS,
+                                help='誤差とみなす処理時間の差（秒） (デフォルト: 0.005)')
+    args = parser.parse_args()
+    
+    if args.command == 'run':
+        results = run_suite(args.sizes or SCALES[args.scale], args.distributions, args.fixtures_dir,
+                            args.repeat, args.regenerate, args.trace_memory)
+        save_results(results, args.output)
+        for entry in results['results']:
+            throughput = f"  {entry['rows_per_sec']:,.0f}行/秒" if entry.get('rows_per_sec') else ""
+            growth = f" (+{entry['rss_growth_bytes'] / 2 ** 20:.0f}MiB)" if entry.get('rss_growth_bytes') is not None else ""
+            print(f"{entry['rows']:>12,} {entry['distribution']:<8} {entry['stage']:<12} "
+                  f"{entry['seconds']:.4f}s  累積ピークRSS {entry['peak_rss_bytes'] / 2 ** 20:.0f}MiB{growth}{throughput}")
+        print(f"計測結果を {args.output} に保存しました")
+    elif args.command == 'measure':
+        print(json.dumps(measure_stages(args.file, args.chunksize, args.trace_memory), ensure_ascii=False))
+    else:
+        comparisons = compare_results(load_results(args.baseline), load_results(args.current),
+                                      args.threshold, args.min_seconds)
+        for comparison in comparisons:
+            print(format_comparison(comparison))
+        regressions = [comparison for comparison in comparisons if comparison['regressions']]
+        if regressions:
+            print(f"エラー: {len(regressions)}件の段階で性能が劣化しています（閾値: {args.threshold:.0%}）")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import sys
+import csv
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+# プロジェクトのルートディレクトリ
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 計測対象のスクリプト
+COUNT_SCRIPT = os.path.join(PROJECT_ROOT, "src", "count_by_country.py")
+
+# 小さなファイルの集計時にインポートされてはならないモジュール
+HEAVY_MODULES = ["pandas", "numpy"]
+
+def write_small_csv(file_path, num_rows=1000):
+    """
+    計測用の小さなCSVファイルを作成する
+    
+    Args:
+        file_path: 作成するCSVファイルのパス
+        num_rows: 行数
+    """
+    countries = ["日本", "アメリカ", "ドイツ", "インド", "カナダ"]
+    with open(file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ID", "名前", "年齢", "国", "スコア"])
+        for i in range(1, num_rows + 1):
+            writer.writerow([i, "太郎", 18 + i % 43, countries[i % len(countries)], i % 100])
+
+def run_once(file_path, extra_args=()):
+    """
+    集計スクリプトを1回実行し、実行時間とインポートされたモジュールを取得する
+    
+    Args:
+        file_path: 集計するCSVファイルのパス
+        extra_args: スクリプトに渡す追加の引数
+    
+    Returns:
+        tuple: (実行時間（秒）, インポートされたモジュール名の集合)
+    """
+    command = [sys.executable, "-X", "importtime", COUNT_SCRIPT, file_path, "--no-cache", *extra_args]
+    start = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True, cwd=PROJECT_ROOT, check=True)
+    elapsed = time.perf_counter() - start
+    
+    # -X importtime の出力（「import time: 自身 | 累積 | モジュール名」）からモジュール名を取り出す
+    modules = set()
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+\d+ \|\s*(\S+)", line)
+        if match:
+            modules.add(match.group(1))
+    return elapsed, modules
+
+def run_benchmark(runs=10, extra_args=()):
+    """
+    小さなCSVファイルの集計を繰り返し実行し、起動を含む実行時間を計測する
+    
+    Args:
+        runs: 実行回数
+        extra_args: スクリプトに渡す追加の引数
+    
+    Returns:
+        dict: {'median': 中央値（秒）, 'min': 最小値（秒）, 'heavy_modules': インポートされた重いモジュール}
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "small.csv")
+        write_small_csv(file_path)
+        
+        timings = []
+        heavy_modules = set()
+        for _ in range(runs):
+            elapsed, modules = run_once(file_path, extra_args)
+            timings.append(elapsed)
+            heavy_modules |= {name for name in HEAVY_MODULES if name in modules}
+    
+    return {'median': statistics.median(timings), 'min': min(timings), 'heavy_modules': sorted(heavy_modules)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='小さなCSVファイルを集計する場合の起動時間を計測します。')
+    parser.add_argument('--runs', type=int, default=10,
+                        help='実行回数 (デフォルト: 10)')
+    parser.add_argument('--max-seconds', type=float, default=None,
+                        help='実行時間の中央値の上限（秒）。超えた場合は終了コード1で終了する')
+    parser.add_argument('--compare-pandas', action='store_true',
+                        help='pandas による集計（--light-max-bytes 0）の実行時間も計測して比較する')
+    args = parser.parse_args()
+    
+    result = run_benchmark(args.runs)
+    print(f"軽量モード: 中央値 {result['median'] * 1000:.1f}ms / 最小 {result['min'] * 1000:.1f}ms")
+    if args.compare_pandas:
+        pandas_result = run_benchmark(args.runs, ["--light-max-bytes", "0"])
+        print(f"pandas   : 中央値 {pandas_result['median'] * 1000:.1f}ms / 最小 {pandas_result['min'] * 1000:.1f}ms")
+    
+    failed = False
+    if result['heavy_modules']:
+        print(f"エラー: 小さなファイルの集計で {', '.join(result['heavy_modules'])} がインポートされています")
+        failed = True
+    if args.max_seconds is not None and result['median'] > args.max_seconds:
+        print(f"エラー: 実行時間の中央値が上限（{args.max_seconds}秒）を超えています")
+        failed = True
+    sys.exit(1 if failed else 0)
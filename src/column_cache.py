@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+
+try:
+    from src.lazy_import import LazyModule
+except ImportError:
+    # スクリプトとして直接実行された場合
+    from lazy_import import LazyModule
+
+# 起動時間を短縮するため、NumPy と pandas は使用する時点でインポートする
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# 列キャッシュを作成する際の1チャンクあたりの行数
+DEFAULT_CHUNKSIZE = 1000000
+
+# 符号配列の変換時に一度に処理する要素数
+COPY_BLOCK_SIZE = 16 * 1024 * 1024
+
+def get_cache_paths(file_path, column):
+    """
+    列キャッシュ（辞書ファイルと符号配列ファイル）のパスを取得する
+    
+    キャッシュは元のCSVファイルと同じディレクトリに
+    「<ファイル名>.<カラム名>.dict.json」「<ファイル名>.<カラム名>.codes.npy」として保存する。
+    
+    Args:
+        file_path: 元のCSVファイルのパス
+        column: カラム名
+    
+    Returns:
+        tuple: (辞書ファイルのパス, 符号配列ファイルのパス)
+    """
+    return f"{file_path}.{column}.dict.json", f"{file_path}.{column}.codes.npy"
+
+def get_source_signature(file_path):
+    """
+    キャッシュの有効性を判定するための、元ファイルのサイズと更新日時を取得する
+    
+    Args:
+        file_path: 元のCSVファイルのパス
+    
+    Returns:
+        dict: {'size': サイズ, 'mtime_ns': 更新日時（ナノ秒）}
+    """
+    stat = os.stat(file_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def select_code_dtype(num_values):
+    """
+    辞書の要素数（と欠損値を表す符号1つ）を表現できる最小の符号なし整数型を選ぶ
+    
+    Args:
+        num_values: 辞書の要素数
+    
+    Returns:
+        np.dtype: 符号配列の型
+    """
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if num_values < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+def load_column_codes(file_path, column):
+    """
+    有効な列キャッシュがあれば、辞書と符号配列（メモリマップ）を読み込む
+    
+    元のCSVファイルのサイズまたは更新日時がキャッシュ作成時と異なる場合は無効とする。
+    
+    Args:
+        file_path: 元のCSVファイルのパス
+        column: カラム名
+    
+    Returns:
+        tuple: (辞書のリスト, 符号配列) 有効なキャッシュがない場合はNone
+               符号が辞書の要素数と等しい行は欠損値を表す
+    """
+    dict_path, codes_path = get_cache_paths(file_path, column)
+    try:
+        with open(dict_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('source') != get_source_signature(file_path):
+            return None
+        codes = np.load(codes_path, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    
+    if len(codes) != meta.get('num_rows'):
+        return None
+    return meta['dictionary'], codes
+
+def count_column_codes(dictionary, codes, block_size=COPY_BLOCK_SIZE):
+    """
+    符号配列を bincount で数え、値ごとの件数を求める
+    
+    Args:
+        dictionary: 辞書のリスト
+        codes: 符号配列
+        block_size: 一度に数える要素数
+    
+    Returns:
+        pd.Series: 値ごとの件数（欠損値と件数0の値は除く、件数の降順）
+    """
+    counts = np.zeros(len(dictionary) + 1, dtype=np.int64)
+    for start in range(0, len(codes), block_size):
+        counts += np.bincount(codes[start:start + block_size], minlength=len(dictionary) + 1)
+    
+    # 末尾の要素は欠損値の件数
+    result = pd.Series(counts[:-1], index=dictionary, dtype='int64')
+    return result[result > 0].sort_values(ascending=False, kind='stable')
+
+def write_codes_npy(codes_path, raw_path, num_rows, dtype, block_size=COPY_BLOCK_SIZE):
+    """
+    一時ファイルに書き出した符号（int64）を、指定した型の .npy ファイルに変換する
+    
+    Args:
+        codes_path: 出力する .npy ファイルのパス
+        raw_path: 符号を書き出した一時ファイルのパス
+        num_rows: 符号の数
+        dtype: 出力する符号の型
+        block_size: 一度に変換する要素数
+    """
+    output = np.lib.format.open_memmap(codes_path, mode='w+', dtype=dtype, shape=(num_rows,))
+    if num_rows:
+        raw_codes = np.memmap(raw_path, dtype=np.int64, mode='r', shape=(num_rows,))
+        for start in range(0, num_rows, block_size):
+            output[start:start + block_size] = raw_codes[start:start + block_size]
+        del raw_codes
+    output.flush()
+    del output
+
+def build_column_cache(file_path, columns, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    CSVファイルを1回走査して、指定したカラムの列キャッシュを作成する
+    
+    各カラムの値を出現順に辞書へ登録し、行ごとの値を辞書の番号（符号）に置き換えて
+    .npy 形式で保存する。欠損値は辞書の要素数と等しい符号で表す。
+    
+    Args:
+        file_path: 元のCSVファイルのパス
+        columns: キャッシュするカラム名のリスト
+        chunksize: 1チャンクあたりの行数
+    
+    Returns:
+        dict: {カラム名: (辞書のリスト, 符号配列)}
+    """
+    source = get_source_signature(file_path)
+    dictionaries = {column: {} for column in columns}
+    raw_paths = {column: f"{get_cache_paths(file_path, column)[1]}.{os.getpid()}.tmp" for column in columns}
+    raw_files = {column: open(raw_paths[column], 'wb') for column in columns}
+    num_rows = 0
+    
+    try:
+        # 値はチャンクごとに型が変わらないよう、すべて文字列として読み込む
+        for chunk in pd.read_csv(file_path, usecols=columns, dtype=str, chunksize=chunksize):
+            for column in columns:
+                dictionary = dictionaries[column]
+                
+                # チャンク内の値を番号に置き換え、値の種類ごとに辞書の番号へ対応付ける
+                local_codes, uniques = pd.factorize(chunk[column])
+                mapping = np.empty(len(uniques) + 1, dtype=np.int64)
+                for index, value in enumerate(uniques):
+                    mapping[index] = dictionary.setdefault(value, len(dictionary))
+                mapping[-1] = -1  # 欠損値（factorizeの-1）は一旦-1とする
+                raw_files[column].write(mapping[local_codes].tobytes())
+            num_rows += len(chunk)
+        
+        for raw_file in raw_files.values():
+            raw_file.close()
+        
+        result = {}
+        for column in columns:
+            dict_path, codes_path = get_cache_paths(file_path, column)
+            dictionary = [str(value) for value in dictionaries[column]]
+            missing_code = len(dictionary)
+            
+            # 欠損値の符号を辞書の要素数に置き換える
+            if num_rows:
+                raw_codes = np.memmap(raw_paths[column], dtype=np.int64, mode='r+', shape=(num_rows,))
+                raw_codes[raw_codes < 0] = missing_code
+                raw_codes.flush()
+                del raw_codes
+            write_codes_npy(codes_path, raw_paths[column], num_rows, select_code_dtype(len(dictionary)))
+            
+            # 辞書ファイルは最後に書き込み、書き込み途中のキャッシュが使われないようにする
+            with open(dict_path, 'w', encoding='utf-8') as f:
+                json.dump({'source': source, 'num_rows': num_rows, 'dictionary': dictionary}, f,
+                          ensure_ascii=False)
+            result[column] = (dictionary, np.load(codes_path, mmap_mode='r'))
+        return result
+    
+    finally:
+        for column in columns:
+            raw_files[column].close()
+            if os.path.exists(raw_paths[column]):
+                os.remove(raw_paths[column])
@@ -1,56 +1,147 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import pandas as pd
+import io
 import os
+import csv
+import glob
+import sys
+import json
+import time
+import argparse
 import unicodedata
+from functools import lru_cache, partial
+
+try:
+    from src.lazy_import import LazyModule
+    from src.result_cache import ResultCache, DEFAULT_CACHE_DIR
+    from src.column_cache import load_column_codes, build_column_cache, count_column_codes
+    from src.master_data import load_master, DEFAULT_MASTER_PATH
+    from src.profiling import create_profiler, NULL_PROFILER
+    from src.group_stats import GroupStats, STATS_COLUMNS
+    from src.sketches import (GroupQuantiles, GroupDistinct, DEFAULT_KLL_K, DEFAULT_PERCENTILES, DISTINCT_COLUMNS,
+                              DEFAULT_HLL_PRECISION)
+    from src.grouping_sets import GroupingSets, REGION_DIMENSION, format_dimension_label
+except ImportError:
+    # スクリプトとして直接実行された場合
+    from lazy_import import LazyModule
+    from result_cache import ResultCache, DEFAULT_CACHE_DIR
+    from column_cache import load_column_codes, build_column_cache, count_column_codes
+    from master_data import load_master, DEFAULT_MASTER_PATH
+    from profiling import create_profiler, NULL_PROFILER
+    from group_stats import GroupStats, STATS_COLUMNS
+    from sketches import (GroupQuantiles, GroupDistinct, DEFAULT_KLL_K, DEFAULT_PERCENTILES, DISTINCT_COLUMNS,
+                          DEFAULT_HLL_PRECISION)
+    from grouping_sets import GroupingSets, REGION_DIMENSION, format_dimension_label
+
+# 起動時間を短縮するため、NumPy と pandas は使用する時点でインポートする
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+concurrent_futures = LazyModule('concurrent.futures')
+
+# 表示する統計量と見出し
+STATS_KEYS = ('count', 'mean', 'std', 'min', 'max')
+STATS_HEADERS = ('件数', '平均', '標準偏差', '最小', '最大')
+
+# 並列集計で1タスクが担当するバイト範囲の上限（ワーカーごとのメモリ使用量の目安）
+DEFAULT_RANGE_BYTES = 64 * 1024 * 1024
+
+# 表示幅を2とする East Asian Width の分類（East Asian Ambiguous は全角として扱う）
+WIDE_EAST_ASIAN_WIDTHS = frozenset(['F', 'W', 'A'])
+
+# 表示幅を保持するラベルの数の上限（種類数の多いキーでメモリを使い過ぎないようにする）
+WIDTH_CACHE_SIZE = 1 << 16
+
+# Parquet形式と判定するファイルの拡張子
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+
+# ディレクトリを指定した場合に集計対象とするファイル
+DIRECTORY_INPUT_PATTERNS = ('*.csv', '*.parquet', '*.pq')
+
+# Parquet形式のファイルを読み込む際の1バッチあたりの行数
+PARQUET_BATCH_SIZE = 1000000
+
+# 国名の代わりにマスタデータの国コードを持つ入力ファイルのカラム名
+COUNTRY_CODE_COLUMN = '国コード'
+
+# 国別の集計に使用するカラムの型（数字のみの国でも csv モジュールによる集計と同じく文字列として扱う）
+COUNTRY_COLUMN_DTYPES = {'国': str, COUNTRY_CODE_COLUMN: 'category'}
+
+# このサイズ以下のCSVファイルは、pandas を使わずに標準ライブラリの csv モジュールで集計する
+DEFAULT_LIGHT_MAX_BYTES = 8 * 1024 * 1024
+
+# pandas が既定で欠損値とみなす値（csv モジュールで集計する場合も同じ値を除外する）
+PANDAS_NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
 
 def get_country_region_map():
     """
     国と地域のマッピングを取得する
     
+    マスタデータは master_data モジュールで一度だけ読み込み、ファイルが変更されるまで再利用する。
+    
     Returns:
-        dict: {国名: 地域名} の形式の辞書
+        dict: {国名: 地域名} の形式の辞書（共有しているため変更しないこと）
     """
     try:
-        # プロジェクトのルートディレクトリからの相対パス
-        map_file_path = os.path.join("resources", "master", "country_region_map.csv")
-        
-        # ファイルの存在確認
-        if not os.path.exists(map_file_path):
-            print(f"警告: マッピングファイル '{map_file_path}' が見つかりません")
-            return {}
-            
-        # CSVファイルを読み込む
-        map_df = pd.read_csv(map_file_path)
-        
-        # 国名と地域名のマッピングを作成
-        country_region_dict = dict(zip(map_df['国名'], map_df['地域名']))
-        
-        return country_region_dict
+        return load_master().country_region_map
         
+    except FileNotFoundError:
+        print(f"警告: マッピングファイル '{DEFAULT_MASTER_PATH}' が見つかりません")
+        return {}
     except Exception as e:
         print(f"国と地域のマッピング取得中にエラーが発生しました: {str(e)}")
         return {}
 
+def get_country_code_map():
+    """
+    国コードと国名のマッピングを取得する
+    
+    Returns:
+        dict: {国コード: 国名} の形式の辞書（共有しているため変更しないこと）
+    """
+    try:
+        return load_master().country_code_map
+        
+    except FileNotFoundError:
+        print(f"警告: マッピングファイル '{DEFAULT_MASTER_PATH}' が見つかりません")
+        return {}
+    except Exception as e:
+        print(f"国コードと国名のマッピング取得中にエラーが発生しました: {str(e)}")
+        return {}
+
+@lru_cache(maxsize=None)
+def get_char_width(c):
+    """
+    1文字の表示幅を取得する（全角文字は2、半角文字は1）
+    
+    Args:
+        c: 対象の文字
+        
+    Returns:
+        int: 表示幅
+    """
+    return 2 if unicodedata.east_asian_width(c) in WIDE_EAST_ASIAN_WIDTHS else 1
+
+@lru_cache(maxsize=WIDTH_CACHE_SIZE)
 def get_east_asian_width_count(text):
     """
     文字列の表示幅をカウントする（全角文字は2、半角文字は1としてカウント）
     
+    同じラベルは表示のたびに繰り返し計算されるため、計算結果を保持する。
+    
     Args:
         text: カウント対象の文字列
         
     Returns:
         int: 表示幅の合計
     """
-    count = 0
-    for c in text:
-        # East Asian Ambiguous は全角として扱う
-        if unicodedata.east_asian_width(c) in ['F', 'W', 'A']:
-            count += 2
-        else:
-            count += 1
-    return count
+    # ASCII のみの文字列は文字数がそのまま表示幅となる
+    if text.isascii():
+        return len(text)
+    return sum(map(get_char_width, text))
 
 def aggregate_by_country(df):
     """
@@ -64,6 +155,105 @@ def aggregate_by_country(df):
     """
     return df['国'].value_counts()
 
+def is_country_column(column):
+    """
+    国別の集計に使用するカラム（「国」または「国コード」）かどうかを判定する
+    
+    Args:
+        column: カラム名
+        
+    Returns:
+        bool: 国別の集計に使用するカラムの場合はTrue
+    """
+    return column in ('国', COUNTRY_CODE_COLUMN)
+
+def get_country_column(columns):
+    """
+    国別の集計に使用するカラムを選ぶ（「国」カラムを優先し、なければ「国コード」カラム）
+    
+    Args:
+        columns: ファイルのカラム名のリスト
+        
+    Returns:
+        str: 国別の集計に使用するカラム名
+        
+    Raises:
+        KeyError: 「国」カラムも「国コード」カラムも存在しない場合
+    """
+    if '国' in columns:
+        return '国'
+    if COUNTRY_CODE_COLUMN in columns:
+        return COUNTRY_CODE_COLUMN
+    raise KeyError("CSVファイルに「国」カラムが存在しません")
+
+def read_country_column(source, **kwargs):
+    """
+    CSVから国別の集計に使用するカラムのみを読み込む
+    
+    「国」カラムは数字のみの値でも数値に変換せず、文字列として読み込む（"044" などの先頭の0も保持する）。
+    「国コード」カラムはカテゴリ型として読み込み、行ごとの文字列を作らずに
+    国コードの種類数分の小さな整数（int8/int16）の番号として保持する。
+    
+    Args:
+        source: CSVファイルのパスまたはファイルオブジェクト
+        **kwargs: pd.read_csv に渡す追加の引数（chunksize など）
+        
+    Returns:
+        pd.DataFrame: 読み込んだカラム（chunksize指定時はチャンクのイテレータ）
+    """
+    return pd.read_csv(source, usecols=is_country_column, dtype=COUNTRY_COLUMN_DTYPES, **kwargs)
+
+def aggregate_country_codes(codes):
+    """
+    カテゴリ型の国コードを、カテゴリの番号のまま bincount で数える
+    
+    Args:
+        codes: カテゴリ型の国コードのSeries
+        
+    Returns:
+        pd.Series: 国コード別の集計結果（件数の降順）
+    """
+    categories = codes.cat.categories
+    category_codes = codes.cat.codes.to_numpy()
+    counts = np.bincount(category_codes[category_codes >= 0], minlength=len(categories))
+    code_counts = pd.Series(counts, index=categories.astype(str), dtype='int64')
+    return code_counts[code_counts > 0].sort_values(ascending=False, kind='stable').rename_axis(COUNTRY_CODE_COLUMN)
+
+def aggregate_country_column(df):
+    """
+    read_country_column() で読み込んだDataFrameを国別（または国コード別）に集計する
+    
+    Args:
+        df: 集計対象のDataFrame
+        
+    Returns:
+        pd.Series: 国別（「国コード」カラムの場合は国コード別）の集計結果
+    """
+    if get_country_column(df.columns) == '国':
+        return aggregate_by_country(df)
+    return aggregate_country_codes(df[COUNTRY_CODE_COLUMN].astype('category'))
+
+def resolve_country_names(country_counts, country_code_map=None):
+    """
+    国コード別の集計結果の国コードを、マスタデータの国名に置き換える（表示直前に使用する）
+    
+    マスタデータにない値（国名や未登録の国コード）はそのまま残す。
+    
+    Args:
+        country_counts: 国別または国コード別の集計結果
+        country_code_map: 国コードと国名のマッピング辞書 {国コード: 国名}（省略時はマスタデータを使用）
+        
+    Returns:
+        pd.Series: 国別の集計結果
+    """
+    if country_counts.empty:
+        return country_counts
+    if country_code_map is None:
+        country_code_map = get_country_code_map()
+    
+    names = [country_code_map.get(country, country) for country in country_counts.index]
+    return merge_counts([pd.Series(country_counts.to_numpy(), index=names)]).rename_axis('国')
+
 def get_ordered_countries(country_counts):
     """
     国名を所定の順序に並び替える（日本を先頭に、それ以外は五十音順）
@@ -75,10 +265,10 @@ def get_ordered_countries(country_counts):
         list: 並び替えた国名リスト
     """
     # 国名のリストを取得（日本を除く）
-    other_countries = sorted([country for country in country_counts.index if country != '日本'])
+    other_countries = sorted([country for country in country_counts.keys() if country != '日本'])
     
     # 並び順を指定（日本を先頭に、あとは五十音順）
-    return ['日本'] + other_countries if '日本' in country_counts.index else other_countries
+    return ['日本'] + other_countries if '日本' in country_counts else other_countries
 
 def create_ordered_counts(country_counts, ordered_countries):
     """
@@ -89,10 +279,9 @@ def create_ordered_counts(country_counts, ordered_countries):
         ordered_countries: 並び替えた国名リスト
         
     Returns:
-        pd.Series: 並び替えた国別集計結果
+        dict: 並び替えた国別集計結果 {国名: 件数}
     """
-    return pd.Series([country_counts.get(country, 0) for country in ordered_countries], 
-                   index=ordered_countries)
+    return {country: country_counts.get(country, 0) for country in ordered_countries}
 
 def calculate_format_parameters(ordered_counts, country_counts):
     """
@@ -105,16 +294,37 @@ def calculate_format_parameters(ordered_counts, country_counts):
     Returns:
         tuple: (最大表示幅, 数値の最大桁数)
     """
+    # pd.Series と dict のどちらでも同じように扱う
+    ordered_counts = dict(ordered_counts)
+    
     # 最長の国名の表示幅を取得
-    max_display_width = max([get_east_asian_width_count(country) for country in ordered_counts.index])
+    max_display_width = max([get_east_asian_width_count(country) for country in ordered_counts])
     max_display_width = max(max_display_width, get_east_asian_width_count("合計"))
     
     # 数値の最大桁数を取得（カンマ表示も考慮）
-    max_count = max(max(ordered_counts), country_counts.sum())
+    max_count = max(max(ordered_counts.values()), sum(dict(country_counts).values()))
     max_count_len = len(f"{max_count:,}")
     
     return max_display_width, max_count_len
 
+def format_item(label, count, max_display_width, max_count_len):
+    """
+    項目を整形した1行の文字列を作成する
+    
+    Args:
+        label: 表示ラベル（国名または合計）
+        count: カウント数
+        max_display_width: 最大表示幅
+        max_count_len: 数値の最大桁数
+    
+    Returns:
+        str: 整形した文字列
+    """
+    padding = max_display_width - get_east_asian_width_count(label)
+    padding_spaces = " " * padding
+    formatted_count = f"{count:,}".rjust(max_count_len)
+    return f'{label}{padding_spaces}：{formatted_count}件'
+
 def format_and_print_item(label, count, max_display_width, max_count_len):
     """
     項目を整形して出力する
@@ -128,10 +338,165 @@ def format_and_print_item(label, count, max_display_width, max_count_len):
     Returns:
         None
     """
-    padding = max_display_width - get_east_asian_width_count(label)
-    padding_spaces = " " * padding
-    formatted_count = f"{count:,}".rjust(max_count_len)
-    print(f'{label}{padding_spaces}：{formatted_count}件')
+    print(format_item(label, count, max_display_width, max_count_len))
+
+def format_result_lines(title, counts, total=None):
+    """
+    見出しと項目ごとの件数・合計件数を、表示幅を揃えた行のリストにする
+    
+    Args:
+        title: 見出し
+        counts: 表示順に並べた {表示ラベル: 件数} の形式の辞書（pd.Series も可）
+        total: 合計件数（省略時は counts の合計）
+        
+    Returns:
+        list: 整形した行のリスト
+    """
+    # pd.Series と dict のどちらでも同じように扱う
+    counts = dict(counts)
+    if total is None:
+        total = sum(counts.values())
+    
+    # 各ラベルの表示幅は1回だけ求め、最大表示幅とパディングの両方に使う
+    widths = [get_east_asian_width_count(label) for label in counts]
+    max_display_width = max(widths + [get_east_asian_width_count("合計")])
+    max_count_len = len(f"{max(max(counts.values(), default=0), total):,}")
+    
+    lines = [title]
+    lines.extend(f"{label}{' ' * (max_display_width - width)}：{count:>{max_count_len},}件"
+                 for (label, count), width in zip(counts.items(), widths))
+    lines.append(format_item("合計", total, max_display_width, max_count_len))
+    return lines
+
+def format_table_lines(title, headers, rows):
+    """
+    見出しと表を、列ごとに表示幅を揃えた行のリストにする（先頭のラベルの列は左揃え、それ以降の列は右揃え）
+    
+    Args:
+        title: 見出し
+        headers: 列の見出しのリスト
+        rows: 各行のセルの文字列のリスト
+        
+    Returns:
+        list: 整形した行のリスト
+    """
+    table = [list(headers)] + [list(row) for row in rows]
+    widths = [[get_east_asian_width_count(cell) for cell in row] for row in table]
+    column_widths = [max(row_widths[i] for row_widths in widths) for i in range(len(headers))]
+    
+    lines = [title]
+    for row, row_widths in zip(table, widths):
+        cells = [row[i] + " " * (column_widths[i] - row_widths[i]) if i == 0 else
+                 " " * (column_widths[i] - row_widths[i]) + row[i] for i in range(len(row))]
+        lines.append("  ".join(cells))
+    return lines
+
+def format_stat_value(value):
+    """
+    統計量を表示用の文字列にする
+    
+    Args:
+        value: 統計量（件数は整数、それ以外は浮動小数点数、値がない場合はNone）
+        
+    Returns:
+        str: 件数はカンマ区切り、それ以外は小数点以下2桁の文字列（値がない場合は "-"）
+    """
+    if value is None:
+        return "-"
+    if isinstance(value, int):
+        return f"{value:,}"
+    return f"{value:,.2f}"
+
+def format_stats_lines(title, label_header, group_stats, column):
+    """
+    グループごとの1つのカラムの統計量を、表示幅を揃えた表の行のリストにする
+    
+    Args:
+        title: 見出し
+        label_header: 1列目（グループ）の見出し
+        group_stats: 表示順に並べた {グループ: GroupStats.summary() の結果} の形式の辞書
+        column: 表示するカラム名
+        
+    Returns:
+        list: 整形した行のリスト
+    """
+    rows = [[str(group)] + [format_stat_value(summary[column][key]) for key in STATS_KEYS]
+            for group, summary in group_stats.items()]
+    return format_table_lines(title, [label_header] + list(STATS_HEADERS), rows)
+
+def format_percentile_label(percentile):
+    """
+    パーセンタイルの見出しを作成する
+    
+    Args:
+        percentile: パーセンタイル（0〜100）
+        
+    Returns:
+        str: 見出し（例: "p50"、"p99.9"）
+    """
+    return f"p{percentile:g}"
+
+def format_quantile_lines(title, label_header, group_quantiles, column, percentiles):
+    """
+    グループごとの1つのカラムの分位数を、表示幅を揃えた表の行のリストにする
+    
+    Args:
+        title: 見出し
+        label_header: 1列目（グループ）の見出し
+        group_quantiles: 表示順に並べた {グループ: GroupQuantiles.summary() の結果} の形式の辞書
+        column: 表示するカラム名
+        percentiles: 表示するパーセンタイルのリスト
+        
+    Returns:
+        list: 整形した行のリスト
+    """
+    rows = [[str(group)] + [format_stat_value(summary[column][percentile]) for percentile in percentiles]
+            for group, summary in group_quantiles.items()]
+    return format_table_lines(title, [label_header] + [format_percentile_label(p) for p in percentiles], rows)
+
+def format_distinct_lines(title, label_header, group_distinct, columns):
+    """
+    グループごとの重複を除いた件数を、表示幅を揃えた表の行のリストにする
+    
+    Args:
+        title: 見出し
+        label_header: 1列目（グループ）の見出し
+        group_distinct: 表示順に並べた {グループ: GroupDistinct.summary() の結果} の形式の辞書
+        columns: 表示するカラム名のリスト
+        
+    Returns:
+        list: 整形した行のリスト
+    """
+    rows = [[str(group)] + [format_stat_value(summary[column]) for column in columns]
+            for group, summary in group_distinct.items()]
+    return format_table_lines(title, [label_header] + list(columns), rows)
+
+def format_grouping_set_lines(group_by, rows):
+    """
+    軸の組み合わせごとの行数と合計を、国別集計結果と同じ形式の行のリストにする
+    
+    Args:
+        group_by: 集計の軸の指定のリスト
+        rows: 表示順に並べた (各軸の値のタプル, 行数) のリスト
+        
+    Returns:
+        list: 整形した行のリスト（各行のラベルは軸の値を「・」で区切ったもの）
+    """
+    labels = [format_dimension_label(spec) for spec in group_by]
+    counts = {"・".join(map(str, values)): count for values, count in rows}
+    return format_result_lines(f'【{"×".join(labels)}別集計結果】', counts)
+
+def write_lines(lines):
+    """
+    行のリストを1つの文字列にまとめ、1回の書き込みで標準出力に出力する
+    
+    Args:
+        lines: 出力する行のリスト
+        
+    Returns:
+        None
+    """
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def display_results(ordered_counts, country_counts):
     """
@@ -144,17 +509,7 @@ def display_results(ordered_counts, country_counts):
     Returns:
         None
     """
-    print('【国別集計結果】')
-    
-    # フォーマットパラメータを計算
-    max_display_width, max_count_len = calculate_format_parameters(ordered_counts, country_counts)
-    
-    # 国別のカウントを表示
-    for country, count in ordered_counts.items():
-        format_and_print_item(country, count, max_display_width, max_count_len)
-    
-    # 合計件数を表示
-    format_and_print_item("合計", country_counts.sum(), max_display_width, max_count_len)
+    write_lines(format_result_lines('【国別集計結果】', ordered_counts, sum(dict(country_counts).values())))
 
 def aggregate_by_region(df, country_region_map=None):
     """
@@ -179,18 +534,87 @@ def aggregate_by_region(df, country_region_map=None):
             print("警告: 国と地域のマッピングが取得できませんでした。地域別集計はスキップします。")
             return pd.Series(dtype='int64')  # 空のシリーズを返す
     
-    # 国名を地域名に変換
-    regions = []
-    for country in df['国']:
-        region = country_region_map.get(country, 'その他')
-        regions.append(region)
+    # 国別に集計してから地域へ集約する（国ごとに1回だけ変換し、DataFrameはコピーしない）
+    country_counts = df['国'].value_counts(dropna=False)
+    return aggregate_region_from_country_counts(country_counts, country_region_map)
+
+def aggregate_region_from_country_counts(country_counts, country_region_map):
+    """
+    国別の集計結果を地域別の集計結果に集約する
+    
+    Args:
+        country_counts: 国別集計結果
+        country_region_map: 国と地域のマッピング辞書 {国名: 地域名}
+        
+    Returns:
+        pd.Series: 地域別の集計結果（マッピングにない国は「その他」に分類する）
+    """
+    return rollup_level(country_counts, country_region_map, level_name='地域')
+
+def rollup_level(child_counts, parent_map, level_name=None):
+    """
+    下位階層の集計結果を、マッピングに従って1つ上の階層の集計結果に集約する
+    
+    Args:
+        child_counts: 下位階層の集計結果
+        parent_map: 下位階層のキーから上位階層のキーへのマッピング辞書
+        level_name: 集約結果のインデックス名
+        
+    Returns:
+        pd.Series: 上位階層の集計結果（マッピングにないキーは「その他」に分類する）
+    """
+    if child_counts.empty:
+        return pd.Series(dtype='int64')
+    
+    # 下位階層のキーを上位階層のキーに変換（キーの種類数分だけ変換する）
+    parents = child_counts.index.map(lambda key: parent_map.get(key, 'その他'))
+    
+    # 上位階層別に集計
+    parent_counts = child_counts.groupby(parents, sort=False).sum().rename_axis(level_name)
+    return parent_counts.astype('int64').sort_values(ascending=False, kind='stable')
+
+def rollup_counts(leaf_counts, mappings):
+    """
+    最下位階層の集計結果から、上位の各階層と総計を求める
+    
+    行データの走査は最下位階層の集計時の1回のみで、上位階層はすべて
+    集計結果（キーの種類数分のデータ）から導出する。
+    
+    Args:
+        leaf_counts: 最下位階層（国など）の集計結果
+        mappings: 下位から上位へのマッピング辞書のリスト
+                  （例: [{国名: 地域名}] や [{国コード: 地域コード}, {地域コード: 上位地域}]）
+        
+    Returns:
+        tuple: (各階層の集計結果のリスト [最下位, 1つ上, ...], 総計)
+    """
+    levels = [leaf_counts]
+    for parent_map in mappings:
+        levels.append(rollup_level(levels[-1], parent_map))
     
-    # 地域カラムを追加
-    temp_df = df.copy()
-    temp_df['地域'] = regions
+    return levels, int(leaf_counts.sum())
+
+def get_hierarchy_mappings(level_columns, map_file_path=None):
+    """
+    マスタデータから階層間のマッピング辞書を作成する
+    
+    Args:
+        level_columns: 下位から上位の順に並べたマスタデータのカラム名のリスト
+                       （例: ['国名', '地域名'] や ['国コード', '地域コード']）
+        map_file_path: マスタデータのCSVファイルのパス（省略時はデフォルトのパスを使用）
+        
+    Returns:
+        list: 隣接する階層ごとのマッピング辞書のリスト
+        
+    Raises:
+        KeyError: マスタデータに指定したカラムが存在しない場合
+    """
+    master = load_master(map_file_path)
+    missing_columns = [column for column in level_columns if column not in master.columns]
+    if missing_columns:
+        raise KeyError(f"マスタデータにカラム {missing_columns} が存在しません")
     
-    # 地域別に集計
-    return temp_df['地域'].value_counts()
+    return [master.get_mapping(child, parent) for child, parent in zip(level_columns, level_columns[1:])]
 
 def get_ordered_regions(region_counts):
     """
@@ -208,10 +632,10 @@ def get_ordered_regions(region_counts):
     ]
     
     # 存在する地域だけを標準順で取得
-    ordered_regions = [region for region in standard_order if region in region_counts.index]
+    ordered_regions = [region for region in standard_order if region in region_counts]
     
     # 標準順に含まれない地域があれば追加
-    for region in region_counts.index:
+    for region in region_counts.keys():
         if region not in ordered_regions:
             ordered_regions.append(region)
     
@@ -226,10 +650,9 @@ def create_ordered_region_counts(region_counts, ordered_regions):
         ordered_regions: 並び替えた地域名リスト
         
     Returns:
-        pd.Series: 並び替えた地域別集計結果
+        dict: 並び替えた地域別集計結果 {地域名: 件数}
     """
-    return pd.Series([region_counts.get(region, 0) for region in ordered_regions],
-                   index=ordered_regions)
+    return {region: region_counts.get(region, 0) for region in ordered_regions}
 
 def display_region_results(ordered_region_counts, region_counts):
     """
@@ -242,102 +665,1542 @@ def display_region_results(ordered_region_counts, region_counts):
     Returns:
         None
     """
-    print('【地域別集計結果】')
-    
-    # フォーマットパラメータを計算
-    max_display_width = max([get_east_asian_width_count(region) for region in ordered_region_counts.index])
-    max_display_width = max(max_display_width, get_east_asian_width_count("合計"))
+    write_lines(format_result_lines('【地域別集計結果】', ordered_region_counts, sum(dict(region_counts).values())))
+
+def read_csv_columns(file_path):
+    """
+    CSVファイルのヘッダーのみを読み込み、カラム名の一覧を取得する
     
-    # 数値の最大桁数を取得（カンマ表示も考慮）
-    max_count = max(max(ordered_region_counts), region_counts.sum())
-    max_count_len = len(f"{max_count:,}")
+    Args:
+        file_path: CSVファイルのパス
+        
+    Returns:
+        list: カラム名のリスト
+    """
+    return list(pd.read_csv(file_path, nrows=0).columns)
+
+def merge_counts(count_list):
+    """
+    複数の部分集計結果（value_countsの結果）を1つの集計結果に統合する
     
-    # 地域別のカウントを表示
-    for region, count in ordered_region_counts.items():
-        padding = max_display_width - get_east_asian_width_count(region)
-        padding_spaces = " " * padding
-        formatted_count = f"{count:,}".rjust(max_count_len)
-        print(f'{region}{padding_spaces}：{formatted_count}件')
+    Args:
+        count_list: 部分集計結果（pd.Series、またはNone）のリスト
+        
+    Returns:
+        pd.Series: 統合した集計結果（件数の降順）
+    """
+    partial_counts = [counts for counts in count_list if counts is not None and not counts.empty]
+    if not partial_counts:
+        return pd.Series(dtype='int64')
     
-    # 合計件数を表示
-    padding = max_display_width - get_east_asian_width_count("合計")
-    padding_spaces = " " * padding
-    formatted_count = f"{region_counts.sum():,}".rjust(max_count_len)
-    print(f'合計{padding_spaces}：{formatted_count}件')
+    merged = pd.concat(partial_counts).groupby(level=0, sort=False).sum()
+    return merged.astype('int64').sort_values(ascending=False, kind='stable')
 
-def count_by_country(file_path):
+def aggregate_in_chunks(file_path, chunksize):
     """
-    CSVファイルを読み込み、国別と地域別の件数を集計する
+    CSVファイルをチャンク単位で読み込み、国別の件数を逐次集計する
+    
+    「国」（または「国コード」）カラムのみを読み込み、チャンクごとの集計結果を累積するため、
+    メモリ使用量はファイルサイズではなくチャンクサイズに依存する。
     
     Args:
         file_path: CSVファイルのパス
+        chunksize: 1チャンクあたりの行数
         
     Returns:
-        None
-    
+        pd.Series: 国別の集計結果
+        
     Raises:
-        FileNotFoundError: ファイルが存在しない場合
-        KeyError: CSVファイルに「国」カラムが存在しない場合
-        pd.errors.EmptyDataError: CSVファイルが空の場合
-        pd.errors.ParserError: CSVファイルの形式が不正な場合
+        ValueError: 無効なチャンクサイズが指定された場合
     """
-    try:
-        # CSVファイルを読み込む
-        df = pd.read_csv(file_path)
-        
-        # 「国」カラムの存在確認
-        if '国' not in df.columns:
-            raise KeyError("CSVファイルに「国」カラムが存在しません")
-        
-        # 国別にカウント
-        country_counts = aggregate_by_country(df)
-        
-        # 国名を所定の順序に並び替え
-        ordered_countries = get_ordered_countries(country_counts)
-        
-        # 指定した順序で国別カウントを並べ替え
-        ordered_counts = create_ordered_counts(country_counts, ordered_countries)
-        
-        # 結果を表示（国別）
-        display_results(ordered_counts, country_counts)
+    if chunksize <= 0:
+        raise ValueError("チャンクサイズは1以上の整数を指定してください")
+    
+    country_counts = None
+    for chunk in read_country_column(file_path, chunksize=chunksize):
+        country_counts = merge_counts([country_counts, aggregate_country_column(chunk)])
+    
+    return merge_counts([country_counts])
+
+def split_byte_ranges(file_path, num_ranges):
+    """
+    CSVファイルのデータ部分（ヘッダー行を除く）を、行の境界に揃えたバイト範囲に分割する
+    
+    各範囲の開始位置は必ず行頭になるため、範囲ごとに独立して解析できる。
+    ただし、クォートされた値の中に改行を含むCSVには対応しない。
+    
+    Args:
+        file_path: CSVファイルのパス
+        num_ranges: 分割数の目安
         
-        # 地域別集計を行う
-        region_counts = aggregate_by_region(df)
+    Returns:
+        tuple: (ヘッダー行のバイト列, [(開始位置, 終了位置), ...])
+    """
+    with open(file_path, 'rb') as f:
+        header = f.readline()
+        data_start = f.tell()
+        file_size = os.fstat(f.fileno()).st_size
+        step = max(1, (file_size - data_start) // max(1, num_ranges))
         
-        # 地域別集計結果が空でない場合のみ表示
-        if not region_counts.empty:
-            print("\n") # 結果の間に空行を入れる
+        boundaries = [data_start]
+        for i in range(1, num_ranges):
+            position = data_start + i * step
+            if position >= file_size:
+                break
             
-            # 地域名を所定の順序に並び替え
-            ordered_regions = get_ordered_regions(region_counts)
-            
-            # 指定した順序で地域別カウントを並べ替え
-            ordered_region_counts = create_ordered_region_counts(region_counts, ordered_regions)
+            # 直前のバイトから行末まで読み飛ばし、次の行頭を境界とする
+            f.seek(position - 1)
+            f.readline()
+            position = f.tell()
+            if boundaries[-1] < position < file_size:
+                boundaries.append(position)
+        boundaries.append(file_size)
+    
+    ranges = [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
+    return header, ranges
+
+def count_byte_range(file_path, header, start, end):
+    """
+    CSVファイルの指定したバイト範囲を解析し、国別の件数を集計する（並列集計のワーカー処理）
+    
+    Args:
+        file_path: CSVファイルのパス
+        header: ヘッダー行のバイト列
+        start: 範囲の開始位置（行頭）
+        end: 範囲の終了位置（行頭またはファイル末尾）
+        
+    Returns:
+        pd.Series: 範囲内の国別の集計結果
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    
+    return count_csv_bytes(header, data)
+
+def count_csv_bytes(header, data):
+    """
+    ヘッダー行を除いたCSVのバイト列を解析し、国別の件数を集計する
+    
+    Args:
+        header: ヘッダー行のバイト列
+        data: 行単位のCSVデータのバイト列
+        
+    Returns:
+        pd.Series: 国別の集計結果
+    """
+    df = read_country_column(io.BytesIO(header + data))
+    return aggregate_country_column(df)
+
+def aggregate_parallel(file_path, workers=None, range_bytes=DEFAULT_RANGE_BYTES):
+    """
+    CSVファイルを行の境界に揃えたバイト範囲に分割し、プロセスプールで並列に集計する
+    
+    各ワーカーは担当範囲の国別件数（国の種類数分の小さな集計結果）のみを返し、
+    親プロセスでそれらを統合する。
+    
+    Args:
+        file_path: CSVファイルのパス
+        workers: ワーカープロセス数（省略時はCPUコア数）
+        range_bytes: 1タスクが担当するバイト範囲の上限
+        
+    Returns:
+        pd.Series: 国別の集計結果
+        
+    Raises:
+        ValueError: 無効なワーカー数が指定された場合
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 0:
+        raise ValueError("ワーカー数は1以上の整数を指定してください")
+    
+    # ワーカー数以上、かつ1範囲がrange_bytesを超えない分割数にする
+    data_size = os.path.getsize(file_path)
+    num_ranges = max(workers, -(-data_size // range_bytes))
+    header, ranges = split_byte_ranges(file_path, num_ranges)
+    if not ranges:
+        return pd.Series(dtype='int64')
+    
+    with concurrent_futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(count_byte_range, file_path, header, start, end)
+                   for start, end in ranges]
+        partial_counts = [future.result() for future in futures]
+    
+    return merge_counts(partial_counts)
+
+def get_input_format(file_path):
+    """
+    ファイルの拡張子から入力形式を判定する
+    
+    Args:
+        file_path: 入力ファイルのパス
+        
+    Returns:
+        str: 'parquet' または 'csv'
+    """
+    return 'parquet' if str(file_path).lower().endswith(PARQUET_EXTENSIONS) else 'csv'
+
+def aggregate_parquet(file_path, batch_size=PARQUET_BATCH_SIZE):
+    """
+    Parquet形式のファイルから「国」（または「国コード」）カラムのみを読み込み、国別の件数を集計する
+    
+    辞書エンコーディングされたカラムは、文字列に変換せずに番号のまま数えてから
+    国名（または国コード）に対応付ける。
+    
+    Args:
+        file_path: Parquetファイルのパス
+        batch_size: 一度に読み込む行数
+        
+    Returns:
+        pd.Series: 国別の集計結果
+        
+    Raises:
+        ImportError: pyarrow がインストールされていない場合
+        KeyError: ファイルに「国」カラムが存在しない場合
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet形式を扱うには pyarrow をインストールしてください（pip install pyarrow）")
+    
+    parquet_file = pq.ParquetFile(file_path)
+    try:
+        country_column = get_country_column(parquet_file.schema_arrow.names)
+    except KeyError:
+        raise KeyError("ファイルに「国」カラムが存在しません")
+    
+    country_counts = None
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=[country_column]):
+        column = batch.column(0)
+        if pa.types.is_dictionary(column.type):
+            # 辞書の番号ごとに件数を数える（欠損値は除く）
+            indices = column.indices.to_numpy(zero_copy_only=False)
+            if column.null_count:
+                indices = indices[column.is_valid().to_numpy(zero_copy_only=False)]
+            counts = np.bincount(indices.astype(np.intp), minlength=len(column.dictionary))
+            batch_counts = pd.Series(counts, index=column.dictionary.to_pylist(), dtype='int64')
+        else:
+            value_counts = pc.value_counts(column.drop_null())
+            batch_counts = pd.Series(value_counts.field('counts').to_numpy(),
+                                     index=value_counts.field('values').to_pylist(), dtype='int64')
+        country_counts = merge_counts([country_counts, batch_counts[batch_counts > 0]])
+    
+    return merge_counts([country_counts]).rename_axis(country_column)
+
+def scan_country_counts(file_path, chunksize=None, workers=None):
+    """
+    CSVファイルを1回だけ走査して国別の件数を集計する
+    
+    Parquet形式のファイル（拡張子 .parquet / .pq）は「国」カラムのみを読み込んで集計する。
+    「国」カラムの代わりに「国コード」カラムを持つファイルは国コード別に集計する
+    （国名への置き換えは表示時に resolve_country_names() で行う）。
+    
+    Args:
+        file_path: CSVファイルまたはParquetファイルのパス
+        chunksize: 指定した場合はこの行数ごとのチャンク単位で読み込む（CSVのみ）
+        workers: 2以上を指定した場合はバイト範囲に分割して並列に集計する（CSVのみ）
+        
+    Returns:
+        pd.Series: 国別の集計結果
+        
+    Raises:
+        KeyError: ファイルに「国」カラムが存在しない場合
+    """
+    if get_input_format(file_path) == 'parquet':
+        return aggregate_parquet(file_path)
+    
+    # 「国」カラムの存在確認
+    get_country_column(read_csv_columns(file_path))
+    
+    if workers is not None and workers > 1:
+        return aggregate_parallel(file_path, workers)
+    
+    if chunksize is not None:
+        return aggregate_in_chunks(file_path, chunksize)
+    
+    return aggregate_country_column(read_country_column(file_path))
+
+# 国ごとに集計する項目と集計クラス（新しい項目はこの辞書に登録する）
+# 集計クラスは columns 属性と update・merge・map_groups・summary・to_dict・from_dict を持つ
+GROUP_AGGREGATORS = {
+    'stats': GroupStats,
+    'quantiles': GroupQuantiles,
+    'distinct': GroupDistinct,
+    'grouping_sets': GroupingSets,
+}
+
+def create_group_aggregators(specs):
+    """
+    国ごとの集計項目の指定から、空の集計オブジェクトを作成する
+    
+    Args:
+        specs: ((項目名, 集計クラスのコンストラクタ引数の辞書), ...) の形式の指定
+               （ワーカープロセスに渡すため、項目名と引数のみで指定する）
+        
+    Returns:
+        dict: {項目名: 集計オブジェクト}
+    """
+    return {kind: GROUP_AGGREGATORS[kind](**options) for kind, options in specs}
+
+def get_group_aggregator_specs(stats=False, percentiles=None, sketch_k=DEFAULT_KLL_K, distinct_columns=None,
+                               hll_precision=DEFAULT_HLL_PRECISION, distinct_exact=False, grouping_sets=None):
+    """
+    集計オプションから国ごとの集計項目の指定を作成する
+    
+    Args:
+        stats: Trueの場合は STATS_COLUMNS の統計量（件数・平均・分散・最小・最大）を集計する
+        percentiles: 指定した場合は STATS_COLUMNS のパーセンタイル（0〜100）をKLLスケッチで近似する
+        sketch_k: KLLスケッチの精度パラメータ
+        distinct_columns: 指定した場合はこれらのカラムの重複を除いた件数を HyperLogLog で推定する
+        hll_precision: HyperLogLog の精度
+        distinct_exact: Trueの場合は重複を除いた件数を推定せずに正確に数える
+        grouping_sets: 指定した場合は軸の組み合わせ（[["名前"], ["地域", "年齢:10"]] など）ごとの行数を数える
+        
+    Returns:
+        tuple: create_group_aggregators() に渡す集計項目の指定（項目がない場合は空）
+        
+    Raises:
+        ValueError: 範囲外のパーセンタイル・精度、または不正な集計の軸が指定された場合
+    """
+    specs = []
+    if stats:
+        specs.append(('stats', {}))
+    if percentiles:
+        if any(not 0 <= percentile <= 100 for percentile in percentiles):
+            raise ValueError("パーセンタイルは0以上100以下の値を指定してください")
+        specs.append(('quantiles', {'k': sketch_k}))
+    if distinct_columns:
+        options = {'columns': list(distinct_columns), 'precision': hll_precision, 'exact': distinct_exact}
+        # 精度の確認のため、ワーカープロセスに渡す前に一度作成する
+        GroupDistinct(**options)
+        specs.append(('distinct', options))
+    if grouping_sets:
+        options = {'sets': [list(dimensions) for dimensions in grouping_sets]}
+        GroupingSets(**options)
+        specs.append(('grouping_sets', options))
+    return tuple(specs)
+
+def read_group_columns(source, columns, **kwargs):
+    """
+    CSVから国ごとの集計に使用するカラム（「国」または「国コード」と集計対象のカラム）のみを読み込む
+    
+    Args:
+        source: CSVファイルのパスまたはファイルオブジェクト
+        columns: 集計対象のカラム名のリスト
+        **kwargs: pd.read_csv に渡す追加の引数（chunksize など）
+        
+    Returns:
+        pd.DataFrame: 読み込んだカラム（chunksize指定時はチャンクのイテレータ）
+    """
+    return pd.read_csv(source, usecols=lambda column: is_country_column(column) or column in columns,
+                       dtype=COUNTRY_COLUMN_DTYPES, **kwargs)
+
+def get_group_columns(aggregators):
+    """
+    集計オブジェクトが使用するカラムを重複なく取得する
+    
+    Args:
+        aggregators: {項目名: 集計オブジェクト}
+        
+    Returns:
+        list: カラム名のリスト
+    """
+    return list(dict.fromkeys(column for aggregator in aggregators.values() for column in aggregator.columns))
+
+def check_group_columns(file_columns, columns):
+    """
+    国ごとの集計に必要なカラムが存在することを確認する
+    
+    Args:
+        file_columns: ファイルのカラム名のリスト
+        columns: 集計対象のカラム名のリスト
+        
+    Raises:
+        KeyError: 「国」カラムまたは集計対象のカラムが存在しない場合
+    """
+    get_country_column(file_columns)
+    for column in columns:
+        if column not in file_columns:
+            raise KeyError(f"CSVファイルに「{column}」カラムが存在しません")
+
+def aggregate_group_frame(df, aggregators):
+    """
+    read_group_columns() で読み込んだDataFrameを国別（または国コード別）に集計する
+    
+    Args:
+        df: 集計対象のDataFrame
+        aggregators: 集計結果を加える {項目名: 集計オブジェクト}
+        
+    Returns:
+        pd.Series: 国別の件数
+    """
+    keys = df[get_country_column(df.columns)]
+    for aggregator in aggregators.values():
+        aggregator.update(keys, df)
+    return aggregate_country_column(df)
+
+def merge_group_aggregators(aggregators, other):
+    """
+    項目ごとに部分的な集計結果を統合する
+    
+    Args:
+        aggregators: 統合先の {項目名: 集計オブジェクト}
+        other: 統合する {項目名: 集計オブジェクト}
+        
+    Returns:
+        dict: 統合先の {項目名: 集計オブジェクト}
+    """
+    for kind, aggregator in aggregators.items():
+        aggregator.merge(other[kind])
+    return aggregators
+
+def group_byte_range(file_path, header, start, end, specs):
+    """
+    CSVファイルの指定したバイト範囲を解析し、国ごとに集計する（並列集計のワーカー処理）
+    
+    Args:
+        file_path: CSVファイルのパス
+        header: ヘッダー行のバイト列
+        start: 範囲の開始位置（行頭）
+        end: 範囲の終了位置（行頭またはファイル末尾）
+        specs: 国ごとの集計項目の指定
+        
+    Returns:
+        tuple: (範囲内の国別の件数, {項目名: 集計オブジェクト})
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    
+    aggregators = create_group_aggregators(specs)
+    df = read_group_columns(io.BytesIO(header + data), get_group_columns(aggregators))
+    return aggregate_group_frame(df, aggregators), aggregators
+
+def aggregate_groups_parallel(file_path, workers, specs, range_bytes=DEFAULT_RANGE_BYTES):
+    """
+    CSVファイルを行の境界に揃えたバイト範囲に分割し、国ごとにプロセスプールで並列に集計する
+    
+    各ワーカーは担当範囲の国ごとの集計結果（国の種類数に比例する小さなデータ）のみを返し、
+    親プロセスでそれらを統合する。
+    
+    Args:
+        file_path: CSVファイルのパス
+        workers: ワーカープロセス数
+        specs: 国ごとの集計項目の指定
+        range_bytes: 1タスクが担当するバイト範囲の上限
+        
+    Returns:
+        tuple: (国別の件数, {項目名: 集計オブジェクト})
+    """
+    data_size = os.path.getsize(file_path)
+    num_ranges = max(workers, -(-data_size // range_bytes))
+    header, ranges = split_byte_ranges(file_path, num_ranges)
+    
+    partial_counts = []
+    aggregators = create_group_aggregators(specs)
+    with concurrent_futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(group_byte_range, file_path, header, start, end, specs)
+                   for start, end in ranges]
+        for future in futures:
+            counts, range_groups = future.result()
+            partial_counts.append(counts)
+            merge_group_aggregators(aggregators, range_groups)
+    
+    return merge_counts(partial_counts), aggregators
+
+def aggregate_groups_parquet(file_path, specs, batch_size=PARQUET_BATCH_SIZE):
+    """
+    Parquet形式のファイルから必要なカラムのみをバッチ単位で読み込み、国ごとに集計する
+    
+    Args:
+        file_path: Parquetファイルのパス
+        specs: 国ごとの集計項目の指定
+        batch_size: 一度に読み込む行数
+        
+    Returns:
+        tuple: (国別の件数, {項目名: 集計オブジェクト})
+        
+    Raises:
+        ImportError: pyarrow がインストールされていない場合
+        KeyError: 必要なカラムが存在しない場合
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet形式を扱うには pyarrow をインストールしてください（pip install pyarrow）")
+    
+    parquet_file = pq.ParquetFile(file_path)
+    file_columns = parquet_file.schema_arrow.names
+    aggregators = create_group_aggregators(specs)
+    columns = get_group_columns(aggregators)
+    check_group_columns(file_columns, columns)
+    
+    country_counts = None
+    for batch in parquet_file.iter_batches(batch_size=batch_size,
+                                           columns=[get_country_column(file_columns)] + columns):
+        country_counts = merge_counts([country_counts, aggregate_group_frame(batch.to_pandas(), aggregators)])
+    
+    return merge_counts([country_counts]), aggregators
+
+def scan_country_groups(file_path, chunksize=None, workers=None, specs=()):
+    """
+    ファイルを1回だけ走査して、国別の件数と国ごとの集計項目（統計量・分位数など）を集計する
+    
+    チャンクやワーカーごとの部分的な結果は集計オブジェクトの merge() で統合するため、
+    メモリ使用量は行数ではなく国の種類数に比例する（チャンク単位の読み込み時）。
+    
+    Args:
+        file_path: CSVファイルまたはParquetファイルのパス
+        chunksize: 指定した場合はこの行数ごとのチャンク単位で読み込む（CSVのみ）
+        workers: 2以上を指定した場合はバイト範囲に分割して並列に集計する（CSVのみ）
+        specs: 国ごとの集計項目の指定（get_group_aggregator_specs() の戻り値）
+        
+    Returns:
+        tuple: (国別の件数, {項目名: 集計オブジェクト})（「国コード」カラムの場合は国コード別）
+        
+    Raises:
+        KeyError: ファイルに必要なカラムが存在しない場合
+        ValueError: 無効なチャンクサイズが指定された場合
+    """
+    if get_input_format(file_path) == 'parquet':
+        return aggregate_groups_parquet(file_path, specs)
+    
+    aggregators = create_group_aggregators(specs)
+    columns = get_group_columns(aggregators)
+    check_group_columns(read_csv_columns(file_path), columns)
+    
+    if workers is not None and workers > 1:
+        return aggregate_groups_parallel(file_path, workers, specs)
+    
+    if chunksize is None:
+        return aggregate_group_frame(read_group_columns(file_path, columns), aggregators), aggregators
+    
+    if chunksize <= 0:
+        raise ValueError("チャンクサイズは1以上の整数を指定してください")
+    country_counts = None
+    for chunk in read_group_columns(file_path, columns, chunksize=chunksize):
+        country_counts = merge_counts([country_counts, aggregate_group_frame(chunk, aggregators)])
+    return merge_counts([country_counts]), aggregators
+
+def count_csv_light(file_path):
+    """
+    pandas を使わずに、標準ライブラリの csv モジュールで国別の件数を集計する
+    
+    小さなファイルでは pandas のインポートが実行時間の大半を占めるため、その時間を省く。
+    pandas と同じ集計結果になることを保証できないファイル（空のファイル、集計対象の行がないファイル、
+    列数がヘッダーより多い行があるファイル、UTF-8として読めないファイル）の場合はNoneを返すため、
+    呼び出し元で pandas による集計に切り替えること。
+    
+    Args:
+        file_path: CSVファイルのパス
+        
+    Returns:
+        dict: {国名（または国コード）: 件数} の形式の集計結果（pandas で集計すべき場合はNone）
+        
+    Raises:
+        KeyError: CSVファイルに「国」カラムが存在しない場合
+    """
+    country_counts = {}
+    try:
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header:
+                return None
+            column_index = header.index(get_country_column(header))
             
-            # 結果を表示（地域別）
-            display_region_results(ordered_region_counts, region_counts)
+            for row in reader:
+                if len(row) > len(header):
+                    return None
+                # 空行と列数が足りない行は pandas と同様に欠損値として扱う
+                if len(row) <= column_index or row[column_index] in PANDAS_NA_VALUES:
+                    continue
+                country = row[column_index]
+                country_counts[country] = country_counts.get(country, 0) + 1
+    except (UnicodeDecodeError, csv.Error):
+        return None
+    
+    return country_counts or None
+
+def rollup_light_counts(country_counts):
+    """
+    csv モジュールで集計した結果から、pandas を使わずに表示用の国別・地域別集計結果を求める
+    
+    国コードの国名への置き換えと地域への集約は、resolve_country_names() と
+    rollup_country_counts() と同じマスタデータ・同じ規則で行う。
+    
+    Args:
+        country_counts: {国名（または国コード）: 件数} の形式の集計結果
         
-    except FileNotFoundError:
-        print(f"エラー: ファイル '{file_path}' が見つかりません")
+    Returns:
+        tuple: (国別集計結果の辞書, 地域別集計結果の辞書（マッピングが取得できない場合は空）)
+    """
+    country_code_map = get_country_code_map()
+    named_counts = {}
+    for country, count in country_counts.items():
+        name = country_code_map.get(country, country)
+        named_counts[name] = named_counts.get(name, 0) + count
+    
+    country_region_map = get_country_region_map()
+    if not country_region_map:
+        print("警告: 国と地域のマッピングが取得できませんでした。地域別集計はスキップします。")
+        return named_counts, {}
+    
+    region_counts = {}
+    for country, count in sorted(named_counts.items(), key=lambda item: -item[1]):
+        region = country_region_map.get(country, 'その他')
+        region_counts[region] = region_counts.get(region, 0) + count
+    return named_counts, region_counts
+
+def load_light_counts(file_path, cache=None):
+    """
+    pandas を使わずに、単一のCSVファイルの国別の件数を集計する（キャッシュがあれば使用する）
+    
+    Args:
+        file_path: CSVファイルのパス
+        cache: ファイル単位の集計結果のキャッシュ（ResultCache、Noneの場合は使用しない）
+        
+    Returns:
+        dict: {国名（または国コード）: 件数} の形式の集計結果（pandas で集計すべき場合はNone）
+        
+    Raises:
+        KeyError: CSVファイルに「国」カラムが存在しない場合
+    """
+    state = get_cache_state(cache, file_path)
+    country_counts = cache.get(file_path, state=state) if cache is not None else None
+    if not country_counts:
+        country_counts = count_csv_light(file_path)
+        if country_counts is not None and cache is not None:
+            cache.put(file_path, country_counts, state=state)
+    return country_counts
+
+def aggregate_with_column_cache(file_path, chunksize=None):
+    """
+    列キャッシュ（辞書と符号配列）を使って国別の件数を集計する
+    
+    有効な列キャッシュがあればCSVファイルを解析せずに、メモリマップした符号配列を
+    bincount で数える。ない場合はCSVファイルを走査して列キャッシュを作成する。
+    
+    Args:
+        file_path: CSVファイルのパス
+        chunksize: 列キャッシュを作成する際の1チャンクあたりの行数
+        
+    Returns:
+        pd.Series: 国別の集計結果
+        
+    Raises:
+        KeyError: CSVファイルに「国」カラムが存在しない場合
+    """
+    # 「国」カラムの存在確認
+    country_column = get_country_column(read_csv_columns(file_path))
+    
+    cached = load_column_codes(file_path, country_column)
+    if cached is None:
+        try:
+            if chunksize is None:
+                cached = build_column_cache(file_path, [country_column])[country_column]
+            else:
+                cached = build_column_cache(file_path, [country_column], chunksize)[country_column]
+        except OSError as e:
+            # キャッシュを書き込めない場合は通常どおり集計する
+            print(f"警告: 列キャッシュを作成できませんでした: {str(e)}")
+            return scan_country_counts(file_path, chunksize)
+    
+    return count_column_codes(*cached).rename_axis(country_column)
+
+def resolve_input_paths(inputs):
+    """
+    入力指定（ファイルパス、globパターン、ディレクトリ）を集計対象のファイルパスに展開する
+    
+    Args:
+        inputs: ファイルパス、globパターン（例: 'data/*.csv'）、ディレクトリのリスト
+        
+    Returns:
+        list: 重複を除いたファイルパスのリスト（ディレクトリ・globは名前順に展開する）
+    """
+    file_paths = []
+    for input_path in inputs:
+        if os.path.isdir(input_path):
+            # ディレクトリの場合は直下のCSVファイルとParquetファイルを対象にする
+            file_paths.extend(sorted(path for pattern in DIRECTORY_INPUT_PATTERNS
+                                     for path in glob.glob(os.path.join(input_path, pattern))))
+        elif glob.has_magic(input_path):
+            file_paths.extend(sorted(path for path in glob.glob(input_path) if os.path.isfile(path)))
+        else:
+            # 通常のパスはそのまま対象にする（存在しない場合は集計時にエラーとなる）
+            file_paths.append(input_path)
+    
+    return list(dict.fromkeys(file_paths))
+
+def get_cache_state(cache, file_path):
+    """
+    キャッシュキーに使うファイルの状態を取得する（取得と保存で使い回し、内容のハッシュ値の計算を1回にする）
+    
+    Args:
+        cache: ResultCache（Noneの場合はキャッシュを使用しない）
+        file_path: ファイルのパス
+        
+    Returns:
+        tuple: ResultCache.file_state() の戻り値（キャッシュを使用しない場合はNone）
+    """
+    return cache.file_state(file_path) if cache is not None else None
+
+def create_cache_states(cache):
+    """
+    ファイルごとのキャッシュキーの状態を1回だけ取得する関数を作成する（scan_files() の取得と保存で共有する）
+    
+    Args:
+        cache: ResultCache（Noneの場合はキャッシュを使用しない）
+        
+    Returns:
+        function: ファイルパスを受け取り、get_cache_state() の戻り値を返す関数
+    """
+    states = {}
+    
+    def get_state(file_path):
+        if file_path not in states:
+            states[file_path] = get_cache_state(cache, file_path)
+        return states[file_path]
+    return get_state
+
+def load_cached_counts(cache, file_path, state=None):
+    """
+    キャッシュからファイル単位の国別集計結果を取得する
+    
+    Args:
+        cache: ResultCache（Noneの場合はキャッシュを使用しない）
+        file_path: CSVファイルのパス
+        state: get_cache_state() で取得したファイルの状態（Noneの場合はキャッシュが取得する）
+        
+    Returns:
+        pd.Series: 国別の集計結果（キャッシュにない場合はNone）
+    """
+    if cache is None:
+        return None
+    
+    cached = cache.get(file_path, state=state)
+    if cached is None:
+        return None
+    return merge_counts([pd.Series(cached, dtype='int64')])
+
+def store_cached_counts(cache, file_path, country_counts, state=None):
+    """
+    ファイル単位の国別集計結果をキャッシュに保存する
+    
+    Args:
+        cache: ResultCache（Noneの場合は何もしない）
+        file_path: CSVファイルのパス
+        country_counts: 国別の集計結果
+        state: get_cache_state() で取得したファイルの状態（Noneの場合はキャッシュが取得する）
+    """
+    if cache is not None:
+        cache.put(file_path, {str(country): int(count) for country, count in country_counts.items()}, state=state)
+
+def get_group_cache_kind(kind, options):
+    """
+    国ごとの集計項目をキャッシュに保存する際の種類を取得する
+    
+    Args:
+        kind: 項目名
+        options: 集計クラスのコンストラクタ引数の辞書（異なる引数の結果は別に保存する）
+        
+    Returns:
+        str: ResultCache の集計結果の種類
+    """
+    if not options:
+        return f'country_{kind}'
+    return f'country_{kind}:' + json.dumps(options, sort_keys=True, ensure_ascii=False)
+
+def load_cached_groups(cache, file_path, specs, state=None):
+    """
+    キャッシュからファイル単位の国別の件数と国ごとの集計項目を取得する
+    
+    Args:
+        cache: ResultCache（Noneの場合はキャッシュを使用しない）
+        file_path: ファイルのパス
+        specs: 国ごとの集計項目の指定
+        state: get_cache_state() で取得したファイルの状態（Noneの場合はキャッシュが取得する）
+        
+    Returns:
+        tuple: (国別の件数, {項目名: 集計オブジェクト})（いずれかがキャッシュにない場合はNone）
+    """
+    country_counts = load_cached_counts(cache, file_path, state)
+    if country_counts is None:
+        return None
+    
+    aggregators = {}
+    for kind, options in specs:
+        cached = cache.get(file_path, kind=get_group_cache_kind(kind, options), state=state)
+        if cached is None:
+            return None
+        aggregators[kind] = GROUP_AGGREGATORS[kind].from_dict(cached)
+    return country_counts, aggregators
+
+def store_cached_groups(cache, file_path, specs, scanned, state=None):
+    """
+    ファイル単位の国別の件数と国ごとの集計項目をキャッシュに保存する
+    
+    Args:
+        cache: ResultCache（Noneの場合は何もしない）
+        file_path: ファイルのパス
+        specs: 国ごとの集計項目の指定
+        scanned: scan_country_groups() の戻り値
+        state: get_cache_state() で取得したファイルの状態（Noneの場合はキャッシュが取得する）
+    """
+    if cache is None:
+        return
+    country_counts, aggregators = scanned
+    store_cached_counts(cache, file_path, country_counts, state)
+    for kind, options in specs:
+        cache.put(file_path, aggregators[kind].to_dict(), kind=get_group_cache_kind(kind, options), state=state)
+
+def scan_files(file_paths, scan_function, workers=None, chunksize=None, load_cached=None, store_cached=None):
+    """
+    複数のファイルをファイル単位で並列に走査し、ファイルごとの集計結果を返す
+    
+    サイズの大きいファイルから順にワーカーへ割り当て、終盤に大きなファイルだけが
+    残って他のワーカーが遊休状態になることを避ける。
+    
+    Args:
+        file_paths: ファイルパスのリスト
+        scan_function: 1ファイルを集計する関数（file_path, chunksize を受け取る、ワーカープロセスで実行する）
+        workers: ワーカープロセス数（省略時はCPUコア数、1の場合は逐次処理）
+        chunksize: 指定した場合は各ファイルをこの行数ごとのチャンク単位で読み込む
+        load_cached: キャッシュから集計結果を取得する関数（file_path を受け取り、ない場合はNoneを返す）
+        store_cached: 集計結果をキャッシュに保存する関数（file_path と集計結果を受け取る）
+        
+    Returns:
+        dict: {ファイルパス: 集計結果}（入力順）
+        
+    Raises:
+        ValueError: 無効なワーカー数が指定された場合
+        Exception: いずれかのファイルの集計に失敗した場合（file_path属性に失敗したファイルを設定する）
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 0:
+        raise ValueError("ワーカー数は1以上の整数を指定してください")
+    
+    # 存在しないファイルは集計を始める前に検出する
+    for file_path in file_paths:
+        if not os.path.exists(file_path):
+            error = FileNotFoundError(f"ファイル '{file_path}' が見つかりません")
+            error.file_path = file_path
+            raise error
+    
+    # キャッシュにあるファイルは走査しない
+    results = {}
+    if load_cached is not None:
+        for file_path in file_paths:
+            cached = load_cached(file_path)
+            if cached is not None:
+                results[file_path] = cached
+    
+    # 残りのファイルを大きい順に処理する
+    schedule = sorted((file_path for file_path in file_paths if file_path not in results),
+                      key=os.path.getsize, reverse=True)
+    
+    if workers == 1 or len(schedule) <= 1:
+        for file_path in schedule:
+            try:
+                results[file_path] = scan_function(file_path, chunksize)
+            except Exception as e:
+                e.file_path = file_path
+                raise
+            if store_cached is not None:
+                store_cached(file_path, results[file_path])
+    else:
+        with concurrent_futures.ProcessPoolExecutor(max_workers=min(workers, len(schedule))) as executor:
+            futures = {file_path: executor.submit(scan_function, file_path, chunksize)
+                       for file_path in schedule}
+            for file_path, future in futures.items():
+                try:
+                    results[file_path] = future.result()
+                except Exception as e:
+                    e.file_path = file_path
+                    raise
+                if store_cached is not None:
+                    store_cached(file_path, results[file_path])
+    
+    # 入力順に並べ直して返す
+    return {file_path: results[file_path] for file_path in file_paths}
+
+def aggregate_files(file_paths, workers=None, chunksize=None, cache=None):
+    """
+    複数のCSVファイルをファイル単位で並列に集計し、結果を統合する
+    
+    サイズの大きいファイルから順にワーカーへ割り当て、終盤に大きなファイルだけが
+    残って他のワーカーが遊休状態になることを避ける。
+    キャッシュを指定した場合は、新規または変更されたファイルのみを走査する。
+    
+    Args:
+        file_paths: CSVファイルパスのリスト
+        workers: ワーカープロセス数（省略時はCPUコア数、1の場合は逐次処理）
+        chunksize: 指定した場合は各ファイルをこの行数ごとのチャンク単位で読み込む
+        cache: ファイル単位の集計結果のキャッシュ（ResultCache）
+        
+    Returns:
+        tuple: (統合した国別の集計結果, {ファイルパス: 国別の集計結果})
+        
+    Raises:
+        ValueError: 無効なワーカー数が指定された場合
+        Exception: いずれかのファイルの集計に失敗した場合（file_path属性に失敗したファイルを設定する）
+    """
+    state = create_cache_states(cache)
+    file_counts = scan_files(file_paths, scan_country_counts, workers, chunksize,
+                             lambda file_path: load_cached_counts(cache, file_path, state(file_path)),
+                             lambda file_path, counts: store_cached_counts(cache, file_path, counts,
+                                                                           state(file_path)))
+    return merge_counts(list(file_counts.values())), file_counts
+
+def aggregate_group_files(file_paths, specs, workers=None, chunksize=None, cache=None):
+    """
+    複数のファイルを国ごとにファイル単位で並列に集計し、結果を統合する
+    
+    Args:
+        file_paths: ファイルパスのリスト
+        specs: 国ごとの集計項目の指定
+        workers: ワーカープロセス数（省略時はCPUコア数、1の場合は逐次処理）
+        chunksize: 指定した場合は各ファイルをこの行数ごとのチャンク単位で読み込む
+        cache: ファイル単位の集計結果のキャッシュ（ResultCache）
+        
+    Returns:
+        tuple: (統合した国別の件数, {ファイルパス: 国別の件数}, 統合した {項目名: 集計オブジェクト})
+        
+    Raises:
+        ValueError: 無効なワーカー数が指定された場合
+        Exception: いずれかのファイルの集計に失敗した場合（file_path属性に失敗したファイルを設定する）
+    """
+    state = create_cache_states(cache)
+    file_results = scan_files(file_paths, partial(scan_country_groups, specs=specs), workers, chunksize,
+                              lambda file_path: load_cached_groups(cache, file_path, specs, state(file_path)),
+                              lambda file_path, scanned: store_cached_groups(cache, file_path, specs, scanned,
+                                                                             state(file_path)))
+    
+    aggregators = create_group_aggregators(specs)
+    for _, file_groups in file_results.values():
+        merge_group_aggregators(aggregators, file_groups)
+    file_counts = {file_path: counts for file_path, (counts, _) in file_results.items()}
+    return merge_counts(list(file_counts.values())), file_counts, aggregators
+
+def rollup_master_regions(country_counts, master):
+    """
+    国別の集計結果を、マスタデータの国の番号から地域の番号への対応表を使って地域別に集約する
+    
+    国名は国の種類数分だけ番号に変換し、地域への集約は番号の配列の演算で行う。
+    結果は rollup_level() と同じく、マスタデータにない国を「その他」に分類し、件数の降順
+    （同数の場合は最初に出現した順）に並べる。
+    
+    Args:
+        country_counts: 国別集計結果（pd.Series）
+        master: マスタデータ（CountryRegionMaster）
+        
+    Returns:
+        pd.Series: 地域別集計結果
+    """
+    country_counts = pd.Series(country_counts, dtype='int64')
+    if country_counts.empty:
+        return pd.Series(dtype='int64')
+    
+    # マスタデータにない国は「その他」の番号（地域名に「その他」がない場合は末尾の番号）に割り当てる
+    region_names = list(master.region_names)
+    if 'その他' not in region_names:
+        region_names.append('その他')
+    country_index = master.encode_country_names(country_counts.index.to_numpy(dtype=object))
+    region_index = np.full(len(country_index), region_names.index('その他'), dtype=np.intp)
+    known = country_index >= 0
+    region_index[known] = master.lookup_region_index(country_index[known])
+    
+    region_totals = np.zeros(len(region_names), dtype=np.int64)
+    np.add.at(region_totals, region_index, country_counts.to_numpy())
+    _, first_positions = np.unique(region_index, return_index=True)
+    order = region_index[np.sort(first_positions)]
+    region_counts = pd.Series(region_totals[order], index=[region_names[i] for i in order], dtype='int64')
+    return region_counts.sort_values(ascending=False, kind='stable')
+
+def map_grouping_set_regions(grouping_sets, country_region_map):
+    """
+    組み合わせごとの行数の地域の軸に保持している国を、地域に置き換える
+    
+    マッピングが取得できない場合に国名を地域として表示しないよう、地域の軸を含む組み合わせは
+    警告を表示して集計結果から除外する。
+    
+    Args:
+        grouping_sets: 国名に変換した組み合わせごとの行数（GroupingSets）
+        country_region_map: {国名: 地域名} の形式の辞書（空の場合は地域の軸を含む組み合わせを除外する）
+        
+    Returns:
+        GroupingSets: 変換後の集計結果（すべての組み合わせを除外した場合はNone）
+    """
+    if country_region_map:
+        return grouping_sets.map_regions(country_region_map)
+    
+    indices = [index for index, dimensions in enumerate(grouping_sets.sets) if REGION_DIMENSION not in dimensions]
+    if len(indices) == len(grouping_sets.sets):
+        return grouping_sets
+    skipped = "、".join("×".join(format_dimension_label(spec) for spec in dimensions)
+                       for dimensions in grouping_sets.sets if REGION_DIMENSION in dimensions)
+    print(f"警告: 国と地域のマッピングが取得できないため、{skipped} の組み合わせの集計はスキップします。")
+    return grouping_sets.select(indices) if indices else None
+
+def rollup_country_counts(country_counts, country_region_map=None):
+    """
+    国別の集計結果から、マスタデータの階層に従って地域別の集計結果を求める
+    
+    Args:
+        country_counts: 国別集計結果
+        country_region_map: 国と地域のマッピング辞書 {国名: 地域名}（省略時はマスタデータの
+                            国と地域の番号の対応表を使用）
+        
+    Returns:
+        pd.Series: 地域別集計結果（マッピングが取得できない場合は空）
+    """
+    if country_region_map is None:
+        country_region_map = get_country_region_map()
+        if country_region_map:
+            return rollup_master_regions(country_counts, load_master())
+    if not country_region_map:
+        print("警告: 国と地域のマッピングが取得できませんでした。地域別集計はスキップします。")
+        return pd.Series(dtype='int64')
+    
+    (_, region_counts), _ = rollup_counts(country_counts, [country_region_map])
+    return region_counts
+
+def display_report(country_counts, region_counts):
+    """
+    国別・地域別の集計結果を所定の順序に並び替えて表示する
+    
+    Args:
+        country_counts: 国別集計結果
+        region_counts: 地域別集計結果（空の場合は地域別の表示を省略する）
+        
+    Returns:
+        None
+    """
+    # 表全体を1つの文字列に組み立ててから、1回の書き込みで出力する
+    sys.stdout.write(render_text(CountResult(country_counts, region_counts)))
+
+class CountResult:
+    """
+    国別・地域別の集計結果
+    
+    表示順に並べた国別・地域別の件数、総計、ファイル別の件数、処理時間を保持する。
+    統計量・分位数・重複を除いた件数を集計した場合は、それらの国別・地域別の集計結果も保持する。
+    軸の組み合わせごとの行数を数えた場合は、組み合わせごとの行数も保持する。
+    表示形式（テキスト・JSON・CSV）への変換は render_result() で行うため、
+    プログラムから利用する場合は文字列の整形を行わずに件数を参照できる。
+    """
+    
+    def __init__(self, country_counts, region_counts, file_counts=None, timings=None, engine='pandas',
+                 country_stats=None, region_stats=None, country_quantiles=None, region_quantiles=None,
+                 percentiles=DEFAULT_PERCENTILES, country_distinct=None, region_distinct=None, grouping_sets=None):
+        """
+        Args:
+            country_counts: 国別集計結果（pd.Series または dict）
+            region_counts: 地域別集計結果（pd.Series または dict、地域別集計を行わない場合は空）
+            file_counts: {ファイルパス: 国別集計結果} の形式の辞書
+            timings: {処理の段階: 処理時間（秒）} の形式の辞書
+            engine: 集計に使用したエンジン（"pandas" または "csv"）
+            country_stats: 国別の統計量（GroupStats、統計量を集計しない場合はNone）
+            region_stats: 地域別の統計量（GroupStats、地域別集計を行わない場合はNone）
+            country_quantiles: 国別の分位数のスケッチ（GroupQuantiles、分位数を集計しない場合はNone）
+            region_quantiles: 地域別の分位数のスケッチ（GroupQuantiles、地域別集計を行わない場合はNone）
+            percentiles: 求めるパーセンタイル（0〜100）のリスト
+            country_distinct: 国別の重複を除いた件数（GroupDistinct、集計しない場合はNone）
+            region_distinct: 地域別の重複を除いた件数（GroupDistinct、地域別集計を行わない場合はNone）
+            grouping_sets: 軸の組み合わせごとの行数（GroupingSets、集計しない場合はNone）
+        """
+        self.country_counts = {country: int(count) for country, count in
+                               create_ordered_counts(country_counts, get_ordered_countries(country_counts)).items()}
+        self.region_counts = {region: int(count) for region, count in
+                              create_ordered_region_counts(region_counts, get_ordered_regions(region_counts)).items()}
+        self.total = sum(self.country_counts.values())
+        self.file_totals = {str(path): int(sum(dict(counts).values())) for path, counts in (file_counts or {}).items()}
+        self.timings = dict(timings or {})
+        self.engine = engine
+        self.country_stats = None if country_stats is None else \
+            {country: country_stats.summary(country) for country in self.country_counts}
+        self.region_stats = None if region_stats is None else \
+            {region: region_stats.summary(region) for region in self.region_counts}
+        self.percentiles = list(percentiles)
+        self.country_quantiles = None if country_quantiles is None else \
+            {country: country_quantiles.summary(country, self.percentiles) for country in self.country_counts}
+        self.region_quantiles = None if region_quantiles is None else \
+            {region: region_quantiles.summary(region, self.percentiles) for region in self.region_counts}
+        self.distinct_columns = [] if country_distinct is None else country_distinct.columns
+        self.distinct_error = 0.0 if country_distinct is None else country_distinct.standard_error
+        self.country_distinct = None if country_distinct is None else \
+            {country: country_distinct.summary(country) for country in self.country_counts}
+        self.region_distinct = None if region_distinct is None else \
+            {region: region_distinct.summary(region) for region in self.region_counts}
+        self.grouping_sets = None if grouping_sets is None else \
+            [{'group_by': dimensions, 'rows': grouping_sets.summary(index)}
+             for index, dimensions in enumerate(grouping_sets.sets)]
+    
+    def to_dict(self):
+        """
+        JSONに変換可能な辞書に変換する
+        
+        Returns:
+            dict: 集計結果
+        """
+        result = {
+            'total': self.total,
+            'countries': self.country_counts,
+            'regions': self.region_counts,
+            'files': self.file_totals,
+            'timings': self.timings,
+            'engine': self.engine,
+        }
+        if self.country_stats is not None:
+            result['stats'] = {'countries': self.country_stats, 'regions': self.region_stats or {}}
+        if self.country_quantiles is not None:
+            # JSONのキーは "p50" の形式にする
+            result['quantiles'] = {
+                level: {group: {column: {format_percentile_label(percentile): value
+                                         for percentile, value in values.items()}
+                                for column, values in summary.items()}
+                        for group, summary in (group_quantiles or {}).items()}
+                for level, group_quantiles in [('countries', self.country_quantiles),
+                                               ('regions', self.region_quantiles)]
+            }
+        if self.country_distinct is not None:
+            result['distinct'] = {'countries': self.country_distinct, 'regions': self.region_distinct or {},
+                                  'standard_error': self.distinct_error}
+        if self.grouping_sets is not None:
+            result['grouping_sets'] = [
+                {'group_by': grouping_set['group_by'],
+                 'rows': [dict(zip(grouping_set['group_by'], values), count=count)
+                          for values, count in grouping_set['rows']]}
+                for grouping_set in self.grouping_sets
+            ]
+        return result
+
+def aggregate_report(file_path, chunksize=None, workers=None, cache=None, column_cache=False,
+                     light_max_bytes=DEFAULT_LIGHT_MAX_BYTES, profiler=NULL_PROFILER, stats=False,
+                     percentiles=None, sketch_k=DEFAULT_KLL_K, distinct_columns=None,
+                     hll_precision=DEFAULT_HLL_PRECISION, distinct_exact=False, grouping_sets=None):
+    """
+    ファイルを国別・地域別に集計し、集計結果を返す（表示は行わない）
+    
+    Args:
+        file_path: CSVファイル（またはParquetファイル）のパス、または複数のファイルパスのリスト
+        chunksize: 指定した場合はこの行数ごとのチャンク単位で読み込むストリーミングモードで集計する
+        workers: 2以上を指定した場合は複数プロセスで並列に集計する
+        cache: ファイル単位の集計結果のキャッシュ（ResultCache、Noneの場合は使用しない）
+        column_cache: Trueの場合は単一のCSVファイルの「国」カラムを列キャッシュから集計する
+        light_max_bytes: 単一のCSVファイルがこのサイズ以下の場合は pandas を使わずに集計する
+        profiler: 処理段階（scan・resolve・rollup）ごとの計測に使用するプロファイラ
+        stats: Trueの場合は件数と同じ1回の走査で、国別・地域別の STATS_COLUMNS の統計量も集計する
+        percentiles: 指定した場合は同じ走査で、国別・地域別の STATS_COLUMNS のパーセンタイル（0〜100）を
+                     KLLスケッチで近似する
+        sketch_k: KLLスケッチの精度パラメータ（大きいほど誤差が小さく、国ごとのメモリ使用量が大きい）
+        distinct_columns: 指定した場合は同じ走査で、国別・地域別にこれらのカラムの重複を除いた件数を
+                          HyperLogLog で推定する
+        hll_precision: HyperLogLog の精度（レジスタ数は 2^精度、標準誤差は約 1.04 / √(2^精度)）
+        distinct_exact: Trueの場合は重複を除いた件数を推定せずに正確に数える（メモリ使用量は件数に比例する）
+        grouping_sets: 指定した場合は同じ走査で、軸の組み合わせごとの行数も数える（軸は「国」「地域」、
+                       カラム名、または「年齢:10」のように数値カラムを幅で区切る指定）
+        
+    Returns:
+        CountResult: 集計結果
+    
+    Raises:
+        FileNotFoundError: ファイルが存在しない場合
+        KeyError: ファイルに「国」カラム（統計量の集計時は STATS_COLUMNS のカラム）が存在しない場合
+        ValueError: 国ごとの集計項目（統計量・分位数・重複を除いた件数・組み合わせごとの行数）と
+                    列キャッシュを同時に指定した場合、または範囲外のパーセンタイル・精度、
+                    不正な集計の軸が指定された場合
+        pd.errors.EmptyDataError: CSVファイルが空の場合
+        pd.errors.ParserError: CSVファイルの形式が不正な場合
+    """
+    specs = get_group_aggregator_specs(stats, percentiles, sketch_k, distinct_columns, hll_precision, distinct_exact,
+                                       grouping_sets)
+    if specs and column_cache:
+        raise ValueError("統計量・分位数・重複を除いた件数・組み合わせごとの行数の集計は列キャッシュと同時に指定できません")
+    
+    start = time.perf_counter()
+    single_file = isinstance(file_path, (str, os.PathLike))
+    country_groups = region_groups = {}
+    
+    # 小さなCSVファイルは pandas をインポートせずに集計する
+    use_light = not specs and single_file and get_input_format(file_path) == 'csv' and \
+        not column_cache and chunksize is None and (workers is None or workers <= 1) and \
+        os.path.getsize(file_path) <= light_max_bytes
+    
+    # 行データの走査は国別集計の1回のみ行い、地域別は国別の集計結果から導出する
+    with profiler.phase('scan') as phase:
+        light_counts = load_light_counts(file_path, cache) if use_light else None
+        if light_counts is not None:
+            country_counts = light_counts
+            file_counts = {file_path: country_counts}
+        elif specs:
+            # 件数と国ごとの集計項目は同じ1回の走査で集計する
+            if single_file:
+                state = get_cache_state(cache, file_path)
+                scanned = load_cached_groups(cache, file_path, specs, state)
+                if scanned is None:
+                    scanned = scan_country_groups(file_path, chunksize, workers, specs)
+                    store_cached_groups(cache, file_path, specs, scanned, state)
+                country_counts, country_groups = scanned
+                file_counts = {file_path: country_counts}
+            else:
+                country_counts, file_counts, country_groups = aggregate_group_files(file_path, specs, workers,
+                                                                                    chunksize, cache)
+        elif single_file and column_cache and get_input_format(file_path) == 'csv':
+            country_counts = aggregate_with_column_cache(file_path, chunksize)
+            file_counts = {file_path: country_counts}
+        elif single_file:
+            state = get_cache_state(cache, file_path)
+            country_counts = load_cached_counts(cache, file_path, state)
+            if country_counts is None:
+                country_counts = scan_country_counts(file_path, chunksize, workers)
+                store_cached_counts(cache, file_path, country_counts, state)
+            file_counts = {file_path: country_counts}
+        else:
+            country_counts, file_counts = aggregate_files(file_path, workers, chunksize, cache)
+        if profiler.enabled:
+            phase.rows = sum(dict(country_counts).values())
+    scanned = time.perf_counter()
+    
+    # 国コードで集計した結果は、表示の直前にマスタデータの国名に置き換える
+    if light_counts is not None:
+        with profiler.phase('rollup'):
+            country_counts, region_counts = rollup_light_counts(country_counts)
+    else:
+        with profiler.phase('resolve'):
+            country_counts = resolve_country_names(country_counts)
+            if country_groups:
+                country_code_map = get_country_code_map()
+                country_groups = {kind: aggregator.map_groups(country_code_map)
+                                  for kind, aggregator in country_groups.items()}
+        with profiler.phase('rollup'):
+            region_counts = rollup_country_counts(country_counts)
+            country_region_map = get_country_region_map() if country_groups else {}
+            if country_region_map:
+                region_groups = {kind: aggregator.map_groups(country_region_map, default='その他')
+                                 for kind, aggregator in country_groups.items() if kind != 'grouping_sets'}
+            if 'grouping_sets' in country_groups:
+                country_groups = dict(country_groups, grouping_sets=map_grouping_set_regions(
+                    country_groups['grouping_sets'], country_region_map))
+    
+    timings = {'scan': scanned - start, 'rollup': time.perf_counter() - scanned}
+    timings['total'] = timings['scan'] + timings['rollup']
+    return CountResult(country_counts, region_counts, file_counts, timings,
+                       engine='csv' if light_counts is not None else 'pandas',
+                       country_stats=country_groups.get('stats'), region_stats=region_groups.get('stats'),
+                       country_quantiles=country_groups.get('quantiles'),
+                       region_quantiles=region_groups.get('quantiles'),
+                       percentiles=percentiles or DEFAULT_PERCENTILES,
+                       country_distinct=country_groups.get('distinct'),
+                       region_distinct=region_groups.get('distinct'),
+                       grouping_sets=country_groups.get('grouping_sets'))
+
+def render_text(result, show_per_file=False):
+    """
+    集計結果を表示用のテキストに変換する（count_by_country の従来の表示と同じ形式）
+    
+    Args:
+        result: 集計結果（CountResult）
+        show_per_file: Trueの場合はファイル別の件数も含める
+    
+    Returns:
+        str: 表示用のテキスト
+    """
+    sections = [format_result_lines('【国別集計結果】', result.country_counts)]
+    if result.region_counts:
+        sections.append(format_result_lines('【地域別集計結果】', result.region_counts))
+    if show_per_file:
+        sections.append(format_result_lines('【ファイル別集計結果】', result.file_totals))
+    if result.country_stats is not None:
+        for column in STATS_COLUMNS:
+            sections.append(format_stats_lines(f'【国別統計量：{column}】', '国', result.country_stats, column))
+            if result.region_stats:
+                sections.append(format_stats_lines(f'【地域別統計量：{column}】', '地域', result.region_stats, column))
+    if result.country_quantiles is not None:
+        for column in STATS_COLUMNS:
+            sections.append(format_quantile_lines(f'【国別分位数：{column}】', '国', result.country_quantiles,
+                                                  column, result.percentiles))
+            if result.region_quantiles:
+                sections.append(format_quantile_lines(f'【地域別分位数：{column}】', '地域', result.region_quantiles,
+                                                      column, result.percentiles))
+    if result.country_distinct is not None:
+        # 推定値の場合は見出しに標準誤差を示す
+        note = f'（推定値、標準誤差 約{result.distinct_error:.1%}）' if result.distinct_error else ''
+        sections.append(format_distinct_lines(f'【国別ユニーク数】{note}', '国', result.country_distinct,
+                                              result.distinct_columns))
+        if result.region_distinct:
+            sections.append(format_distinct_lines(f'【地域別ユニーク数】{note}', '地域', result.region_distinct,
+                                                  result.distinct_columns))
+    if result.grouping_sets is not None:
+        for grouping_set in result.grouping_sets:
+            sections.append(format_grouping_set_lines(grouping_set['group_by'], grouping_set['rows']))
+    
+    # 結果の間には空行を2行入れる
+    return "\n\n\n".join("\n".join(lines) for lines in sections) + "\n"
+
+def render_json(result, show_per_file=False):
+    """
+    集計結果をJSON形式に変換する（ファイル別の件数と処理時間を常に含める）
+    
+    Args:
+        result: 集計結果（CountResult）
+        show_per_file: 使用しない（他の表示形式と引数を揃えるため）
+    
+    Returns:
+        str: JSON形式の文字列
+    """
+    return json.dumps(result.to_dict(), ensure_ascii=False, indent=2) + "\n"
+
+def render_csv(result, show_per_file=False):
+    """
+    集計結果を「区分,名前,件数」のCSV形式に変換する（統計量・分位数・重複を除いた件数は含めない）
+    
+    軸の組み合わせごとの行数は、区分を「地域×年齢:10」、名前を「アジア・20〜29」のように軸の値を
+    つなげた形式で含める。
+    
+    Args:
+        result: 集計結果（CountResult）
+        show_per_file: Trueの場合はファイル別の件数も含める
+    
+    Returns:
+        str: CSV形式の文字列
+    """
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(["区分", "名前", "件数"])
+    writer.writerows(["国", country, count] for country, count in result.country_counts.items())
+    writer.writerows(["地域", region, count] for region, count in result.region_counts.items())
+    writer.writerow(["合計", "", result.total])
+    for grouping_set in result.grouping_sets or []:
+        writer.writerows(["×".join(grouping_set['group_by']), "・".join(map(str, values)), count]
+                         for values, count in grouping_set['rows'])
+    if show_per_file:
+        writer.writerows(["ファイル", path, count] for path, count in result.file_totals.items())
+    return output.getvalue()
+
+# 集計結果の表示形式と変換関数（新しい形式はこの辞書に登録する）
+RENDERERS = {
+    'text': render_text,
+    'json': render_json,
+    'csv': render_csv,
+}
+
+def render_result(result, output_format='text', show_per_file=False):
+    """
+    集計結果を指定した表示形式の文字列に変換する
+    
+    Args:
+        result: 集計結果（CountResult）
+        output_format: 表示形式（RENDERERS に登録した形式）
+        show_per_file: Trueの場合はファイル別の件数も含める
+    
+    Returns:
+        str: 変換した文字列
+    
+    Raises:
+        ValueError: 登録されていない表示形式が指定された場合
+    """
+    if output_format not in RENDERERS:
+        raise ValueError(f"表示形式は {list(RENDERERS)} のいずれかを指定してください")
+    return RENDERERS[output_format](result, show_per_file=show_per_file)
+
+def print_report(file_path, aggregate, render, profiler=NULL_PROFILER):
+    """
+    集計を行って結果を表示する（集計方法ごとのコマンドで共通の処理）
+    
+    集計中に発生したエラーは、対象のファイルを含むメッセージとして表示する。
+    
+    Args:
+        file_path: 集計対象のファイルのパス、または複数のファイルパスのリスト（エラーメッセージと計測結果に使用する）
+        aggregate: 集計を行い、集計結果を返す関数
+        render: 集計結果を表示用の文字列に変換する関数
+        profiler: 処理段階ごとの計測に使用するプロファイラ（計測結果は処理の終了時に出力する）
+    """
+    try:
+        result = aggregate()
+        
+        # 結果を表示
+        with profiler.phase('render'):
+            output = render(result)
+        with profiler.phase('write'):
+            sys.stdout.write(output)
+        
+    except FileNotFoundError as e:
+        print(f"エラー: ファイル '{getattr(e, 'file_path', file_path)}' が見つかりません")
     except KeyError as e:
         print(f"エラー: {str(e)}")
-    except pd.errors.EmptyDataError:
-        print(f"エラー: ファイル '{file_path}' は空です")
-    except pd.errors.ParserError:
-        print(f"エラー: ファイル '{file_path}' はCSV形式として解析できません")
+    except pd.errors.EmptyDataError as e:
+        print(f"エラー: ファイル '{getattr(e, 'file_path', file_path)}' は空です")
+    except pd.errors.ParserError as e:
+        print(f"エラー: ファイル '{getattr(e, 'file_path', file_path)}' はCSV形式として解析できません")
+    except ValueError as e:
+        print(f"エラー: {str(e)}")
     except Exception as e:
         print(f"予期せぬエラーが発生しました: {str(e)}")
+    
+    # 計測結果を出力（計測が無効な場合は何もしない）
+    single_file = isinstance(file_path, (str, os.PathLike))
+    profiler.emit(inputs=[str(file_path)] if single_file else [str(path) for path in file_path])
 
+def count_by_country(file_path, output_format='text', show_per_file=False, profiler=NULL_PROFILER, **options):
+    """
+    CSVファイルを読み込み、国別と地域別の件数を集計して表示する
+    
+    集計結果をプログラムから利用する場合は aggregate_report() を使用すること。
+    上位の値の集計は top_k モジュール、追記型CSVの増分集計と監視は incremental モジュールで行う。
+    
+    Args:
+        file_path: CSVファイル（またはParquetファイル）のパス、または複数のファイルパスのリスト
+        output_format: 表示形式（"text"、"json"、"csv"）
+        show_per_file: Trueの場合はファイル別の件数も表示する
+        profiler: 処理段階ごとの計測に使用するプロファイラ（計測結果は処理の終了時に出力する）
+        **options: aggregate_report() に渡す集計の指定（chunksize・workers・cache・column_cache・
+                   light_max_bytes・stats・percentiles・sketch_k・distinct_columns・hll_precision・
+                   distinct_exact・grouping_sets）
+        
+    Returns:
+        None
+    """
+    print_report(file_path,
+                 lambda: aggregate_report(file_path, profiler=profiler, **options),
+                 lambda result: render_result(result, output_format, show_per_file),
+                 profiler)
+
+def add_input_arguments(parser, description):
+    """
+    集計方法ごとのコマンドで共通の、入力ファイルと走査方法のコマンドライン引数を追加する
+    
+    Args:
+        parser: argparse.ArgumentParser
+        description: 入力ファイルの説明
+    """
+    parser.add_argument('inputs', nargs='*',
+                        default=[os.path.join("resources", "csv", "sample_data.csv")],
+                        help=f'{description} (デフォルト: resources/csv/sample_data.csv)')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='指定した行数ごとにチャンク単位で読み込み、メモリ使用量を抑えて集計する')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='並列集計に使用するプロセス数 (デフォルト: 単一ファイルは並列化しない、'
+                             '複数ファイルはCPUコア数のプロセスでファイルごとに並列に集計する)')
+    parser.add_argument('--cache-dir', type=str, default=DEFAULT_CACHE_DIR,
+                        help=f'ファイル別集計結果のキャッシュディレクトリ (デフォルト: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='ファイル別集計結果のキャッシュを使用しない')
+    parser.add_argument('--cache-hash', action='store_true',
+                        help='キャッシュのキーにファイル内容のハッシュ値を含める（更新日時が信頼できない場合）')
+
+def add_profile_arguments(parser):
+    """
+    集計方法ごとのコマンドで共通の、処理段階ごとの計測のコマンドライン引数を追加する
+    
+    Args:
+        parser: argparse.ArgumentParser
+    """
+    parser.add_argument('--profile', type=str, nargs='?', const='-', default=None, metavar='出力先',
+                        help='処理段階ごとの実行時間・CPU時間・処理行数・ピークメモリを1行のJSONで出力する '
+                             '(出力先を省略した場合は標準エラー出力、環境変数 PANDAS_STATS_PROFILE でも指定可)')
+    parser.add_argument('--profile-tracemalloc', action='store_true', default=None,
+                        help='--profile の計測に tracemalloc によるPythonオブジェクトのピークメモリを含める')
+
+def check_input_arguments(args, file_paths):
+    """
+    add_input_arguments() で追加したコマンドライン引数を検証する
+    
+    Args:
+        args: 解析したコマンドライン引数
+        file_paths: 入力指定を展開したファイルパスのリスト
+        
+    Returns:
+        str: エラーメッセージ（問題がない場合はNone）
+    """
+    if not file_paths:
+        return "エラー: 集計対象のCSVファイルが見つかりません"
+    if args.chunksize is not None and args.chunksize <= 0:
+        return "エラー: チャンクサイズは1以上の整数を指定してください"
+    if args.workers is not None and args.workers <= 0:
+        return "エラー: ワーカー数は1以上の整数を指定してください"
+    return None
+
+def create_result_cache(args):
+    """
+    add_input_arguments() で追加したコマンドライン引数から、ファイル単位の集計結果のキャッシュを作成する
+    
+    Args:
+        args: 解析したコマンドライン引数
+        
+    Returns:
+        ResultCache: キャッシュ（--no-cache を指定した場合はNone）
+    """
+    return None if args.no_cache else ResultCache(args.cache_dir, use_content_hash=args.cache_hash)
 
 if __name__ == "__main__":
     try:
-        # プロジェクトのルートディレクトリからの相対パス
-        file_path = os.path.join("resources", "csv", "sample_data.csv")
+        # コマンドラインからパラメータを受け取る
+        parser = argparse.ArgumentParser(description='CSVファイルを国別・地域別に集計します。')
+        add_input_arguments(parser, '集計するCSV/Parquetファイル、globパターン、またはディレクトリ')
+        parser.add_argument('--per-file', action='store_true',
+                            help='ファイル別の件数も表示する')
+        parser.add_argument('--column-cache', action='store_true',
+                            help='CSVファイルの「国」カラムを列キャッシュ（辞書と符号配列）としてファイルの隣に保存し、'
+                                 '次回以降はCSVを解析せずに集計する')
+        parser.add_argument('--format', type=str, choices=list(RENDERERS), default='text',
+                            help='出力形式 (text: 整形した表, json: JSON形式, csv: 「区分,名前,件数」のCSV形式) '
+                                 '(デフォルト: text)')
+        parser.add_argument('--stats', action='store_true',
+                            help='国別・地域別に「スコア」と「年齢」の件数・平均・標準偏差・最小・最大も集計する（件数と同じ1回の走査で集計）')
+        parser.add_argument('--percentiles', type=float, nargs='*', default=None, metavar='P',
+                            help='国別・地域別に「スコア」と「年齢」のパーセンタイルの近似値も集計する '
+                                 f'(値を省略した場合は {" ".join(map(str, DEFAULT_PERCENTILES))})')
+        parser.add_argument('--sketch-k', type=int, default=DEFAULT_KLL_K,
+                            help=f'パーセンタイルの近似に使用するKLLスケッチの精度パラメータ (デフォルト: {DEFAULT_KLL_K}、'
+                                 '大きいほど誤差が小さい)')
+        parser.add_argument('--distinct', type=str, nargs='*', default=None, metavar='カラム',
+                            help='国別・地域別に指定したカラムの重複を除いた件数を HyperLogLog で推定する '
+                                 f'(カラムを省略した場合は {" ".join(DISTINCT_COLUMNS)})')
+        parser.add_argument('--hll-precision', type=int, default=DEFAULT_HLL_PRECISION,
+                            help=f'--distinct の推定に使用する HyperLogLog の精度 (デフォルト: {DEFAULT_HLL_PRECISION}、'
+                                 '4〜18、大きいほど誤差が小さい)')
+        parser.add_argument('--distinct-exact', action='store_true',
+                            help='--distinct の件数を推定せずに正確に数える（メモリ使用量は件数に比例する）')
+        parser.add_argument('--group-by', type=str, action='append', default=None, metavar='軸[,軸...]',
+                            help='指定した軸の組み合わせごとの行数も同じ1回の走査で数える（複数回指定可）。'
+                                 '軸は「国」「地域」、カラム名、または「年齢:10」のように数値カラムを幅で区切る指定 '
+                                 '(例: --group-by 名前 --group-by 地域,年齢:10)')
+        parser.add_argument('--light-max-bytes', type=int, default=DEFAULT_LIGHT_MAX_BYTES,
+                            help='このサイズ（バイト）以下のCSVファイルは pandas を使わずに csv モジュールで集計する '
+                                 f'(デフォルト: {DEFAULT_LIGHT_MAX_BYTES}、0で無効)')
+        add_profile_arguments(parser)
+        args = parser.parse_args()
         
-        # ファイルの存在確認
-        if not os.path.exists(file_path):
-            print(f"エラー: ファイル '{file_path}' が見つかりません")
+        # 入力指定を集計対象のファイルに展開する
+        file_paths = resolve_input_paths(args.inputs)
+        error = check_input_arguments(args, file_paths)
+        
+        if error is not None:
+            print(error)
+        elif (args.stats or args.percentiles is not None or args.distinct is not None or args.group_by) and \
+                args.column_cache:
+            print("エラー: --stats・--percentiles・--distinct・--group-by は --column-cache と同時に指定できません")
+        elif (args.stats or args.percentiles is not None or args.distinct is not None) and args.format == 'csv':
+            print("エラー: --stats・--percentiles・--distinct は --format csv と同時に指定できません")
+        elif args.sketch_k < 2:
+            print("エラー: --sketch-k は2以上の整数を指定してください")
         else:
-            count_by_country(file_path)
+            # 単一ファイルはそのまま、複数ファイルはリストとして集計する
+            target = file_paths[0] if len(file_paths) == 1 else file_paths
+            count_by_country(target, output_format=args.format, show_per_file=args.per_file,
+                             profiler=create_profiler('count_by_country', args.profile, args.profile_tracemalloc),
+                             chunksize=args.chunksize, workers=args.workers, cache=create_result_cache(args),
+                             column_cache=args.column_cache, light_max_bytes=args.light_max_bytes,
+                             stats=args.stats,
+                             percentiles=DEFAULT_PERCENTILES if args.percentiles == [] else args.percentiles,
+                             sketch_k=args.sketch_k,
+                             distinct_columns=DISTINCT_COLUMNS if args.distinct == [] else args.distinct,
+                             hll_precision=args.hll_precision, distinct_exact=args.distinct_exact,
+                             grouping_sets=[group_by.split(',') for group_by in args.group_by or []])
     except Exception as e:
         print(f"プログラムの実行中にエラーが発生しました: {str(e)}")
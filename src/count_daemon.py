@@ -0,0 +1,387 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import socket
+import asyncio
+import argparse
+from collections import OrderedDict
+
+try:
+    from src.lazy_import import LazyModule
+    from src.count_by_country import (
+        get_country_region_map,
+        get_input_format,
+        scan_country_counts,
+        aggregate_with_column_cache,
+        resolve_input_paths,
+        merge_counts,
+        resolve_country_names,
+        rollup_country_counts,
+        CountResult,
+        RENDERERS,
+        render_result
+    )
+except ImportError:
+    # スクリプトとして直接実行された場合
+    from lazy_import import LazyModule
+    from count_by_country import (
+        get_country_region_map,
+        get_input_format,
+        scan_country_counts,
+        aggregate_with_column_cache,
+        resolve_input_paths,
+        merge_counts,
+        resolve_country_names,
+        rollup_country_counts,
+        CountResult,
+        RENDERERS,
+        render_result
+    )
+
+# 起動時間を短縮するため、pandas は使用する時点でインポートする
+pd = LazyModule('pandas')
+
+# デフォルトのUnixソケットのパス（プロジェクトのルートディレクトリからの相対パス）
+DEFAULT_SOCKET_PATH = os.path.join(".cache", "count_daemon.sock")
+
+# 応答の形式（count_by_country の表示形式。"json" の場合は件数のみを応答する）
+OUTPUT_FORMATS = list(RENDERERS)
+
+# メモリに保持するファイル単位の集計結果の最大数（超えた場合は最も古く使われたものから破棄する）
+DEFAULT_MAX_RESULTS = 256
+
+def get_file_signature(file_path):
+    """
+    ファイルの変更を検出するための、ファイルのサイズと更新日時を取得する
+    
+    Args:
+        file_path: ファイルのパス
+    
+    Returns:
+        tuple: (サイズ, 更新日時（ナノ秒）)
+    
+    Raises:
+        FileNotFoundError: ファイルが存在しない場合
+    """
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+def format_error(e, file_path):
+    """
+    集計中に発生した例外を、count_by_country と同じ形式のエラーメッセージに変換する
+    
+    Args:
+        e: 発生した例外
+        file_path: 集計していたファイルのパス
+    
+    Returns:
+        str: エラーメッセージ
+    """
+    if isinstance(e, FileNotFoundError):
+        return f"エラー: ファイル '{file_path}' が見つかりません"
+    if isinstance(e, KeyError):
+        return f"エラー: {str(e)}"
+    if isinstance(e, pd.errors.EmptyDataError):
+        return f"エラー: ファイル '{file_path}' は空です"
+    if isinstance(e, pd.errors.ParserError):
+        return f"エラー: ファイル '{file_path}' はCSV形式として解析できません"
+    return f"予期せぬエラーが発生しました: {str(e)}"
+
+class CountDaemon:
+    """
+    国別・地域別の集計要求に応答する常駐サーバー
+    
+    ファイル単位の国別集計結果をメモリに保持し、ファイルのサイズと更新日時が変わらない限り
+    再走査せずに応答する。同じファイルに対する同時の要求は1回の走査にまとめる。
+    """
+    
+    def __init__(self, use_column_cache=False, max_results=DEFAULT_MAX_RESULTS):
+        """
+        Args:
+            use_column_cache: Trueの場合はCSVファイルを列キャッシュ（辞書と符号配列）から集計する
+            max_results: メモリに保持するファイル単位の集計結果の最大数
+        """
+        self.use_column_cache = use_column_cache
+        self.max_results = max_results
+        self.results = OrderedDict()  # {絶対パス: (ファイルのサイズと更新日時, 国別の集計結果)}（使用順）
+        self.in_flight = {}  # {(絶対パス, ファイルのサイズと更新日時): 走査中のFuture}
+        self.num_scans = 0
+        self.shutdown_event = None
+    
+    def warm_up(self):
+        """
+        pandas とマスタデータを読み込んでおき、最初の要求から短時間で応答できるようにする
+        """
+        pd.Series(dtype='int64')
+        get_country_region_map()
+    
+    def scan_file(self, file_path):
+        """
+        ファイルを走査して国別の件数を集計する（スレッドプールで実行する）
+        
+        Args:
+            file_path: ファイルのパス
+        
+        Returns:
+            pd.Series: 国別の集計結果
+        """
+        if self.use_column_cache and get_input_format(file_path) == 'csv':
+            return aggregate_with_column_cache(file_path)
+        return scan_country_counts(file_path)
+    
+    async def get_counts(self, file_path):
+        """
+        ファイル単位の国別集計結果を取得する（保持している結果が古い場合のみ走査する）
+        
+        Args:
+            file_path: ファイルのパス
+        
+        Returns:
+            pd.Series: 国別の集計結果
+        """
+        key = os.path.abspath(file_path)
+        signature = get_file_signature(file_path)
+        cached = self.results.get(key)
+        if cached is not None and cached[0] == signature:
+            self.results.move_to_end(key)
+            return cached[1]
+        
+        # 走査中の同じファイルがあれば、その結果を待つ
+        future = self.in_flight.get((key, signature))
+        if future is None:
+            self.num_scans += 1
+            future = asyncio.get_running_loop().run_in_executor(None, self.scan_file, file_path)
+            self.in_flight[(key, signature)] = future
+            future.add_done_callback(lambda done: self._finish_scan(key, signature, done))
+        
+        # 要求元の接続が切れても、他の要求元のために走査は継続する
+        return await asyncio.shield(future)
+    
+    def _finish_scan(self, key, signature, future):
+        self.in_flight.pop((key, signature), None)
+        if not future.cancelled() and future.exception() is None:
+            self.results[key] = (signature, future.result())
+            self.results.move_to_end(key)
+            
+            # 上限を超えた場合は最も古く使われた結果から破棄する（LRU）
+            while len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+    
+    async def count(self, inputs, output_format="text"):
+        """
+        ファイルの国別・地域別集計結果を求め、応答を作成する
+        
+        Args:
+            inputs: ファイルパス・globパターン・ディレクトリのリスト
+            output_format: 応答の形式（"json": 件数のみ、その他: count_by_country の同じ形式の表示も含める）
+        
+        Returns:
+            dict: 応答
+        """
+        if not isinstance(inputs, list) or not inputs or not all(isinstance(path, str) for path in inputs):
+            return {'ok': False, 'error': "エラー: files には集計対象のパスの文字列を1つ以上リストで指定してください"}
+        if not isinstance(output_format, str) or output_format not in OUTPUT_FORMATS:
+            return {'ok': False, 'error': f"エラー: 応答の形式は {OUTPUT_FORMATS} のいずれかを指定してください"}
+        
+        file_paths = resolve_input_paths(inputs)
+        if not file_paths:
+            return {'ok': False, 'error': "エラー: 集計対象のCSVファイルが見つかりません"}
+        
+        results = await asyncio.gather(*(self.get_counts(file_path) for file_path in file_paths),
+                                       return_exceptions=True)
+        for file_path, result in zip(file_paths, results):
+            if isinstance(result, Exception):
+                return {'ok': False, 'error': format_error(result, file_path)}
+        
+        country_counts = resolve_country_names(merge_counts(results))
+        result = CountResult(country_counts, rollup_country_counts(country_counts), dict(zip(file_paths, results)))
+        
+        response = {
+            'ok': True,
+            'total': result.total,
+            'countries': result.country_counts,
+            'regions': result.region_counts,
+            'files': result.file_totals,
+        }
+        if output_format != "json":
+            response['text'] = render_result(result, output_format)
+        return response
+    
+    async def handle_request(self, line):
+        """
+        1行のJSON形式の要求を処理する
+        
+        Args:
+            line: 要求（{"command": "count", "files": [...], "format": "text"} など）
+        
+        Returns:
+            dict: 応答
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {'ok': False, 'error': "エラー: 要求をJSON形式として解析できません"}
+        if not isinstance(request, dict):
+            return {'ok': False, 'error': "エラー: 要求はJSONのオブジェクトで指定してください"}
+        
+        # 1つの要求の失敗で接続やデーモンが終了しないよう、予期せぬ例外もエラーとして応答する
+        try:
+            command = request.get('command', 'count')
+            if command == 'count':
+                return await self.count(request.get('files'), request.get('format', 'text'))
+            if command == 'shutdown':
+                if self.shutdown_event is not None:
+                    self.shutdown_event.set()
+                return {'ok': True}
+            return {'ok': False, 'error': f"エラー: 不明なコマンドです: {command}"}
+        except Exception as e:
+            return {'ok': False, 'error': f"予期せぬエラーが発生しました: {str(e)}"}
+    
+    async def handle_client(self, reader, writer):
+        """
+        接続ごとに、1行ずつ要求を読み込んで応答する
+        
+        Args:
+            reader: 接続の読み込み側（asyncio.StreamReader）
+            writer: 接続の書き込み側（asyncio.StreamWriter）
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self.handle_request(line)
+                writer.write((json.dumps(response, ensure_ascii=False) + "\n").encode('utf-8'))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    
+    async def serve(self, socket_path=DEFAULT_SOCKET_PATH, ready=None):
+        """
+        Unixソケットで要求を待ち受け、shutdown コマンドを受け取るまで応答を続ける
+        
+        Args:
+            socket_path: 待ち受けるUnixソケットのパス
+            ready: 待ち受けを開始したときに呼び出す関数
+        """
+        self.shutdown_event = asyncio.Event()
+        self.warm_up()
+        
+        os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+        if os.path.exists(socket_path):
+            # 前回異常終了したときのソケットファイルを削除する
+            os.remove(socket_path)
+        
+        server = await asyncio.start_unix_server(self.handle_client, path=socket_path)
+        try:
+            if ready is not None:
+                ready()
+            await self.shutdown_event.wait()
+        finally:
+            server.close()
+            await server.wait_closed()
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+
+def query_daemon(inputs, socket_path=DEFAULT_SOCKET_PATH, output_format="text"):
+    """
+    集計デーモンに集計を要求する（クライアント）
+    
+    Args:
+        inputs: ファイルパス・globパターン・ディレクトリのリスト（デーモン側で絶対パスとして解釈する）
+        socket_path: 集計デーモンのUnixソケットのパス
+        output_format: 応答の形式（OUTPUT_FORMATS のいずれか）
+    
+    Returns:
+        dict: 応答
+    
+    Raises:
+        OSError: 集計デーモンに接続できない場合
+    """
+    request = {'command': 'count', 'files': [os.path.abspath(path) for path in inputs], 'format': output_format}
+    return send_request(request, socket_path)
+
+def send_request(request, socket_path=DEFAULT_SOCKET_PATH):
+    """
+    集計デーモンに1つの要求を送信し、応答を受け取る
+    
+    Args:
+        request: 要求
+        socket_path: 集計デーモンのUnixソケットのパス
+    
+    Returns:
+        dict: 応答
+    
+    Raises:
+        OSError: 集計デーモンに接続できない場合
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(request, ensure_ascii=False) + "\n").encode('utf-8'))
+        with sock.makefile('rb') as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError("集計デーモンから応答がありません")
+    return json.loads(line)
+
+
+if __name__ == "__main__":
+    try:
+        # コマンドラインからパラメータを受け取る
+        parser = argparse.ArgumentParser(description='国別・地域別の集計結果に応答する常駐サーバーとクライアントです。')
+        parser.add_argument('--socket', type=str, default=DEFAULT_SOCKET_PATH,
+                            help=f'集計デーモンのUnixソケットのパス (デフォルト: {DEFAULT_SOCKET_PATH})')
+        subparsers = parser.add_subparsers(dest='command', required=True)
+        
+        serve_parser = subparsers.add_parser('serve', help='集計デーモンを起動する')
+        serve_parser.add_argument('--column-cache', action='store_true',
+                                  help='CSVファイルを列キャッシュ（辞書と符号配列）から集計する')
+        serve_parser.add_argument('--max-results', type=int, default=DEFAULT_MAX_RESULTS,
+                                  help=f'メモリに保持するファイル単位の集計結果の最大数 (デフォルト: {DEFAULT_MAX_RESULTS})')
+        
+        query_parser = subparsers.add_parser('query', help='集計デーモンに集計を要求する')
+        query_parser.add_argument('inputs', nargs='*',
+                                  default=[os.path.join("resources", "csv", "sample_data.csv")],
+                                  help='集計するCSV/Parquetファイル、globパターン、またはディレクトリ '
+                                       '(デフォルト: resources/csv/sample_data.csv)')
+        query_parser.add_argument('--format', type=str, choices=OUTPUT_FORMATS, default="text",
+                                  help='出力形式 (デフォルト: text)')
+        
+        subparsers.add_parser('shutdown', help='集計デーモンを停止する')
+        args = parser.parse_args()
+        
+        if args.command == 'serve':
+            daemon = CountDaemon(use_column_cache=args.column_cache, max_results=args.max_results)
+            try:
+                asyncio.run(daemon.serve(args.socket,
+                                         ready=lambda: print(f"集計デーモンを起動しました: {args.socket}")))
+            except KeyboardInterrupt:
+                print("\n集計デーモンを停止しました")
+        else:
+            try:
+                if args.command == 'query':
+                    response = query_daemon(args.inputs, args.socket, args.format)
+                else:
+                    response = send_request({'command': 'shutdown'}, args.socket)
+            except OSError:
+                print(f"エラー: 集計デーモン（{args.socket}）に接続できません。"
+                      "python src/count_daemon.py serve で起動してください")
+                sys.exit(1)
+            
+            if not response.get('ok'):
+                print(response.get('error'))
+                sys.exit(1)
+            if args.command == 'query' and args.format != 'json':
+                print(response['text'], end='')
+            elif args.command == 'query':
+                print(json.dumps({key: value for key, value in response.items() if key != 'ok'},
+                                 ensure_ascii=False, indent=2))
+            else:
+                print("集計デーモンを停止しました")
+    except Exception as e:
+        print(f"プログラムの実行中にエラーが発生しました: {str(e)}")
@@ -2,183 +2,604 @@ import csv
 import random
 import argparse
 import os
-import pandas as pd
+import shutil
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 
-def load_country_region_map(file_path=None):
+try:
+    from src.master_data import load_master
+    from src.profiling import create_profiler, NULL_PROFILER
+except ImportError:
+    # スクリプトとして直接実行された場合
+    from master_data import load_master
+    from profiling import create_profiler, NULL_PROFILER
+
+# サンプルデータのヘッダーと各項目の値の範囲
+HEADERS = ["ID", "名前", "年齢", "国", "スコア"]
+NAMES = ["太郎", "花子", "次郎", "美咲", "健一"]
+# テストで期待される国のリスト
+COUNTRIES = ["日本", "アメリカ", "ドイツ", "インド", "カナダ"]
+MIN_AGE = 18
+MAX_AGE = 60
+
+# 生成エンジン
+ENGINES = ["numpy", "python"]
+
+# 出力形式と、形式を判定するファイルの拡張子
+FORMATS = ["csv", "parquet"]
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+# 国の出力形式（"name": 「国」カラムに国名、"code": 「国コード」カラムに国コード）
+COUNTRY_FORMATS = ["name", "code"]
+
+# 国の分布（"uniform": 各国が同じ確率、"skewed": 先頭の国ほど出現しやすい偏った分布）
+COUNTRY_DISTRIBUTIONS = ["uniform", "skewed"]
+
+# "skewed" の場合の COUNTRIES の各国の出現確率
+SKEWED_COUNTRY_WEIGHTS = [0.70, 0.15, 0.08, 0.05, 0.02]
+
+# NumPyエンジンで一度に生成する行数
+NUMPY_BATCH_SIZE = 100000
+
+# 進捗状況を表示する間隔（行数）
+PROGRESS_INTERVAL = 100000
+
+def import_pyarrow():
+    """
+    Parquet形式の読み書きに使用する pyarrow をインポートする
+    
+    Returns:
+        tuple: (pyarrow モジュール, pyarrow.parquet モジュール)
+        
+    Raises:
+        ImportError: pyarrow がインストールされていない場合
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet形式を扱うには pyarrow をインストールしてください（pip install pyarrow）")
+    return pa, pq
+
+def get_output_format(file_name, file_format=None):
     """
-    国と地域のマッピングをマスタデータからロードする
+    出力形式を決定する（指定がない場合はファイルの拡張子から判定する）
     
     Args:
-        file_path: マスタデータのCSVファイルのパス（省略時はデフォルトのパスを使用）
+        file_name: 出力ファイルのパス
+        file_format: 出力形式（"csv" または "parquet"）
         
     Returns:
-        dict: 国名をキー、地域名を値とする辞書
+        str: 出力形式
+        
+    Raises:
+        ValueError: 無効な出力形式が指定された場合
     """
-    if file_path is None:
-        # デフォルトのファイルパス
-        file_path = os.path.join("resources", "master", "country_region_map.csv")
+    if file_format is None:
+        return "parquet" if file_name.lower().endswith(PARQUET_EXTENSIONS) else "csv"
+    if file_format not in FORMATS:
+        raise ValueError(f"出力形式は {FORMATS} のいずれかを指定してください")
+    return file_format
+
+def get_country_codes():
+    """
+    COUNTRIES の各国に対応する国コードをマスタデータから取得する
     
-    try:
-        # CSVファイルからマスタデータを読み込む
-        master_df = pd.read_csv(file_path)
+    集計側と同じマスタデータの国コードと国名の対応を逆引きするため、マスタデータを
+    変更しても集計時に同じ国名に戻る国コードを出力する。
+    
+    Returns:
+        list: COUNTRIES の各国の国コードのリスト
         
-        # 必要なカラムが存在するか確認
-        required_columns = ["国名", "地域名"]
-        if not all(col in master_df.columns for col in required_columns):
-            print(f"警告: マスタファイル '{file_path}' には必要なカラムが不足しています")
-            return get_default_country_region_map()
+    Raises:
+        KeyError: マスタデータに COUNTRIES の国が存在しない場合
+    """
+    country_codes = {name: code for code, name in load_master().country_code_map.items()}
+    missing_countries = [country for country in COUNTRIES if country not in country_codes]
+    if missing_countries:
+        raise KeyError(f"マスタデータに国 {missing_countries} が存在しません")
+    return [country_codes[country] for country in COUNTRIES]
+
+def get_country_columns(country_format="name"):
+    """
+    国の出力形式に応じたヘッダーと国の値のリストを取得する
+    
+    Args:
+        country_format: 国の出力形式（"name" または "code"）
         
-        # 国名と地域名のマッピング辞書を作成
-        country_region_map = dict(zip(master_df["国名"], master_df["地域名"]))
-        return country_region_map
+    Returns:
+        tuple: (ヘッダーのリスト, 国の値のリスト)
+        
+    Raises:
+        ValueError: 無効な出力形式が指定された場合
+        KeyError: 国コード形式でマスタデータに COUNTRIES の国が存在しない場合
+    """
+    if country_format not in COUNTRY_FORMATS:
+        raise ValueError(f"国の出力形式は {COUNTRY_FORMATS} のいずれかを指定してください")
+    if country_format == "code":
+        return [("国コード" if header == "国" else header) for header in HEADERS], get_country_codes()
+    return HEADERS, COUNTRIES
+
+def get_country_weights(country_distribution="uniform"):
+    """
+    国の分布に応じた各国の出現確率を取得する
     
-    except Exception as e:
-        print(f"警告: マスタファイル '{file_path}' の読み込みに失敗しました: {str(e)}")
-        # マスタファイルの読み込みに失敗した場合はデフォルトのマッピングを返す
-        return get_default_country_region_map()
+    Args:
+        country_distribution: 国の分布（"uniform" または "skewed"）
+        
+    Returns:
+        list: COUNTRIES の各国の出現確率（"uniform" の場合はNone）
+        
+    Raises:
+        ValueError: 無効な分布が指定された場合
+    """
+    if country_distribution not in COUNTRY_DISTRIBUTIONS:
+        raise ValueError(f"国の分布は {COUNTRY_DISTRIBUTIONS} のいずれかを指定してください")
+    return SKEWED_COUNTRY_WEIGHTS if country_distribution == "skewed" else None
+
+def build_row_tables(names=NAMES, countries=COUNTRIES):
+    """
+    NumPyエンジンで使用する、各項目のCSV表現（バイト列）の対応表を作成する
+    
+    名前・年齢・国の組み合わせは数が少ないため、組み合わせごとに「,名前,年齢,国,」の
+    バイト列をあらかじめ作成しておき、行ごとの文字列処理をなくす。
+    スコアは0.01刻みの値（0.0〜100.0）を、Pythonの round(x, 2) と同じ表記で用意する。
+    
+    Args:
+        names: 名前のリスト
+        countries: 国名のリスト
+        
+    Returns:
+        tuple: (名前・年齢・国の組み合わせのバイト列の配列, スコアと改行のバイト列の配列)
+    """
+    middle_fields = np.array([f",{name},{age},{country},".encode('utf-8')
+                              for name in names
+                              for age in range(MIN_AGE, MAX_AGE + 1)
+                              for country in countries], dtype=object)
+    score_fields = np.array([f"{round(cents / 100, 2)}\r\n".encode('utf-8') for cents in range(10001)],
+                            dtype=object)
+    return middle_fields, score_fields
+
+def format_ids(start_id, end_id):
+    """
+    連番のIDをCSV表現（バイト列）に変換する
+    
+    IDを上位桁と下3桁に分け、それぞれ対応表から引くことで、
+    行ごとの数値から文字列への変換をなくす。
+    
+    Args:
+        start_id: 先頭のID
+        end_id: 末尾のID（このIDを含む）
+        
+    Returns:
+        tuple: (上位桁のバイト列の配列, 下3桁のバイト列の配列)
+    """
+    ids = np.arange(start_id, end_id + 1)
+    high, low = np.divmod(ids, 1000)
+    
+    # 上位桁はバッチ内で値の種類が少ないため、出現する範囲分だけ変換する
+    high_min = int(high[0])
+    high_fields = np.array([str(value).encode('ascii') if value else b''
+                            for value in range(high_min, int(high[-1]) + 1)], dtype=object)
+    low_padded = np.array([f"{value:03d}".encode('ascii') for value in range(1000)], dtype=object)
+    low_plain = np.array([str(value).encode('ascii') for value in range(1000)], dtype=object)
+    
+    return high_fields[high - high_min], np.where(high > 0, low_padded[low], low_plain[low])
+
+def draw_rows_numpy(rng, size, country_weights=None):
+    """
+    NumPyの乱数生成器で、名前・年齢・国・スコアを指定した行数分まとめて選ぶ
+    
+    Args:
+        rng: 乱数生成器（np.random.Generator）
+        size: 行数
+        country_weights: 各国の出現確率（Noneの場合は同じ確率）
+        
+    Returns:
+        tuple: (名前の番号, 年齢の番号, 国の番号, スコア（0.01単位の整数）) の配列
+    """
+    name_index = rng.integers(0, len(NAMES), size)
+    age_index = rng.integers(0, MAX_AGE - MIN_AGE + 1, size)
+    if country_weights is None:
+        country_index = rng.integers(0, len(COUNTRIES), size)
+    else:
+        country_index = rng.choice(len(COUNTRIES), size, p=country_weights)
+    score_cents = rng.integers(0, 10001, size)
+    return name_index, age_index, country_index, score_cents
+
+def generate_rows_numpy(rng, start_id, end_id, row_tables, country_weights=None):
+    """
+    NumPyの乱数生成器で指定したID範囲の行をまとめて生成し、CSVのバイト列にする
+    
+    Args:
+        rng: 乱数生成器（np.random.Generator）
+        start_id: 先頭のID
+        end_id: 末尾のID（このIDを含む）
+        row_tables: build_row_tables() で作成した対応表
+        country_weights: 各国の出現確率（Noneの場合は同じ確率）
+        
+    Returns:
+        bytes: 生成した行のCSVデータ
+    """
+    middle_fields, score_fields = row_tables
+    num_ages = MAX_AGE - MIN_AGE + 1
+    name_index, age_index, country_index, score_cents = draw_rows_numpy(rng, end_id - start_id + 1,
+                                                                        country_weights)
+    
+    middle_index = (name_index * num_ages + age_index) * len(COUNTRIES) + country_index
+    id_high, id_low = format_ids(start_id, end_id)
+    
+    # 行ごとに各項目を並べ、文字列の連結を1回の join で行う
+    fields = np.column_stack([id_high, id_low, middle_fields[middle_index], score_fields[score_cents]])
+    return b''.join(fields.ravel().tolist())
 
-def get_default_country_region_map():
+def generate_table_numpy(rng, start_id, end_id, country_format="name", country_weights=None):
     """
-    デフォルトの国と地域のマッピングを定義する（マスタデータの読み込みに失敗した場合のフォールバック）
+    NumPyの乱数生成器で指定したID範囲の行をまとめて生成し、Arrowのテーブルにする
     
+    名前と国は辞書エンコーディング（値の一覧と番号の配列）で保持する。
+    
+    Args:
+        rng: 乱数生成器（np.random.Generator）
+        start_id: 先頭のID
+        end_id: 末尾のID（このIDを含む）
+        country_format: 国の出力形式（"name" または "code"）
+        country_weights: 各国の出現確率（Noneの場合は同じ確率）
+        
     Returns:
-        dict: 国名をキー、地域名を値とする辞書
-    """
-    return {
-        # アジア州
-        '日本': 'アジア',
-        '中国': 'アジア',
-        '韓国': 'アジア',
-        'インド': 'アジア',
-        'タイ': 'アジア',
-        'ベトナム': 'アジア',
-        'インドネシア': 'アジア',
-        'マレーシア': 'アジア',
-        'シンガポール': 'アジア',
-        'フィリピン': 'アジア',
-        
-        # ヨーロッパ州
-        'ドイツ': 'ヨーロッパ',
-        'フランス': 'ヨーロッパ',
-        'イギリス': 'ヨーロッパ',
-        'イタリア': 'ヨーロッパ',
-        'スペイン': 'ヨーロッパ',
-        'オランダ': 'ヨーロッパ',
-        'スイス': 'ヨーロッパ',
-        'スウェーデン': 'ヨーロッパ',
-        'ノルウェー': 'ヨーロッパ',
-        'ロシア': 'ヨーロッパ',
-        
-        # アフリカ州
-        'エジプト': 'アフリカ',
-        'ケニア': 'アフリカ',
-        '南アフリカ': 'アフリカ',
-        'モロッコ': 'アフリカ',
-        'ナイジェリア': 'アフリカ',
-        'エチオピア': 'アフリカ',
-        'ガーナ': 'アフリカ',
-        'タンザニア': 'アフリカ',
-        'アルジェリア': 'アフリカ',
-        'チュニジア': 'アフリカ',
-        
-        # 北アメリカ州
-        'アメリカ': '北アメリカ',
-        'カナダ': '北アメリカ',
-        'メキシコ': '北アメリカ',
-        'キューバ': '北アメリカ',
-        'パナマ': '北アメリカ',
-        'ジャマイカ': '北アメリカ',
-        'コスタリカ': '北アメリカ',
-        'グアテマラ': '北アメリカ',
-        
-        # 南アメリカ州
-        'ブラジル': '南アメリカ',
-        'アルゼンチン': '南アメリカ',
-        'コロンビア': '南アメリカ',
-        'チリ': '南アメリカ',
-        'ペルー': '南アメリカ',
-        'ベネズエラ': '南アメリカ',
-        'エクアドル': '南アメリカ',
-        'ボリビア': '南アメリカ',
-        
-        # オセアニア州
-        'オーストラリア': 'オセアニア',
-        'ニュージーランド': 'オセアニア',
-        'フィジー': 'オセアニア',
-        'パプアニューギニア': 'オセアニア',
-        'ソロモン諸島': 'オセアニア',
-        'バヌアツ': 'オセアニア',
-        'サモア': 'オセアニア'
-    }
-
-def generate_sample_data(file_name, num_rows):
+        pyarrow.Table: 生成した行のテーブル
+    """
+    pa, _ = import_pyarrow()
+    headers, countries = get_country_columns(country_format)
+    name_index, age_index, country_index, score_cents = draw_rows_numpy(rng, end_id - start_id + 1,
+                                                                        country_weights)
+    
+    return pa.table(dict(zip(headers, [
+        pa.array(np.arange(start_id, end_id + 1, dtype=np.int64)),
+        pa.DictionaryArray.from_arrays(name_index.astype(np.int8), NAMES),
+        pa.array(age_index + MIN_AGE),
+        pa.DictionaryArray.from_arrays(country_index.astype(np.int8), countries),
+        pa.array(score_cents / 100),
+    ])))
+
+def print_progress(start_idx, end_idx):
+    """
+    指定した範囲に含まれる進捗表示の区切り（10万件ごと）を表示する
+    
+    Args:
+        start_idx: 範囲の先頭の行番号
+        end_idx: 範囲の末尾の行番号
+    """
+    first = -(-start_idx // PROGRESS_INTERVAL) * PROGRESS_INTERVAL
+    for i in range(first, end_idx + 1, PROGRESS_INTERVAL):
+        print(f"{i}件生成済み...")
+
+def write_rows_python(file, num_rows, rand, country_format="name", country_distribution="uniform"):
+    """
+    Pythonの random モジュールで1行ずつデータを生成して書き込む
+    
+    Args:
+        file: 書き込み先のファイルオブジェクト（テキストモード）
+        num_rows: 生成するデータの行数
+        rand: 乱数生成器（random.Random）
+        country_format: 国の出力形式（"name" または "code"）
+        country_distribution: 国の分布（"uniform" または "skewed"）
+    """
+    headers, countries = get_country_columns(country_format)
+    country_weights = get_country_weights(country_distribution)
+    writer = csv.writer(file)
+    writer.writerow(headers)  # ヘッダーを書き込む
+    
+    # バッチサイズを設定して大量データの生成を効率化
+    batch_size = 10000
+    for start_idx in range(1, num_rows + 1, batch_size):
+        batch_rows = []
+        end_idx = min(start_idx + batch_size - 1, num_rows)
+        
+        for i in range(start_idx, end_idx + 1):
+            row = [
+                i,  # ID
+                rand.choice(NAMES),  # ランダムな名前
+                rand.randint(MIN_AGE, MAX_AGE),  # 年齢 (18〜60)
+                # ランダムな国
+                rand.choice(countries) if country_weights is None else rand.choices(countries, country_weights)[0],
+                round(rand.uniform(0, 100), 2),  # スコア (0〜100, 小数点2桁)
+            ]
+            batch_rows.append(row)
+        
+        # バッチ単位でまとめて書き込み
+        writer.writerows(batch_rows)
+        print_progress(start_idx, end_idx)
+
+def write_rows_numpy(file, num_rows, rng, start_id=1, write_header=True, show_progress=True,
+                     country_format="name", country_distribution="uniform"):
+    """
+    NumPyでバッチ単位にデータをまとめて生成して書き込む
+    
+    Args:
+        file: 書き込み先のファイルオブジェクト（バイナリモード）
+        num_rows: 生成するデータの行数
+        rng: 乱数生成器（np.random.Generator）
+        start_id: 先頭の行のID
+        write_header: Trueの場合はヘッダーを書き込む
+        show_progress: Trueの場合は進捗状況を表示する
+        country_format: 国の出力形式（"name" または "code"）
+        country_distribution: 国の分布（"uniform" または "skewed"）
+    """
+    headers, countries = get_country_columns(country_format)
+    country_weights = get_country_weights(country_distribution)
+    if write_header:
+        file.write((",".join(headers) + "\r\n").encode('utf-8'))  # ヘッダーを書き込む
+    
+    row_tables = build_row_tables(countries=countries)
+    end_id = start_id + num_rows - 1
+    for batch_start in range(start_id, end_id + 1, NUMPY_BATCH_SIZE):
+        batch_end = min(batch_start + NUMPY_BATCH_SIZE - 1, end_id)
+        file.write(generate_rows_numpy(rng, batch_start, batch_end, row_tables, country_weights))
+        if show_progress:
+            print_progress(batch_start - start_id + 1, batch_end - start_id + 1)
+
+def write_parquet_numpy(file_name, num_rows, rng, start_id=1, show_progress=True, country_format="name",
+                        country_distribution="uniform"):
+    """
+    NumPyでバッチ単位にデータをまとめて生成し、Parquet形式で書き込む
+    
+    Args:
+        file_name: 出力ファイルのパス
+        num_rows: 生成するデータの行数
+        rng: 乱数生成器（np.random.Generator）
+        start_id: 先頭の行のID
+        show_progress: Trueの場合は進捗状況を表示する
+        country_format: 国の出力形式（"name" または "code"）
+        country_distribution: 国の分布（"uniform" または "skewed"）
+    """
+    _, pq = import_pyarrow()
+    country_weights = get_country_weights(country_distribution)
+    end_id = start_id + num_rows - 1
+    writer = None
+    try:
+        for batch_start in range(start_id, end_id + 1, NUMPY_BATCH_SIZE):
+            batch_end = min(batch_start + NUMPY_BATCH_SIZE - 1, end_id)
+            table = generate_table_numpy(rng, batch_start, batch_end, country_format, country_weights)
+            if writer is None:
+                writer = pq.ParquetWriter(file_name, table.schema)
+            writer.write_table(table)
+            if show_progress:
+                print_progress(batch_start - start_id + 1, batch_end - start_id + 1)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def generate_sample_data(file_name, num_rows, engine="numpy", seed=None, file_format=None,
+                         country_format="name", profiler=NULL_PROFILER, country_distribution="uniform"):
     """
     指定された行数のサンプルデータを生成してCSVファイルに保存する
     
     Args:
         file_name: 生成するCSVファイルのパス
         num_rows: 生成するデータの行数
+        engine: 生成エンジン（"numpy": バッチ単位で一括生成、"python": 1行ずつ生成）
+        seed: 乱数のシード（同じシードとエンジンからは同じデータを生成する）
+        file_format: 出力形式（"csv" または "parquet"、省略時はファイルの拡張子から判定する）
+        country_format: 国の出力形式（"name": 「国」カラムに国名、
+                        "code": 「国コード」カラムにマスタデータの国コード）
+        profiler: 処理段階（generate）の計測に使用するプロファイラ
+        country_distribution: 国の分布（"uniform": 各国が同じ確率、"skewed": 先頭の国ほど出現しやすい）
         
     Raises:
-        ValueError: 無効な行数が指定された場合
+        ValueError: 無効な行数・生成エンジン・出力形式が指定された場合
         PermissionError: ファイル書き込み権限がない場合
         IOError: ファイル操作に関連する問題が発生した場合
     """
     # 入力値の検証
     if num_rows <= 0:
         raise ValueError("行数は1以上の整数を指定してください")
+    if engine not in ENGINES:
+        raise ValueError(f"生成エンジンは {ENGINES} のいずれかを指定してください")
+    file_format = get_output_format(file_name, file_format)
+    if file_format == "parquet" and engine != "numpy":
+        raise ValueError("Parquet形式はnumpyエンジンでのみ生成できます")
+    get_country_columns(country_format)
+    get_country_weights(country_distribution)
     
-    # サンプルデータのヘッダー
-    headers = ["ID", "名前", "年齢", "国", "スコア"]
-    names = ["太郎", "花子", "次郎", "美咲", "健一"]
+    print(f"{num_rows}件のサンプルデータを生成しています...")
     
-    # テストで期待される国のリスト
-    countries = ["日本", "アメリカ", "ドイツ", "インド", "カナダ"]
+    try:
+        # 親ディレクトリが存在しない場合は作成する
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+        
+        # ファイルにデータを書き込む（生成と書き込みはバッチ単位で交互に行うため、まとめて計測する）
+        with profiler.phase('generate', rows=num_rows):
+            if file_format == "parquet":
+                write_parquet_numpy(file_name, num_rows, np.random.default_rng(seed),
+                                    country_format=country_format, country_distribution=country_distribution)
+            elif engine == "numpy":
+                with open(file_name, mode="wb") as file:
+                    write_rows_numpy(file, num_rows, np.random.default_rng(seed), country_format=country_format,
+                                     country_distribution=country_distribution)
+            else:
+                with open(file_name, mode="w", newline="", encoding="utf-8") as file:
+                    write_rows_python(file, num_rows, random.Random(seed), country_format=country_format,
+                                      country_distribution=country_distribution)
+        
+        print(f"完了: {num_rows}件のデータを{file_name}に生成しました。")
+        
+    except PermissionError:
+        print(f"エラー: ファイル '{file_name}' への書き込み権限がありません")
+    except OSError as e:
+        if e.errno == 28:  # No space left on device
+            print("エラー: ディスク容量が不足しています")
+        else:
+            print(f"ファイル操作エラー: {str(e)}")
+    except Exception as e:
+        print(f"予期せぬエラーが発生しました: {str(e)}")
+
+def get_shard_ranges(num_rows, shards):
+    """
+    全行をシャードごとの連続したIDの範囲に分割する
     
-    # 国名と地域のマッピングをロード
-    country_region_map = load_country_region_map()
+    Args:
+        num_rows: 全体の行数
+        shards: シャード数
+        
+    Returns:
+        list: シャードごとの (先頭のID, 行数) のリスト
+    """
+    base_rows, remainder = divmod(num_rows, shards)
+    ranges = []
+    start_id = 1
+    for index in range(shards):
+        shard_rows = base_rows + (1 if index < remainder else 0)
+        ranges.append((start_id, shard_rows))
+        start_id += shard_rows
+    return ranges
+
+def get_shard_file_name(file_name, index, shards):
+    """
+    シャードの出力ファイル名を作成する（例: sample_data-00001-of-00004.csv）
     
-    print(f"{num_rows}件のサンプルデータを生成しています...")
+    Args:
+        file_name: 出力ファイルのパス
+        index: シャード番号（0始まり）
+        shards: シャード数
+        
+    Returns:
+        str: シャードの出力ファイルのパス
+    """
+    root, ext = os.path.splitext(file_name)
+    return f"{root}-{index:05d}-of-{shards:05d}{ext}"
+
+def generate_shard(file_name, start_id, num_rows, seed_sequence, write_header=True, country_format="name",
+                   country_distribution="uniform"):
+    """
+    1シャード分のデータを生成してファイルに保存する（並列生成のワーカー処理）
+    
+    Args:
+        file_name: 出力ファイルのパス
+        start_id: 先頭の行のID
+        num_rows: 生成する行数
+        seed_sequence: シャード専用の乱数シード（np.random.SeedSequence）
+        write_header: Trueの場合はヘッダーを書き込む
+        country_format: 国の出力形式（"name" または "code"）
+        country_distribution: 国の分布（"uniform" または "skewed"）
+        
+    Returns:
+        str: 出力ファイルのパス
+    """
+    rng = np.random.default_rng(seed_sequence)
+    if get_output_format(file_name) == "parquet":
+        write_parquet_numpy(file_name, num_rows, rng, start_id=start_id, show_progress=False,
+                            country_format=country_format, country_distribution=country_distribution)
+    else:
+        with open(file_name, mode="wb") as file:
+            write_rows_numpy(file, num_rows, rng, start_id=start_id, write_header=write_header,
+                             show_progress=False, country_format=country_format,
+                             country_distribution=country_distribution)
+    return file_name
+
+def concatenate_shards(shard_files, file_name):
+    """
+    シャードのファイルを順に連結して1つのファイルにし、シャードのファイルを削除する
+    
+    CSV形式はバイト列をそのまま連結し（ヘッダーは先頭のシャードのみに含める）、
+    Parquet形式はシャードの行グループを順に書き写す。
+    
+    Args:
+        shard_files: シャードのファイルパスのリスト
+        file_name: 連結したファイルのパス
+    """
+    if get_output_format(file_name) == "parquet":
+        _, pq = import_pyarrow()
+        writer = None
+        try:
+            for shard_file in shard_files:
+                shard = pq.ParquetFile(shard_file)
+                if writer is None:
+                    writer = pq.ParquetWriter(file_name, shard.schema_arrow)
+                for index in range(shard.num_row_groups):
+                    writer.write_table(shard.read_row_group(index))
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        with open(file_name, mode="wb") as output:
+            for shard_file in shard_files:
+                with open(shard_file, mode="rb") as shard:
+                    shutil.copyfileobj(shard, output)
+    
+    for shard_file in shard_files:
+        os.remove(shard_file)
+
+def generate_sharded_data(file_name, num_rows, shards, workers=None, seed=None, concatenate=False,
+                          country_format="name", profiler=NULL_PROFILER, country_distribution="uniform"):
+    """
+    サンプルデータをシャードに分割し、プロセスプールで並列に生成する
+    
+    各シャードは重複しない連続したIDの範囲を担当し、1つのシードから派生させた
+    シャードごとに独立した乱数列で生成する。そのため、同じシードとシャード数からは
+    ワーカー数に関係なく、バイト単位で同一の出力が得られる。
+    
+    Args:
+        file_name: 出力ファイルのパス（シャードごとのファイル名と出力形式はこのパスから決定する）
+        num_rows: 全体の行数
+        shards: シャード数
+        workers: ワーカープロセス数（省略時はCPUコア数）
+        seed: 乱数のシード
+        concatenate: Trueの場合はシャードを連結して1つのファイルに保存する
+        country_format: 国の出力形式（"name" または "code"）
+        profiler: 処理段階（generate・concatenate）の計測に使用するプロファイラ
+        country_distribution: 国の分布（"uniform" または "skewed"）
+        
+    Returns:
+        list: 出力したファイルのパスのリスト
+        
+    Raises:
+        ValueError: 無効な行数・シャード数・ワーカー数が指定された場合
+    """
+    # 入力値の検証
+    if num_rows <= 0:
+        raise ValueError("行数は1以上の整数を指定してください")
+    if shards <= 0 or shards > num_rows:
+        raise ValueError("シャード数は1以上、行数以下の整数を指定してください")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 0:
+        raise ValueError("ワーカー数は1以上の整数を指定してください")
+    get_country_columns(country_format)
+    get_country_weights(country_distribution)
+    
+    print(f"{num_rows}件のサンプルデータを{shards}シャードに分割して生成しています...")
+    
+    seed_sequences = np.random.SeedSequence(seed).spawn(shards)
+    shard_ranges = get_shard_ranges(num_rows, shards)
+    shard_files = [get_shard_file_name(file_name, index, shards) for index in range(shards)]
     
     try:
         # 親ディレクトリが存在しない場合は作成する
-        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+        os.makedirs(os.path.dirname(os.path.abspath(file_name)), exist_ok=True)
         
-        # CSVファイルにデータを書き込む
-        with open(file_name, mode="w", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
-            writer.writerow(headers)  # ヘッダーを書き込む
-            
-            # バッチサイズを設定して大量データの生成を効率化
-            batch_size = 10000
-            for start_idx in range(1, num_rows + 1, batch_size):
-                batch_rows = []
-                end_idx = min(start_idx + batch_size - 1, num_rows)
-                
-                for i in range(start_idx, end_idx + 1):
-                    # ランダムな国を選択
-                    country = random.choice(countries)
-                    
-                    # 国に対応する地域を取得（マッピングにない場合は「その他」）
-                    region = country_region_map.get(country, 'その他')
-                    
-                    row = [
-                        i,  # ID
-                        random.choice(names),  # ランダムな名前
-                        random.randint(18, 60),  # 年齢 (18〜60)
-                        country,  # ランダムな国
-                        round(random.uniform(0, 100), 2),  # スコア (0〜100, 小数点2桁)
-                    ]
-                    batch_rows.append(row)
-                    
-                    # 進捗状況を表示（10万件ごと）
-                    if i % 100000 == 0:
-                        print(f"{i}件生成済み...")
-                
-                # バッチ単位でまとめて書き込み
-                writer.writerows(batch_rows)
+        # 連結する場合はヘッダーを先頭のシャードにのみ書き込む
+        headers = [index == 0 or not concatenate for index in range(shards)]
+        with profiler.phase('generate', rows=num_rows), \
+                ProcessPoolExecutor(max_workers=min(workers, shards)) as executor:
+            futures = [executor.submit(generate_shard, shard_file, start_id, shard_rows, seed_sequence, header,
+                                       country_format, country_distribution)
+                       for shard_file, (start_id, shard_rows), seed_sequence, header
+                       in zip(shard_files, shard_ranges, seed_sequences, headers)]
+            for index, future in enumerate(futures, 1):
+                future.result()
+                print(f"シャード {index}/{shards} を生成しました")
+        
+        if not concatenate:
+            print(f"完了: {num_rows}件のデータを{shards}個のファイルに生成しました。")
+            return shard_files
+        
+        # シャードの順に連結して1つのファイルにする
+        with profiler.phase('concatenate', rows=num_rows):
+            concatenate_shards(shard_files, file_name)
         
         print(f"完了: {num_rows}件のデータを{file_name}に生成しました。")
+        return [file_name]
         
     except PermissionError:
         print(f"エラー: ファイル '{file_name}' への書き込み権限がありません")
@@ -189,6 +610,7 @@ def generate_sample_data(file_name, num_rows):
             print(f"ファイル操作エラー: {str(e)}")
     except Exception as e:
         print(f"予期せぬエラーが発生しました: {str(e)}")
+    return []
 
 if __name__ == "__main__":
     try:
@@ -198,14 +620,53 @@ if __name__ == "__main__":
                             help='生成する行数 (デフォルト: 5,000)')
         parser.add_argument('--output', type=str, default="resources/csv/sample_data.csv", 
                             help='出力ファイル名 (デフォルト: resources/csv/sample_data.csv)')
+        parser.add_argument('--engine', type=str, choices=ENGINES, default="numpy",
+                            help='生成エンジン (デフォルト: numpy)')
+        parser.add_argument('--seed', type=int, default=None,
+                            help='乱数のシード (デフォルト: 指定なし)')
+        parser.add_argument('--format', type=str, choices=FORMATS, default=None,
+                            help='出力形式 (デフォルト: 出力ファイルの拡張子から判定。.parquet / .pq はParquet形式)')
+        parser.add_argument('--country-format', type=str, choices=COUNTRY_FORMATS, default="name",
+                            help='国の出力形式 (name: 「国」カラムに国名, code: 「国コード」カラムに国コード) '
+                                 '(デフォルト: name)')
+        parser.add_argument('--country-distribution', type=str, choices=COUNTRY_DISTRIBUTIONS, default="uniform",
+                            help='国の分布 (uniform: 各国が同じ確率, skewed: 日本が70%%を占める偏った分布) '
+                                 '(デフォルト: uniform)')
+        parser.add_argument('--shards', type=int, default=None,
+                            help='指定した数のシャードに分割して並列に生成する (numpyエンジンのみ)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='シャードの生成に使用するプロセス数 (デフォルト: CPUコア数)')
+        parser.add_argument('--concat', action='store_true',
+                            help='シャードを連結して1つのファイルに保存する')
+        parser.add_argument('--profile', type=str, nargs='?', const='-', default=None, metavar='出力先',
+                            help='処理段階ごとの実行時間・CPU時間・処理行数・ピークメモリを1行のJSONで出力する '
+                                 '(出力先を省略した場合は標準エラー出力、環境変数 PANDAS_STATS_PROFILE でも指定可)')
+        parser.add_argument('--profile-tracemalloc', action='store_true', default=None,
+                            help='--profile の計測に tracemalloc によるPythonオブジェクトのピークメモリを含める')
         args = parser.parse_args()
         
+        profiler = create_profiler('generate_sample_data', args.profile, args.profile_tracemalloc)
+        
         # 引数の検証
         if args.rows <= 0:
             print("エラー: 行数は1以上の整数を指定してください")
+        elif args.shards is not None and args.engine != "numpy":
+            print("エラー: --shards はnumpyエンジンでのみ指定できます")
+        elif args.shards is not None and args.format is not None and \
+                args.format != get_output_format(args.output):
+            print("エラー: --shards を指定する場合は出力形式を出力ファイルの拡張子で指定してください")
+        elif args.shards is not None:
+            # シャードに分割して並列に生成
+            generate_sharded_data(args.output, args.rows, args.shards, workers=args.workers,
+                                  seed=args.seed, concatenate=args.concat, country_format=args.country_format,
+                                  profiler=profiler, country_distribution=args.country_distribution)
+            profiler.emit(output=args.output, rows=args.rows, shards=args.shards)
         else:
             # サンプルデータを生成
-            generate_sample_data(args.output, args.rows)
+            generate_sample_data(args.output, args.rows, engine=args.engine, seed=args.seed,
+                                 file_format=args.format, country_format=args.country_format,
+                                 profiler=profiler, country_distribution=args.country_distribution)
+            profiler.emit(output=args.output, rows=args.rows, engine=args.engine)
             
     except ValueError as e:
         print(f"エラー: {str(e)}")
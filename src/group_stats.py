@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import math
+
+try:
+    from src.lazy_import import LazyModule
+except ImportError:
+    # スクリプトとして直接実行された場合
+    from lazy_import import LazyModule
+
+# 起動時間を短縮するため、NumPy と pandas は使用する時点でインポートする
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# 統計量を求める数値カラム
+STATS_COLUMNS = ["スコア", "年齢"]
+
+def factorize_groups(keys):
+    """
+    各行のグループを 0 から始まるグループの番号に変換する
+    
+    Args:
+        keys: 各行のグループ（pd.Series や配列）
+        
+    Returns:
+        tuple: (各行のグループの番号の配列（欠損値は -1）, 番号に対応するグループのリスト)
+    """
+    keys = pd.Series(keys)
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        # カテゴリ型はカテゴリの番号をそのままグループの番号として使う
+        codes, uniques = keys.cat.codes.to_numpy(), keys.cat.categories
+    else:
+        codes, uniques = pd.factorize(keys, use_na_sentinel=True)
+    return np.asarray(codes, dtype=np.intp), list(uniques)
+
+def combine_moments(a, b):
+    """
+    2つの部分集合の [件数, 平均, 偏差平方和, 最小, 最大] を1つに統合する（Chan らの並列アルゴリズム）
+    
+    Args:
+        a: 一方の部分集合の統計量
+        b: もう一方の部分集合の統計量
+    
+    Returns:
+        list: 統合した統計量
+    """
+    n_a, mean_a, m2_a, min_a, max_a = a
+    n_b, mean_b, m2_b, min_b, max_b = b
+    if n_a == 0:
+        return list(b)
+    if n_b == 0:
+        return list(a)
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    return [n, mean_a + delta * n_b / n, m2_a + m2_b + delta * delta * n_a * n_b / n,
+            min(min_a, min_b), max(max_a, max_b)]
+
+class GroupStats:
+    """
+    グループ（国・地域など）ごとの行数と、数値カラムの件数・平均・分散・最小・最大
+    
+    グループごとに [件数, 平均, 偏差平方和, 最小, 最大] のみを保持するため、メモリ使用量は
+    行数ではなくグループ数に比例する。チャンクやワーカープロセスごとの部分的な結果は
+    merge() で統合でき、一度にすべての行を集計した場合と同じ結果になる（浮動小数点の丸め誤差を除く）。
+    """
+    
+    def __init__(self, columns=STATS_COLUMNS):
+        """
+        Args:
+            columns: 統計量を求める数値カラム名のリスト
+        """
+        self.columns = list(columns)
+        self.rows = {}
+        self.moments = {}
+    
+    def _empty_moments(self):
+        return [[0, 0.0, 0.0, math.inf, -math.inf] for _ in self.columns]
+    
+    def update(self, keys, values):
+        """
+        1チャンク分の行をグループごとに集計して加える
+        
+        チャンク内はグループの番号ごとに bincount でまとめて集計し、既存の統計量との統合は
+        チャンクに含まれるグループごとに1回だけ行う。
+        
+        Args:
+            keys: 各行のグループ（pd.Series や配列、欠損値の行は集計しない）
+            values: {カラム名: 各行の値の配列} の形式の辞書（欠損値はそのカラムの統計量から除く）
+        """
+        codes, uniques = factorize_groups(keys)
+        num_groups = len(uniques)
+        if num_groups == 0:
+            return
+        valid = codes >= 0
+        group_rows = np.bincount(codes[valid], minlength=num_groups)
+        
+        chunk_moments = []
+        for column in self.columns:
+            column_values = pd.to_numeric(pd.Series(values[column]), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            mask = valid & ~np.isnan(column_values)
+            group_codes = codes[mask]
+            column_values = column_values[mask]
+            
+            # グループ内の偏差平方和は、グループの平均を求めてから計算する（2パス、桁落ちを防ぐ）
+            counts = np.bincount(group_codes, minlength=num_groups)
+            sums = np.bincount(group_codes, weights=column_values, minlength=num_groups)
+            means = np.divide(sums, counts, out=np.zeros(num_groups), where=counts > 0)
+            m2 = np.bincount(group_codes, weights=(column_values - means[group_codes]) ** 2, minlength=num_groups)
+            minimums = np.full(num_groups, np.inf)
+            maximums = np.full(num_groups, -np.inf)
+            np.minimum.at(minimums, group_codes, column_values)
+            np.maximum.at(maximums, group_codes, column_values)
+            chunk_moments.append((counts.tolist(), means.tolist(), m2.tolist(),
+                                  minimums.tolist(), maximums.tolist()))
+        
+        for index, group in enumerate(uniques):
+            if group_rows[index] == 0:
+                continue
+            self._add(group, int(group_rows[index]),
+                      [[moments[i][index] for i in range(5)] for moments in chunk_moments])
+    
+    def _add(self, group, rows, moments):
+        if group not in self.rows:
+            self.rows[group] = 0
+            self.moments[group] = self._empty_moments()
+        self.rows[group] += rows
+        self.moments[group] = [combine_moments(current, added)
+                               for current, added in zip(self.moments[group], moments)]
+    
+    def merge(self, other):
+        """
+        別の部分的な集計結果を統合する
+        
+        Args:
+            other: 統合する GroupStats（同じカラムを集計したもの）
+        
+        Returns:
+            GroupStats: 自身（統合後）
+        """
+        for group, rows in other.rows.items():
+            self._add(group, rows, other.moments[group])
+        return self
+    
+    def map_groups(self, mapping, default=None):
+        """
+        グループをマッピングに従って変換し、同じグループになったものを統合する
+        
+        Args:
+            mapping: {変換前のグループ: 変換後のグループ} の形式の辞書
+            default: マッピングにないグループの変換先（Noneの場合は変換しない）
+        
+        Returns:
+            GroupStats: 変換後の集計結果
+        """
+        mapped = GroupStats(self.columns)
+        for group, rows in self.rows.items():
+            target = mapping.get(group, group if default is None else default)
+            mapped._add(target, rows, self.moments[group])
+        return mapped
+    
+    def row_counts(self):
+        """
+        グループごとの行数を取得する（数値カラムの欠損値に関係なく、グループの値がある行を数える）
+        
+        Returns:
+            pd.Series: グループごとの行数（行数の降順）
+        """
+        counts = pd.Series(self.rows, dtype='int64')
+        return counts.sort_values(ascending=False, kind='stable')
+    
+    def summary(self, group):
+        """
+        グループの統計量を取得する
+        
+        Args:
+            group: グループ
+        
+        Returns:
+            dict: {カラム名: {'count', 'mean', 'std', 'var', 'min', 'max'}} の形式の辞書
+                  （分散と標準偏差は不偏分散から求め、件数が1以下の場合はNone）
+        """
+        result = {}
+        for column, (count, mean, m2, minimum, maximum) in zip(self.columns, self.moments[group]):
+            var = m2 / (count - 1) if count > 1 else None
+            result[column] = {
+                'count': int(count),
+                'mean': mean if count else None,
+                'std': math.sqrt(var) if var is not None else None,
+                'var': var,
+                'min': minimum if count else None,
+                'max': maximum if count else None,
+            }
+        return result
+    
+    def to_dict(self):
+        """
+        JSONに変換可能な辞書に変換する（キャッシュへの保存用）
+        
+        Returns:
+            dict: 集計結果
+        """
+        return {
+            'columns': self.columns,
+            'groups': [[str(group), rows, self.moments[group]] for group, rows in self.rows.items()],
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        to_dict() で変換した辞書から復元する
+        
+        Args:
+            data: to_dict() で変換した辞書
+        
+        Returns:
+            GroupStats: 復元した集計結果
+        """
+        stats = cls(data['columns'])
+        for group, rows, moments in data['groups']:
+            stats._add(group, rows, moments)
+        return stats
@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+try:
+    from src.lazy_import import LazyModule
+    from src.group_stats import factorize_groups
+except ImportError:
+    # スクリプトとして直接実行された場合
+    from lazy_import import LazyModule
+    from group_stats import factorize_groups
+
+# 起動時間を短縮するため、NumPy と pandas は使用する時点でインポートする
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# 国別集計の国（「国」または「国コード」カラム）と、マスタデータで国から求める地域を表す軸の名前
+COUNTRY_DIMENSION = '国'
+REGION_DIMENSION = '地域'
+
+# 数値カラムを一定の幅で区切る軸の指定（「年齢:10」のようにカラム名と幅を区切る文字）
+BRACKET_SEPARATOR = ':'
+
+# 組み合わせの番号の数がこの値以下の場合は bincount で数え、超える場合は出現した番号のみを数える
+DENSE_KEY_LIMIT = 1 << 20
+
+def parse_dimension(spec):
+    """
+    集計の軸の指定を解析する
+    
+    Args:
+        spec: 「国」「地域」、カラム名、または「カラム名:幅」（数値カラムを幅ごとに区切る）
+    
+    Returns:
+        tuple: (軸の名前, カラム名（国・地域の場合はNone）, 区切る幅（区切らない場合はNone）)
+    
+    Raises:
+        ValueError: 幅が1以上の整数でない場合
+    """
+    if spec in (COUNTRY_DIMENSION, REGION_DIMENSION):
+        return spec, None, None
+    column, separator, width = spec.partition(BRACKET_SEPARATOR)
+    if not separator:
+        return spec, spec, None
+    if not width.isdigit() or int(width) < 1:
+        raise ValueError(f"「{spec}」の区切る幅は1以上の整数を指定してください")
+    return spec, column, int(width)
+
+def format_dimension_label(spec):
+    """
+    集計の軸の指定を表示用の見出しにする
+    
+    Args:
+        spec: 集計の軸の指定
+    
+    Returns:
+        str: 見出し（幅で区切る場合は「年齢（10刻み）」の形式）
+    """
+    _, column, width = parse_dimension(spec)
+    return spec if width is None else f"{column}（{width}刻み）"
+
+def format_bracket(start, width):
+    """
+    幅で区切った範囲を表示用の文字列にする
+    
+    Args:
+        start: 範囲の開始値
+        width: 区切る幅
+    
+    Returns:
+        str: 「20〜29」の形式の文字列（開始値以上、開始値 + 幅未満）
+    """
+    return f"{start}〜{start + width - 1}"
+
+def parse_bracket_start(label):
+    """
+    format_bracket() で表示用にした範囲の開始値を取得する
+    
+    Args:
+        label: 「20〜29」の形式の文字列
+    
+    Returns:
+        int: 範囲の開始値
+    """
+    return int(label.partition('〜')[0])
+
+def is_numeric_value(value):
+    """
+    値が数値（真偽値を除く整数・浮動小数点数）かどうかを判定する
+    
+    Args:
+        value: 軸の値
+    
+    Returns:
+        bool: 数値の場合はTrue
+    """
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_))
+
+def factorize_brackets(values, width):
+    """
+    数値を幅で区切った範囲の番号に変換する
+    
+    Args:
+        values: 各行の値（数値に変換できない値は欠損値として扱う）
+        width: 区切る幅
+    
+    Returns:
+        tuple: (各行の範囲の番号の配列（欠損値は -1）, 番号に対応する範囲の表示用の文字列のリスト)
+    """
+    numbers = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(numbers)
+    codes = np.full(len(numbers), -1, dtype=np.intp)
+    codes[valid], starts = factorize_groups(np.floor(numbers[valid] / width).astype(np.int64) * width)
+    return codes, [format_bracket(int(start), width) for start in starts]
+
+def factorize_values(values):
+    """
+    カラムの値を番号に変換する（小数部のない浮動小数点数は整数として扱う）
+    
+    欠損値を含むチャンクの整数のカラムは pandas が浮動小数点数として読み込むため、
+    値を整数に揃えて、チャンクの分け方やワーカー数・入力形式によって値の表記が変わらないようにする。
+    
+    Args:
+        values: 各行の値（pd.Series や配列）
+        
+    Returns:
+        tuple: (各行の値の番号の配列（欠損値は -1）, 番号に対応する値のリスト)
+    """
+    codes, uniques = factorize_groups(values)
+    if pd.api.types.is_float_dtype(pd.Series(values).dtype):
+        uniques = [int(value) if float(value).is_integer() else value for value in uniques]
+    return codes, uniques
+
+class GroupingSets:
+    """
+    複数の軸の組み合わせ（グルーピングセット）ごとの行数
+    
+    1チャンクの各軸の値は一度だけ番号に変換し、組み合わせごとに軸の番号を1つの整数にまとめて
+    bincount で数えるため、組み合わせの数によらず1回の走査ですべての組み合わせを集計できる。
+    地域は国から決まるため、走査中は地域の軸にも国を保持し、map_regions() で地域に置き換える。
+    """
+    
+    def __init__(self, sets):
+        """
+        Args:
+            sets: 集計の軸の指定のリストのリスト（[["名前"], ["地域", "年齢:10"]] など）
+        
+        Raises:
+            ValueError: 軸の指定が不正な場合
+        """
+        self.sets = [list(dimensions) for dimensions in sets]
+        if not self.sets or any(not dimensions for dimensions in self.sets):
+            raise ValueError("集計の軸を1つ以上指定してください")
+        self.dimensions = list(dict.fromkeys(spec for dimensions in self.sets for spec in dimensions))
+        parsed = [parse_dimension(spec) for spec in self.dimensions]
+        self.columns = list(dict.fromkeys(column for _, column, _ in parsed if column is not None))
+        self.counts = [{} for _ in self.sets]
+    
+    def _factorize(self, keys, values):
+        codes = {}
+        for spec in self.dimensions:
+            _, column, width = parse_dimension(spec)
+            if column is None:
+                # 国と地域の軸は同じ国の番号を使う
+                if COUNTRY_DIMENSION not in codes:
+                    codes[COUNTRY_DIMENSION] = factorize_groups(keys)
+                codes[spec] = codes[COUNTRY_DIMENSION]
+            elif width is None:
+                codes[spec] = factorize_values(values[column])
+            else:
+                codes[spec] = factorize_brackets(values[column], width)
+        return codes
+    
+    def update(self, keys, values):
+        """
+        1チャンク分の行を組み合わせごとに数えて加える（いずれかの軸が欠損値の行は数えない）
+        
+        Args:
+            keys: 各行の国（pd.Series や配列）
+            values: {カラム名: 各行の値の配列} の形式の辞書
+        """
+        codes = self._factorize(keys, values)
+        for counts, dimensions in zip(self.counts, self.sets):
+            shape = tuple(len(codes[spec][1]) for spec in dimensions)
+            if 0 in shape:
+                continue
+            
+            # 各軸の番号を1つの整数（組み合わせの番号）にまとめる
+            valid = np.logical_and.reduce([codes[spec][0] >= 0 for spec in dimensions])
+            combined = np.ravel_multi_index(tuple(codes[spec][0][valid] for spec in dimensions), shape)
+            size = int(np.prod(shape, dtype=np.int64))
+            if size <= DENSE_KEY_LIMIT:
+                combined_counts = np.bincount(combined, minlength=size)
+                indices = np.flatnonzero(combined_counts)
+                combined_counts = combined_counts[indices]
+            else:
+                indices, combined_counts = np.unique(combined, return_counts=True)
+            
+            positions = np.unravel_index(indices, shape)
+            uniques = [codes[spec][1] for spec in dimensions]
+            for index, count in enumerate(combined_counts.tolist()):
+                group = tuple(uniques[i][positions[i][index]] for i in range(len(dimensions)))
+                counts[group] = counts.get(group, 0) + count
+    
+    def _add(self, index, group, count):
+        counts = self.counts[index]
+        counts[group] = counts.get(group, 0) + count
+    
+    def merge(self, other):
+        """
+        別の部分的な集計結果を統合する
+        
+        Args:
+            other: 統合する GroupingSets（同じ軸の組み合わせを集計したもの）
+        
+        Returns:
+            GroupingSets: 自身（統合後）
+        """
+        for index, counts in enumerate(other.counts):
+            for group, count in counts.items():
+                self._add(index, group, count)
+        return self
+    
+    def select(self, indices):
+        """
+        指定した軸の組み合わせのみを取り出す
+        
+        Args:
+            indices: 取り出す軸の組み合わせの番号（sets の添字）のリスト
+        
+        Returns:
+            GroupingSets: 取り出した組み合わせの集計結果
+        """
+        selected = GroupingSets([self.sets[index] for index in indices])
+        for new_index, index in enumerate(indices):
+            selected.counts[new_index] = dict(self.counts[index])
+        return selected
+    
+    def _map_dimensions(self, targets, mapping, default):
+        mapped = GroupingSets(self.sets)
+        for index, (counts, dimensions) in enumerate(zip(self.counts, self.sets)):
+            for group, count in counts.items():
+                group = tuple(mapping.get(value, value if default is None else default)
+                              if spec in targets else value for spec, value in zip(dimensions, group))
+                mapped._add(index, group, count)
+        return mapped
+    
+    def map_groups(self, mapping, default=None):
+        """
+        国と地域の軸の値（国コードなど）をマッピングに従って変換し、同じ組み合わせになったものを統合する
+        
+        Args:
+            mapping: {変換前の国: 変換後の国} の形式の辞書
+            default: マッピングにない国の変換先（Noneの場合は変換しない）
+        
+        Returns:
+            GroupingSets: 変換後の集計結果
+        """
+        return self._map_dimensions((COUNTRY_DIMENSION, REGION_DIMENSION), mapping, default)
+    
+    def map_regions(self, country_region_map, default='その他'):
+        """
+        地域の軸に保持している国を地域に変換する（map_groups() で国名に変換した後に1回だけ行う）
+        
+        Args:
+            country_region_map: {国名: 地域名} の形式の辞書
+            default: マッピングにない国の地域
+        
+        Returns:
+            GroupingSets: 変換後の集計結果
+        """
+        return self._map_dimensions((REGION_DIMENSION,), country_region_map, default)
+    
+    def summary(self, index):
+        """
+        軸の組み合わせごとの行数を取得する
+        
+        すべての軸が分類（国・地域・文字列のカラム）の場合は行数の降順に並べる。
+        幅で区切った軸や数値のカラムの軸を含む場合は、範囲や値の順序が分かるよう軸の順に並べ、
+        数値の軸は値（範囲の開始値）の昇順、分類の軸はその値の合計行数の降順とする。
+        
+        Args:
+            index: 軸の組み合わせの番号（sets の添字）
+        
+        Returns:
+            list: (各軸の値のタプル, 行数) のリスト（同じ順位の場合は値の昇順）
+        """
+        counts = self.counts[index]
+        parsed = [parse_dimension(spec) for spec in self.sets[index]]
+        brackets = [width is not None for _, _, width in parsed]
+        numeric = [bracket or (column is not None and bool(counts) and
+                               all(is_numeric_value(group[i]) for group in counts))
+                   for i, (bracket, (_, column, _)) in enumerate(zip(brackets, parsed))]
+        if not any(numeric):
+            return sorted(counts.items(), key=lambda item: (-item[1], [str(value) for value in item[0]]))
+        
+        # 分類の軸は、値ごとの合計行数の多い順に並べる
+        totals = [{} for _ in parsed]
+        for group, count in counts.items():
+            for i, value in enumerate(group):
+                totals[i][value] = totals[i].get(value, 0) + count
+        
+        def sort_key(item):
+            return [(parse_bracket_start(value) if brackets[i] else value) if numeric[i] else
+                    (-totals[i][value], str(value)) for i, value in enumerate(item[0])]
+        return sorted(counts.items(), key=sort_key)
+    
+    def to_dict(self):
+        """
+        JSONに変換可能な辞書に変換する（キャッシュへの保存用）
+        
+        Returns:
+            dict: 集計結果
+        """
+        return {
+            'sets': self.sets,
+            'counts': [[[list(group), count] for group, count in counts.items()] for counts in self.counts],
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        to_dict() で変換した辞書から復元する
+        
+        Args:
+            data: to_dict() で変換した辞書
+        
+        Returns:
+            GroupingSets: 復元した集計結果
+        """
+        grouping_sets = cls(data['sets'])
+        for index, counts in enumerate(data['counts']):
+            for group, count in counts:
+                grouping_sets._add(index, tuple(group), count)
+        return grouping_sets
@@ -0,0 +1,476 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+try:
+    from src.lazy_import import LazyModule
+    from src.profiling import create_profiler, NULL_PROFILER
+    from src.count_by_country import (
+        DEFAULT_RANGE_BYTES,
+        RENDERERS,
+        get_country_region_map,
+        get_country_code_map,
+        get_country_column,
+        get_input_format,
+        read_csv_columns,
+        count_byte_range,
+        count_csv_bytes,
+        merge_counts,
+        resolve_country_names,
+        rollup_country_counts,
+        display_report,
+        CountResult,
+        render_result,
+        print_report,
+        add_profile_arguments
+    )
+except ImportError:
+    # スクリプトとして直接実行された場合
+    from lazy_import import LazyModule
+    from profiling import create_profiler, NULL_PROFILER
+    from count_by_country import (
+        DEFAULT_RANGE_BYTES,
+        RENDERERS,
+        get_country_region_map,
+        get_country_code_map,
+        get_country_column,
+        get_input_format,
+        read_csv_columns,
+        count_byte_range,
+        count_csv_bytes,
+        merge_counts,
+        resolve_country_names,
+        rollup_country_counts,
+        display_report,
+        CountResult,
+        render_result,
+        print_report,
+        add_profile_arguments
+    )
+
+# 起動時間を短縮するため、pandas は使用する時点でインポートする
+pd = LazyModule('pandas')
+
+def iter_line_blocks(f, start, end, block_bytes=DEFAULT_RANGE_BYTES):
+    """
+    ファイルの指定範囲を、行の境界に揃えた一定サイズ以下のブロックに分割する
+    
+    Args:
+        f: バイナリモードで開いたファイルオブジェクト
+        start: 範囲の開始位置（行頭）
+        end: 範囲の終了位置（行頭またはファイル末尾）
+        block_bytes: 1ブロックのサイズの目安
+        
+    Yields:
+        tuple: (ブロックの開始位置, ブロックの終了位置)
+    """
+    position = start
+    while position < end:
+        block_end = position + block_bytes
+        if block_end < end:
+            # ブロックの終端を次の行頭に揃える
+            f.seek(block_end - 1)
+            f.readline()
+            block_end = min(f.tell(), end)
+        else:
+            block_end = end
+        yield position, block_end
+        position = block_end
+
+def hash_bytes(data):
+    """
+    バイト列のSHA-256ハッシュ値を計算する
+    
+    Args:
+        data: 対象のバイト列
+        
+    Returns:
+        str: 16進数表記のハッシュ値
+    """
+    return hashlib.sha256(data).hexdigest()
+
+def read_last_line(f, data_start, offset, max_line_bytes=64 * 1024):
+    """
+    指定した位置の直前にある1行（改行を含む）を読み込む
+    
+    Args:
+        f: バイナリモードで開いたファイルオブジェクト
+        data_start: データ部分（ヘッダー行の次）の開始位置
+        offset: 行末（改行の直後）の位置
+        max_line_bytes: 読み込む最大バイト数
+        
+    Returns:
+        bytes: 直前の1行（データ行がない場合は空のバイト列）
+    """
+    window_start = max(data_start, offset - max_line_bytes)
+    f.seek(window_start)
+    window = f.read(offset - window_start)
+    return window[:-1].rsplit(b'\n', 1)[-1] + window[-1:]
+
+def find_last_line_end(f, start, end, window_bytes=64 * 1024):
+    """
+    指定範囲内の最後の改行の直後の位置を、末尾から逆向きに探索して求める
+    
+    Args:
+        f: バイナリモードで開いたファイルオブジェクト
+        start: 探索範囲の開始位置
+        end: 探索範囲の終了位置
+        window_bytes: 一度に読み込むバイト数
+        
+    Returns:
+        int: 最後の改行の直後の位置（範囲内に改行がない場合は開始位置）
+    """
+    position = end
+    while position > start:
+        window_start = max(start, position - window_bytes)
+        f.seek(window_start)
+        newline_index = f.read(position - window_start).rfind(b'\n')
+        if newline_index >= 0:
+            return window_start + newline_index + 1
+        position = window_start
+    return start
+
+def load_tail_state(state_path):
+    """
+    追記型CSVの増分集計の状態を読み込む
+    
+    Args:
+        state_path: 状態ファイルのパス
+        
+    Returns:
+        dict: 前回までの集計状態（存在しない、または壊れている場合はNone）
+    """
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_tail_state(state_path, state):
+    """
+    追記型CSVの増分集計の状態を保存する
+    
+    Args:
+        state_path: 状態ファイルのパス
+        state: 保存する集計状態
+    """
+    state_dir = os.path.dirname(state_path)
+    if state_dir:
+        os.makedirs(state_dir, exist_ok=True)
+    
+    temp_path = f"{state_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(temp_path, state_path)
+
+def aggregate_incremental(file_path, state_path, block_bytes=DEFAULT_RANGE_BYTES):
+    """
+    追記型のCSVファイルを、前回集計した位置以降の追記分のみ走査して国別に集計する
+    
+    前回までの国別件数・処理済みのバイト位置・ヘッダー行と最終行のハッシュ値を
+    状態ファイルに保存し、次回はその位置から追記分のみを集計する。
+    ファイルの切り詰めや書き換えを検出した場合は全体を再走査する。
+    末尾の改行のない行は集計結果に含めるが、書き込み途中の可能性があるため
+    処理済みの位置には含めず、次回あらためて集計する。
+    
+    Args:
+        file_path: CSVファイルのパス
+        state_path: 集計状態を保存するファイルのパス
+        block_bytes: 一度に解析するバイト数の目安
+        
+    Returns:
+        tuple: (国別の集計結果, 今回走査したバイト数)
+        
+    Raises:
+        KeyError: CSVファイルに「国」カラムが存在しない場合
+    """
+    # 「国」カラムの存在確認
+    get_country_column(read_csv_columns(file_path))
+    
+    state = load_tail_state(state_path)
+    with open(file_path, 'rb') as f:
+        header = f.readline()
+        data_start = f.tell()
+        file_size = os.fstat(f.fileno()).st_size
+        
+        # 前回の状態が今のファイルの先頭部分と一致する場合のみ続きから集計する
+        resumable = (
+            state is not None
+            and state.get('header_hash') == hash_bytes(header)
+            and data_start <= state.get('offset', -1) <= file_size
+            and state.get('last_line_hash') == hash_bytes(read_last_line(f, data_start, state['offset']))
+        )
+        if resumable:
+            start = state['offset']
+            partial_counts = [pd.Series(state.get('counts', {}), dtype='int64')]
+        else:
+            start = data_start
+            partial_counts = []
+        
+        # 最後の改行までを処理済みの範囲とする
+        complete_end = find_last_line_end(f, start, file_size)
+        for block_start, block_end in iter_line_blocks(f, start, complete_end, block_bytes):
+            partial_counts.append(count_byte_range(file_path, header, block_start, block_end))
+        country_counts = merge_counts(partial_counts)
+        
+        save_tail_state(state_path, {
+            'file_path': os.path.abspath(file_path),
+            'offset': complete_end,
+            'header_hash': hash_bytes(header),
+            'last_line_hash': hash_bytes(read_last_line(f, data_start, complete_end)),
+            'counts': {str(country): int(count) for country, count in country_counts.items()},
+        })
+    
+    # 末尾の改行のない行は集計結果にのみ含める
+    if complete_end < file_size:
+        trailing_counts = count_byte_range(file_path, header, complete_end, file_size)
+        country_counts = merge_counts([country_counts, trailing_counts])
+    
+    return country_counts, file_size - start
+
+class CsvFollower:
+    """
+    追記され続けるCSVファイルを `tail -f` のように追跡し、国別の件数を更新し続ける
+    
+    前回読み込んだ位置以降に追記されたデータのみを読み込み、改行で終わる完全な行だけを
+    集計する。書き込み途中の末尾の行は、残りが追記されるまでバッファに保持する。
+    ファイルが切り詰められた場合や別のファイルに置き換えられた場合は、先頭から集計し直す。
+    切り詰めた後に前回の位置を超えて書き込まれた場合も検出できるよう、ファイルのiノードと、
+    ヘッダー行・前回読み込んだ位置の直前の行が変わっていないことを確認する。
+    """
+    
+    def __init__(self, file_path, batch_bytes=1024 * 1024):
+        """
+        Args:
+            file_path: 追跡するCSVファイルのパス
+            batch_bytes: 一度に読み込む最大バイト数
+        """
+        self.file_path = file_path
+        self.batch_bytes = batch_bytes
+        self.reset()
+    
+    def reset(self):
+        """
+        集計状態を初期化する
+        """
+        self.header = None
+        self.offset = 0
+        self.buffer = b''
+        self.last_line = b''
+        self.file_id = None
+        self.country_counts = pd.Series(dtype='int64')
+    
+    def is_rewritten(self, f, stat):
+        """
+        前回読み込んだ部分が切り詰め・置き換え・書き換えられたかどうかを判定する
+        
+        Args:
+            f: バイナリモードで開いた追跡中のファイル
+            stat: ファイルの os.stat_result
+            
+        Returns:
+            bool: 前回読み込んだ部分が変わった場合はTrue
+        """
+        if self.offset == 0:
+            return False
+        if (stat.st_dev, stat.st_ino) != self.file_id or stat.st_size < self.offset:
+            return True
+        
+        # ヘッダー行と、前回読み込んだ位置の直前の行（書き込み途中の行を含む）を比較する
+        if self.header is not None:
+            f.seek(0)
+            if f.read(len(self.header)) != self.header:
+                return True
+        tail = self.last_line + self.buffer
+        f.seek(self.offset - len(tail))
+        return f.read(len(tail)) != tail
+    
+    def poll(self):
+        """
+        前回以降に追記された完全な行を読み込み、国別の件数を更新する
+        
+        Returns:
+            int: 今回集計した行数
+            
+        Raises:
+            KeyError: CSVファイルに「国」カラムが存在しない場合
+        """
+        num_rows = 0
+        with open(self.file_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if self.is_rewritten(f, stat):
+                # 切り詰め・置き換えられた場合は先頭から集計し直す
+                self.reset()
+            self.file_id = (stat.st_dev, stat.st_ino)
+            file_size = stat.st_size
+            
+            f.seek(self.offset)
+            while self.offset < file_size:
+                data = self.buffer + f.read(min(self.batch_bytes, file_size - self.offset))
+                self.offset = f.tell()
+                
+                # 最後の改行までを完全な行として扱い、残りはバッファに保持する
+                newline_index = data.rfind(b'\n')
+                if newline_index < 0:
+                    self.buffer = data
+                    continue
+                lines, self.buffer = data[:newline_index + 1], data[newline_index + 1:]
+                self.last_line = lines[lines.rfind(b'\n', 0, newline_index) + 1:]
+                
+                if self.header is None:
+                    self.header, lines = lines.split(b'\n', 1)
+                    self.header += b'\n'
+                    get_country_column(pd.read_csv(io.BytesIO(self.header), nrows=0).columns)
+                    if not lines:
+                        continue
+                
+                batch_counts = count_csv_bytes(self.header, lines)
+                self.country_counts = merge_counts([self.country_counts, batch_counts])
+                num_rows += int(batch_counts.sum())
+        
+        return num_rows
+
+def watch_csv(file_path, refresh_interval=2.0, min_poll_interval=0.1, max_poll_interval=5.0,
+              max_polls=None, sleep=time.sleep, clock=time.monotonic):
+    """
+    追記され続けるCSVファイルを監視し、国別・地域別の集計結果を一定間隔で再表示する
+    
+    追記がない間はポーリング間隔を最大値まで倍々に延ばし、CPU使用率を抑える。
+    
+    Args:
+        file_path: 監視するCSVファイルのパス
+        refresh_interval: 集計結果を再表示する最短の間隔（秒）
+        min_poll_interval: ポーリング間隔の最小値（秒）
+        max_poll_interval: ポーリング間隔の最大値（秒）
+        max_polls: ポーリング回数の上限（Noneの場合は中断されるまで監視を続ける）
+        sleep: 待機に使用する関数
+        clock: 経過時間の計測に使用する関数
+        
+    Returns:
+        CsvFollower: 監視を終了した時点の集計状態
+    """
+    follower = CsvFollower(file_path)
+    country_region_map = get_country_region_map()
+    country_code_map = get_country_code_map()
+    poll_interval = min_poll_interval
+    last_render = None
+    updated = True
+    num_polls = 0
+    
+    while max_polls is None or num_polls < max_polls:
+        num_polls += 1
+        if follower.poll() > 0:
+            updated = True
+            poll_interval = min_poll_interval
+        else:
+            # 追記がない間はポーリング間隔を延ばす
+            poll_interval = min(poll_interval * 2, max_poll_interval)
+        
+        now = clock()
+        if updated and not follower.country_counts.empty and \
+                (last_render is None or now - last_render >= refresh_interval):
+            if sys.stdout.isatty():
+                print("\033[H\033[J", end='') # 画面を消去する
+            print(f"--- {time.strftime('%Y-%m-%d %H:%M:%S')} {file_path} ---")
+            country_counts = resolve_country_names(follower.country_counts, country_code_map)
+            region_counts = rollup_country_counts(country_counts, country_region_map)
+            display_report(country_counts, region_counts)
+            last_render = now
+            updated = False
+        
+        sleep(min(poll_interval, refresh_interval))
+    
+    return follower
+
+def aggregate_incremental_report(file_path, state_path, profiler=NULL_PROFILER):
+    """
+    追記型のCSVファイルを前回集計した位置以降の追記分のみ走査し、国別・地域別の集計結果を返す（表示は行わない）
+    
+    Args:
+        file_path: CSVファイルのパス
+        state_path: 集計状態を保存するファイルのパス
+        profiler: 処理段階（scan・resolve・rollup）ごとの計測に使用するプロファイラ
+        
+    Returns:
+        CountResult: 集計結果
+        
+    Raises:
+        FileNotFoundError: ファイルが存在しない場合
+        KeyError: CSVファイルに「国」カラムが存在しない場合
+    """
+    start = time.perf_counter()
+    with profiler.phase('scan') as phase:
+        country_counts, _ = aggregate_incremental(file_path, state_path)
+        if profiler.enabled:
+            phase.rows = int(country_counts.sum())
+    scanned = time.perf_counter()
+    
+    file_counts = {file_path: country_counts}
+    with profiler.phase('resolve'):
+        country_counts = resolve_country_names(country_counts)
+    with profiler.phase('rollup'):
+        region_counts = rollup_country_counts(country_counts)
+    
+    timings = {'scan': scanned - start, 'rollup': time.perf_counter() - scanned}
+    timings['total'] = timings['scan'] + timings['rollup']
+    return CountResult(country_counts, region_counts, file_counts, timings)
+
+def count_incremental(file_path, state_path, output_format='text', profiler=NULL_PROFILER):
+    """
+    追記型のCSVファイルを前回集計した位置以降の追記分のみ走査し、国別・地域別の件数を表示する
+    
+    Args:
+        file_path: CSVファイルのパス
+        state_path: 集計状態を保存するファイルのパス
+        output_format: 表示形式（"text"、"json"、"csv"）
+        profiler: 処理段階ごとの計測に使用するプロファイラ（計測結果は処理の終了時に出力する）
+        
+    Returns:
+        None
+    """
+    print_report(file_path,
+                 lambda: aggregate_incremental_report(file_path, state_path, profiler),
+                 lambda result: render_result(result, output_format),
+                 profiler)
+
+
+if __name__ == "__main__":
+    try:
+        # コマンドラインからパラメータを受け取る
+        parser = argparse.ArgumentParser(description='追記型のCSVファイルを、追記分のみ走査して国別・地域別に集計します。')
+        parser.add_argument('input', nargs='?', default=os.path.join("resources", "csv", "sample_data.csv"),
+                            help='集計するCSVファイル (デフォルト: resources/csv/sample_data.csv)')
+        parser.add_argument('--state-file', type=str, default=None,
+                            help='集計状態を保存するファイル。前回以降の追記分のみを集計する')
+        parser.add_argument('--watch', action='store_true',
+                            help='追記され続けるCSVファイルを監視し、集計結果を一定間隔で再表示する')
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='--watch 指定時に集計結果を再表示する間隔（秒） (デフォルト: 2.0)')
+        parser.add_argument('--format', type=str, choices=list(RENDERERS), default='text',
+                            help='--state-file 指定時の出力形式 (デフォルト: text)')
+        add_profile_arguments(parser)
+        args = parser.parse_args()
+        
+        if (args.state_file is None) == (not args.watch):
+            print("エラー: --state-file と --watch のいずれか一方を指定してください")
+        elif get_input_format(args.input) != 'csv':
+            print("エラー: 追記型の集計はCSVファイルでのみ行えます")
+        elif args.watch and args.interval <= 0:
+            print("エラー: 再表示の間隔は0より大きい値を指定してください")
+        elif args.watch:
+            try:
+                watch_csv(args.input, refresh_interval=args.interval)
+            except KeyboardInterrupt:
+                print("\n監視を終了しました")
+        else:
+            count_incremental(args.input, args.state_file, output_format=args.format,
+                              profiler=create_profiler('incremental', args.profile, args.profile_tracemalloc))
+    except Exception as e:
+        print(f"プログラムの実行中にエラーが発生しました: {str(e)}")
@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import importlib
+
+class LazyModule:
+    """
+    初回の属性アクセス時にモジュールをインポートするプロキシ
+    
+    pandas や NumPy のようにインポートに時間のかかるモジュールを、実際に使用するまで
+    インポートしないことで、小さなファイルを集計する場合などの起動時間を短縮する。
+    """
+    
+    def __init__(self, name):
+        """
+        Args:
+            name: インポートするモジュール名
+        """
+        self._name = name
+        self._module = None
+    
+    def __getattr__(self, attr):
+        if attr in ('_name', '_module'):
+            raise AttributeError(attr)
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import csv
+import threading
+from functools import cached_property
+
+try:
+    from src.lazy_import import LazyModule
+except ImportError:
+    # スクリプトとして直接実行された場合
+    from lazy_import import LazyModule
+
+# 起動時間を短縮するため、NumPy は対応表を使用する時点でインポートする
+np = LazyModule('numpy')
+
+# プロジェクトのルートディレクトリ（実行時のカレントディレクトリに依存しない）
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# デフォルトの国と地域のマスタデータ
+DEFAULT_MASTER_PATH = os.path.join(PROJECT_ROOT, "resources", "master", "country_region_map.csv")
+
+# マスタデータに必要なカラム
+MASTER_COLUMNS = ["国コード", "国名", "地域コード", "地域名"]
+
+# 読み込み済みのマスタデータ {絶対パス: ((サイズ, 更新日時), CountryRegionMaster)}
+_master_cache = {}
+_master_lock = threading.Lock()
+
+class CountryRegionMaster:
+    """
+    国と地域のマスタデータ
+    
+    マッピング辞書に加えて、国の番号（マスタデータの行番号）から地域の番号への対応表を
+    NumPyの配列として持つため、行単位の変換を1回のファンシーインデックスで行える。
+    読み込み済みのインスタンスは複数の呼び出し元で共有するため、属性を変更しないこと。
+    """
+    
+    def __init__(self, columns, rows):
+        """
+        Args:
+            columns: マスタデータのカラム名のリスト
+            rows: マスタデータの行（{カラム名: 値} の辞書）のリスト
+        """
+        self.columns = columns
+        self.rows = rows
+        self.country_region_map = self.get_mapping("国名", "地域名")
+        self.country_code_map = self.get_mapping("国コード", "国名")
+        self.country_code_region_map = self.get_mapping("国コード", "地域コード")
+    
+    @cached_property
+    def country_codes(self):
+        """国コードの配列（国の番号の順）"""
+        return np.array([row["国コード"] for row in self.rows], dtype=object)
+    
+    @cached_property
+    def country_names(self):
+        """国名の配列（国の番号の順）"""
+        return np.array([row["国名"] for row in self.rows], dtype=object)
+    
+    @cached_property
+    def _region_table(self):
+        # 地域はマスタデータに出現する順に番号を付ける
+        region_numbers = {}
+        region_names = []
+        for row in self.rows:
+            if row["地域コード"] not in region_numbers:
+                region_numbers[row["地域コード"]] = len(region_numbers)
+                region_names.append(row["地域名"])
+        country_region_index = np.array([region_numbers[row["地域コード"]] for row in self.rows], dtype=np.intp)
+        return (country_region_index, np.array(list(region_numbers), dtype=object),
+                np.array(region_names, dtype=object))
+    
+    @property
+    def country_region_index(self):
+        """国の番号から地域の番号への対応表"""
+        return self._region_table[0]
+    
+    @property
+    def region_codes(self):
+        """地域コードの配列（地域の番号の順）"""
+        return self._region_table[1]
+    
+    @property
+    def region_names(self):
+        """地域名の配列（地域の番号の順）"""
+        return self._region_table[2]
+    
+    def get_mapping(self, child_column, parent_column):
+        """
+        マスタデータの2つのカラムからマッピング辞書を作成する
+        
+        Args:
+            child_column: キーとするカラム名
+            parent_column: 値とするカラム名
+        
+        Returns:
+            dict: {キー: 値} の形式の辞書
+        
+        Raises:
+            KeyError: マスタデータに指定したカラムが存在しない場合
+        """
+        missing_columns = [column for column in (child_column, parent_column) if column not in self.columns]
+        if missing_columns:
+            raise KeyError(f"マスタデータにカラム {missing_columns} が存在しません")
+        return {row[child_column]: row[parent_column] for row in self.rows}
+    
+    def encode_country_codes(self, country_codes):
+        """
+        国コードの配列を国の番号の配列に変換する
+        
+        Args:
+            country_codes: 国コードの配列
+        
+        Returns:
+            np.ndarray: 国の番号の配列（マスタデータにない国コードは-1）
+        """
+        return self._encode(self.country_codes, country_codes)
+    
+    def encode_country_names(self, country_names):
+        """
+        国名の配列を国の番号の配列に変換する
+        
+        Args:
+            country_names: 国名の配列
+        
+        Returns:
+            np.ndarray: 国の番号の配列（マスタデータにない国名は-1）
+        """
+        return self._encode(self.country_names, country_names)
+    
+    def _encode(self, keys, values):
+        # キーの種類数分の辞書を引き、値の配列は1回のファンシーインデックスで変換する
+        key_index = {key: index for index, key in enumerate(keys)}
+        uniques, inverse = np.unique(np.asarray(values, dtype=object), return_inverse=True)
+        codes = np.array([key_index.get(value, -1) for value in uniques], dtype=np.intp)
+        return codes[inverse.reshape(-1)]
+    
+    def lookup_region_index(self, country_index):
+        """
+        国の番号の配列を地域の番号の配列に変換する
+        
+        Args:
+            country_index: 国の番号の配列（-1を含まないこと）
+        
+        Returns:
+            np.ndarray: 地域の番号の配列（region_codes / region_names の添字）
+        """
+        return self.country_region_index[country_index]
+
+def get_master_signature(file_path):
+    """
+    マスタデータの変更を検出するための、ファイルのサイズと更新日時を取得する
+    
+    Args:
+        file_path: マスタデータのCSVファイルのパス
+    
+    Returns:
+        tuple: (サイズ, 更新日時（ナノ秒）)
+    """
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+def load_master(file_path=None):
+    """
+    国と地域のマスタデータを読み込む
+    
+    読み込んだ結果はファイルごとに保持し、2回目以降はファイルが変更されていなければ
+    再読み込みせずに同じインスタンスを返す（常駐するプロセスでもマスタデータの更新を反映する）。
+    
+    Args:
+        file_path: マスタデータのCSVファイルのパス（省略時はデフォルトのパスを使用）
+    
+    Returns:
+        CountryRegionMaster: マスタデータ
+    
+    Raises:
+        FileNotFoundError: ファイルが存在しない場合
+        KeyError: マスタデータに必要なカラムが不足している場合
+    """
+    if file_path is None:
+        file_path = DEFAULT_MASTER_PATH
+    cache_key = os.path.abspath(file_path)
+    signature = get_master_signature(file_path)
+    
+    with _master_lock:
+        cached = _master_cache.get(cache_key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        
+        # 数十行の小さなファイルのため、pandas を使わずに標準ライブラリで読み込む
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+            columns = list(reader.fieldnames or [])
+        missing_columns = [column for column in MASTER_COLUMNS if column not in columns]
+        if missing_columns:
+            raise KeyError(f"マスタデータにカラム {missing_columns} が存在しません")
+        
+        master = CountryRegionMaster(columns, rows)
+        _master_cache[cache_key] = (signature, master)
+        return master
+
+def clear_master_cache():
+    """
+    読み込み済みのマスタデータをすべて破棄する
+    """
+    with _master_lock:
+        _master_cache.clear()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# 計測結果の出力先を指定する環境変数（"1"・"-"・"stderr" は標準エラー出力、それ以外はファイルパス）
+PROFILE_ENV_VAR = "PANDAS_STATS_PROFILE"
+
+# tracemalloc によるメモリ計測を有効にする環境変数（"1" の場合に有効）
+TRACEMALLOC_ENV_VAR = "PANDAS_STATS_PROFILE_TRACEMALLOC"
+
+# 標準エラー出力を表す出力先
+STDERR_OUTPUTS = ("1", "-", "stderr")
+
+# 計測を無効とする環境変数の値
+DISABLED_VALUES = ("", "0")
+
+def get_peak_rss_bytes():
+    """
+    プロセス開始時からの最大常駐メモリサイズ（ピークRSS）を取得する
+    
+    Returns:
+        int: ピークRSS（バイト）、取得できない環境ではNone
+    """
+    try:
+        import resource
+    except ImportError:
+        # Windows では resource モジュールを使用できない
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS はバイト単位、Linux はキロバイト単位
+    return peak if sys.platform == "darwin" else peak * 1024
+
+class PhaseRecord:
+    """
+    1つの処理段階の計測結果
+    
+    with ブロックの中で rows に処理した行数を設定すると、1秒あたりの行数も出力する。
+    """
+    
+    def __init__(self, name, rows=None):
+        """
+        Args:
+            name: 処理段階の名前
+            rows: 処理した行数
+        """
+        self.name = name
+        self.rows = rows
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_rss_bytes = None
+        self.rss_growth_bytes = None
+        self.tracemalloc_peak_bytes = None
+    
+    def to_dict(self):
+        """
+        JSONに変換可能な辞書に変換する
+        
+        Returns:
+            dict: 計測結果
+        """
+        record = {
+            'name': self.name,
+            'wall_seconds': round(self.wall_seconds, 6),
+            'cpu_seconds': round(self.cpu_seconds, 6),
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'rss_growth_bytes': self.rss_growth_bytes,
+        }
+        if self.rows is not None:
+            record['rows'] = int(self.rows)
+            record['rows_per_sec'] = round(self.rows / self.wall_seconds, 1) if self.wall_seconds > 0 else None
+        if self.tracemalloc_peak_bytes is not None:
+            record['tracemalloc_peak_bytes'] = self.tracemalloc_peak_bytes
+        return record
+
+class PhaseProfiler:
+    """
+    処理段階ごとの実行時間・CPU時間・処理行数・メモリ使用量を計測する
+    
+    計測結果は1行のJSONとして標準エラー出力またはファイルに出力する（ファイルには追記する）。
+    CPU時間は現在のプロセスの分のみで、ワーカープロセスのCPU時間は含まない。
+    ピークRSSはプロセス開始時からの最大値のため、各段階の値はその段階の終了時点までの最大値となる。
+    段階ごとのメモリ使用量は、その段階の間にピークRSSが増加した量（rss_growth_bytes）で比較する。
+    """
+    
+    enabled = True
+    
+    def __init__(self, program, output="-", trace_memory=False):
+        """
+        Args:
+            program: 計測対象のプログラム名（出力するJSONの "program"）
+            output: 出力先（"-" は標準エラー出力、それ以外はファイルパス）
+            trace_memory: Trueの場合は tracemalloc で段階ごとのPythonオブジェクトのピークメモリも計測する
+        """
+        self.program = program
+        self.output = output
+        self.trace_memory = trace_memory
+        self.phases = []
+        self.started_at = time.time()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+    
+    @contextmanager
+    def phase(self, name, rows=None):
+        """
+        with ブロックの処理を1つの処理段階として計測する
+        
+        Args:
+            name: 処理段階の名前
+            rows: 処理する行数（ブロックの中で PhaseRecord.rows に設定してもよい）
+        
+        Yields:
+            PhaseRecord: 計測結果
+        """
+        record = PhaseRecord(name, rows)
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        rss_start = get_peak_rss_bytes()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_seconds = time.perf_counter() - wall_start
+            record.cpu_seconds = time.process_time() - cpu_start
+            record.peak_rss_bytes = get_peak_rss_bytes()
+            if rss_start is not None:
+                record.rss_growth_bytes = record.peak_rss_bytes - rss_start
+            if self.trace_memory:
+                record.tracemalloc_peak_bytes = tracemalloc.get_traced_memory()[1]
+            self.phases.append(record)
+    
+    def report(self, **fields):
+        """
+        全体と処理段階ごとの計測結果をまとめる
+        
+        Args:
+            **fields: 計測結果に追加する項目（入力ファイルなど）
+        
+        Returns:
+            dict: 計測結果
+        """
+        report = {
+            'program': self.program,
+            'pid': os.getpid(),
+            'started_at': round(self.started_at, 3),
+            'wall_seconds': round(time.perf_counter() - self._wall_start, 6),
+            'cpu_seconds': round(time.process_time() - self._cpu_start, 6),
+            'peak_rss_bytes': get_peak_rss_bytes(),
+            'phases': [record.to_dict() for record in self.phases],
+        }
+        report.update(fields)
+        return report
+    
+    def emit(self, **fields):
+        """
+        計測結果を1行のJSONとして出力する
+        
+        Args:
+            **fields: 計測結果に追加する項目（入力ファイルなど）
+        """
+        line = json.dumps(self.report(**fields), ensure_ascii=False) + "\n"
+        if self.output == "-":
+            sys.stderr.write(line)
+            sys.stderr.flush()
+        else:
+            with open(self.output, "a", encoding="utf-8") as f:
+                f.write(line)
+        if self.trace_memory:
+            tracemalloc.stop()
+
+class NullProfiler:
+    """
+    計測を行わないプロファイラ（計測が無効な場合のオーバーヘッドをなくすため、何もしない）
+    """
+    
+    enabled = False
+    
+    def __init__(self):
+        self._record = PhaseRecord(None)
+    
+    @contextmanager
+    def phase(self, name, rows=None):
+        """
+        何も計測せずに with ブロックを実行する
+        
+        Args:
+            name: 処理段階の名前（使用しない）
+            rows: 処理する行数（使用しない）
+        
+        Yields:
+            PhaseRecord: 共有のダミーの計測結果（設定した値は使用しない）
+        """
+        yield self._record
+    
+    def emit(self, **fields):
+        """
+        何も出力しない
+        """
+
+# 計測が無効な場合に共有するプロファイラ
+NULL_PROFILER = NullProfiler()
+
+def create_profiler(program, output=None, trace_memory=None):
+    """
+    コマンドライン引数と環境変数からプロファイラを作成する
+    
+    Args:
+        program: 計測対象のプログラム名
+        output: 出力先（"-" は標準エラー出力、それ以外はファイルパス、
+                Noneの場合は環境変数 PANDAS_STATS_PROFILE の値を使用する）
+        trace_memory: Trueの場合は tracemalloc も使用する
+                      （Noneの場合は環境変数 PANDAS_STATS_PROFILE_TRACEMALLOC の値を使用する）
+    
+    Returns:
+        PhaseProfiler: 計測が有効な場合のプロファイラ（無効な場合は NULL_PROFILER）
+    """
+    if output is None:
+        output = os.environ.get(PROFILE_ENV_VAR, "")
+        if output in DISABLED_VALUES:
+            return NULL_PROFILER
+    if output in STDERR_OUTPUTS:
+        output = "-"
+    if trace_memory is None:
+        trace_memory = os.environ.get(TRACEMALLOC_ENV_VAR, "") not in DISABLED_VALUES
+    return PhaseProfiler(program, output, trace_memory)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import hashlib
+
+# プロジェクトのルートディレクトリ（このファイルの1つ上のディレクトリ）
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# デフォルトのキャッシュディレクトリ（どのディレクトリから実行しても同じ場所を使う）
+DEFAULT_CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache", "count_by_country")
+
+# キャッシュ全体の最大サイズ（超えた場合は最も古く使われたエントリから削除する）
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+def compute_file_hash(file_path, block_size=1024 * 1024):
+    """
+    ファイル内容のSHA-256ハッシュ値を計算する
+    
+    Args:
+        file_path: 対象ファイルのパス
+        block_size: 一度に読み込むバイト数
+    
+    Returns:
+        str: 16進数表記のハッシュ値
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ResultCache:
+    """
+    ファイル単位の集計結果をディスクに保存するキャッシュ
+    
+    キャッシュのキーはファイルの絶対パス・サイズ・更新日時（オプションで内容のハッシュ値）から
+    作成するため、ファイルが変更されると自動的に別のキーとなり再集計される。
+    キャッシュ全体のサイズが上限を超えた場合は、最も古く使われたエントリから削除する（LRU）。
+    キャッシュへの書き込みに失敗した場合は警告を表示して続行し、集計結果には影響しない。
+    """
+    
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, use_content_hash=False):
+        """
+        Args:
+            cache_dir: キャッシュを保存するディレクトリ
+            max_bytes: キャッシュ全体の最大サイズ（バイト）
+            use_content_hash: Trueの場合はファイル内容のハッシュ値もキーに含める
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.use_content_hash = use_content_hash
+        self._write_failed = False
+    
+    def file_state(self, file_path):
+        """
+        キャッシュキーに使うファイルの状態を取得する
+        
+        同じファイルの取得と保存、複数の種類の集計結果で状態を使い回すと、
+        内容のハッシュ値を含める場合でもファイル全体の読み込みは1回で済む。
+        
+        Args:
+            file_path: 集計対象のファイルパス
+        
+        Returns:
+            tuple: (絶対パス, サイズ, 更新日時[, 内容のハッシュ値])
+        """
+        stat = os.stat(file_path)
+        state = (os.path.abspath(file_path), str(stat.st_size), str(stat.st_mtime_ns))
+        if self.use_content_hash:
+            state += (compute_file_hash(file_path),)
+        return state
+    
+    def make_key(self, file_path, kind, state=None):
+        """
+        ファイルの状態からキャッシュキーを作成する
+        
+        Args:
+            file_path: 集計対象のファイルパス
+            kind: 集計結果の種類（同じファイルに対する異なる集計結果を区別する）
+            state: file_state() で取得したファイルの状態（Noneの場合はここで取得する）
+        
+        Returns:
+            str: キャッシュキー
+        """
+        if state is None:
+            state = self.file_state(file_path)
+        return hashlib.sha1("\0".join((kind,) + state).encode('utf-8')).hexdigest()
+    
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def get(self, file_path, kind='country_counts', state=None):
+        """
+        キャッシュされた集計結果を取得する
+        
+        Args:
+            file_path: 集計対象のファイルパス
+            kind: 集計結果の種類
+            state: file_state() で取得したファイルの状態（Noneの場合はここで取得する）
+        
+        Returns:
+            キャッシュされた集計結果（存在しない場合はNone）
+        """
+        entry_path = self._entry_path(self.make_key(file_path, kind, state))
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        # 使用日時を更新してLRUの順序に反映する
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return data
+    
+    def put(self, file_path, data, kind='country_counts', state=None):
+        """
+        集計結果をキャッシュに保存する
+        
+        書き込みに失敗した場合は警告を表示して何もしない（警告は1つのインスタンスにつき1回のみ表示する）。
+        
+        Args:
+            file_path: 集計対象のファイルパス
+            data: JSONに変換可能な集計結果
+            kind: 集計結果の種類
+            state: file_state() で取得したファイルの状態（Noneの場合はここで取得する）
+        """
+        entry_path = self._entry_path(self.make_key(file_path, kind, state))
+        
+        # 書き込み途中のファイルを読まないよう、一時ファイルに書いてから置き換える
+        temp_path = f"{entry_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_path, entry_path)
+        except OSError as e:
+            if not self._write_failed:
+                print(f"警告: 集計結果をキャッシュに保存できませんでした: {str(e)}")
+                self._write_failed = True
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        
+        self.evict()
+    
+    def evict(self):
+        """
+        キャッシュ全体のサイズが上限以下になるまで、最も古く使われたエントリから削除する
+        """
+        try:
+            names = [name for name in os.listdir(self.cache_dir) if name.endswith('.json')]
+        except OSError:
+            return
+        
+        entries = []
+        for name in names:
+            entry_path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(entry_path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry_path))
+        
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+                total_bytes -= size
+            except OSError:
+                pass
@@ -0,0 +1,834 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import math
+import base64
+
+try:
+    from src.lazy_import import LazyModule
+    from src.group_stats import STATS_COLUMNS, factorize_groups
+except ImportError:
+    # スクリプトとして直接実行された場合
+    from lazy_import import LazyModule
+    from group_stats import STATS_COLUMNS, factorize_groups
+
+# 起動時間を短縮するため、NumPy と pandas は使用する時点でインポートする
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# KLLスケッチの精度パラメータの既定値（k=200 で順位の誤差は概ね1〜2%）
+DEFAULT_KLL_K = 200
+
+# 各階層で保持する値の最小数
+KLL_MIN_CAPACITY = 2
+
+# 上位の階層に対する、1つ下の階層の保持数の比率
+KLL_CAPACITY_RATIO = 2 / 3
+
+# 既定で求めるパーセンタイル
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+# 重複を除いた件数を求めるカラム
+DISTINCT_COLUMNS = ["名前"]
+
+# HyperLogLog の精度（レジスタ数は 2^精度、標準誤差は約 1.04 / √(2^精度)）
+DEFAULT_HLL_PRECISION = 12
+MIN_HLL_PRECISION = 4
+MAX_HLL_PRECISION = 18
+
+# 上位の値を求める Space-Saving の既定の取得数と、取得数に対する監視数の倍率
+DEFAULT_TOP_K = 20
+TOP_K_CAPACITY_FACTOR = 10
+
+class KllSketch:
+    """
+    分位数を近似的に求めるKLLスケッチ（Karnin, Lang, Liberty）
+    
+    値を階層ごとのバッファ（階層 h の値は 2^h 件分の重みを持つ）に保持し、バッファが上限を超えたら
+    整列して1つおきに上の階層へ送る（圧縮する）。保持する値の数は件数によらず概ね 3k 以下で、
+    順位の誤差は k に反比例する。同じ k のスケッチ同士は merge() で統合できる。
+    圧縮で残す値（偶数番目か奇数番目か）は階層ごとに交互に選ぶため、同じ入力からは同じ結果になる。
+    """
+    
+    def __init__(self, k=DEFAULT_KLL_K):
+        """
+        Args:
+            k: 精度パラメータ（大きいほど誤差が小さく、メモリ使用量が大きい）
+        
+        Raises:
+            ValueError: k が KLL_MIN_CAPACITY 未満の場合
+        """
+        if k < KLL_MIN_CAPACITY:
+            raise ValueError(f"KLLスケッチの k は{KLL_MIN_CAPACITY}以上の整数を指定してください")
+        self.k = int(k)
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.levels = [np.empty(0)]
+        self.offsets = [0]
+    
+    def capacity(self, level):
+        """
+        階層のバッファの上限を取得する（最上位の階層が k、下の階層ほど小さくなる）
+        
+        Args:
+            level: 階層（0 が最下位）
+        
+        Returns:
+            int: バッファに保持する値の数の上限
+        """
+        depth = len(self.levels) - level - 1
+        return max(KLL_MIN_CAPACITY, int(math.ceil(self.k * KLL_CAPACITY_RATIO ** depth)))
+    
+    def update(self, values):
+        """
+        値をまとめて追加する
+        
+        Args:
+            values: 追加する値の配列（欠損値を含まないこと）
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+    
+    def _compress(self):
+        # 階層が増えると下位の階層の上限が小さくなるため、すべての階層が上限以下になるまで繰り返す
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) <= self.capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+                self.offsets.append(0)
+            items = np.sort(self.levels[level])
+            
+            # 件数が奇数の場合は最大の値をこの階層に残し、残りを2件ずつ1件にまとめる
+            keep = len(items) % 2
+            pairs = items[:len(items) - keep]
+            offset = self.offsets[level]
+            self.offsets[level] ^= 1
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], pairs[offset::2]])
+            self.levels[level] = items[len(items) - keep:]
+            level = 0
+    
+    def merge(self, other):
+        """
+        別のスケッチを統合する
+        
+        Args:
+            other: 統合するスケッチ（同じ k のもの）
+        
+        Returns:
+            KllSketch: 自身（統合後）
+        """
+        if other.count == 0:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+            self.offsets.append(0)
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+    
+    def quantiles(self, fractions):
+        """
+        分位数を求める
+        
+        Args:
+            fractions: 求める分位（0〜1）のリスト
+        
+        Returns:
+            list: 分位ごとの近似値（値が1件もない場合はNone、0 は最小値、1 は最大値）
+        """
+        if self.count == 0:
+            return [None for _ in fractions]
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level, dtype=np.int64)
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        values = values[order]
+        cumulative = np.cumsum(weights[order])
+        
+        results = []
+        for fraction in fractions:
+            if fraction <= 0:
+                results.append(self.min)
+            elif fraction >= 1:
+                results.append(self.max)
+            else:
+                # 重みの累積が指定した順位に達する最初の値
+                index = int(np.searchsorted(cumulative, fraction * cumulative[-1], side='left'))
+                results.append(float(values[min(index, len(values) - 1)]))
+        return results
+    
+    def to_dict(self):
+        """
+        JSONに変換可能な辞書に変換する（キャッシュへの保存用）
+        
+        Returns:
+            dict: スケッチの状態
+        """
+        return {
+            'k': self.k,
+            'count': self.count,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'levels': [items.tolist() for items in self.levels],
+            'offsets': list(self.offsets),
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        to_dict() で変換した辞書から復元する
+        
+        Args:
+            data: to_dict() で変換した辞書
+        
+        Returns:
+            KllSketch: 復元したスケッチ
+        """
+        sketch = cls(data['k'])
+        sketch.count = data['count']
+        if sketch.count:
+            sketch.min = data['min']
+            sketch.max = data['max']
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in data['levels']]
+        sketch.offsets = list(data['offsets'])
+        return sketch
+
+class GroupQuantiles:
+    """
+    グループ（国・地域など）ごと・数値カラムごとのKLLスケッチ
+    
+    グループごとのメモリ使用量は件数によらず一定で、チャンクやワーカープロセス、ファイルごとの
+    部分的な結果は merge() で統合できる。インターフェースは GroupStats と同じ。
+    """
+    
+    def __init__(self, columns=STATS_COLUMNS, k=DEFAULT_KLL_K):
+        """
+        Args:
+            columns: 分位数を求める数値カラム名のリスト
+            k: KLLスケッチの精度パラメータ
+        """
+        self.columns = list(columns)
+        self.k = k
+        self.sketches = {}
+    
+    def _get_sketches(self, group):
+        if group not in self.sketches:
+            self.sketches[group] = [KllSketch(self.k) for _ in self.columns]
+        return self.sketches[group]
+    
+    def update(self, keys, values):
+        """
+        1チャンク分の行をグループごとのスケッチに加える
+        
+        チャンク内の値はグループの番号で1回だけ並べ替え、グループごとの連続した範囲をまとめて追加する。
+        
+        Args:
+            keys: 各行のグループ（pd.Series や配列、欠損値の行は集計しない）
+            values: {カラム名: 各行の値の配列} の形式の辞書（欠損値はそのカラムの分位数から除く）
+        """
+        codes, uniques = factorize_groups(keys)
+        if not uniques:
+            return
+        valid = codes >= 0
+        for position, column in enumerate(self.columns):
+            column_values = pd.to_numeric(pd.Series(values[column]), errors='coerce').to_numpy(
+                dtype=np.float64, na_value=np.nan)
+            mask = valid & ~np.isnan(column_values)
+            group_codes = codes[mask]
+            order = np.argsort(group_codes, kind='stable')
+            sorted_values = column_values[mask][order]
+            boundaries = np.concatenate([[0], np.cumsum(np.bincount(group_codes, minlength=len(uniques)))])
+            for index, group in enumerate(uniques):
+                start, end = boundaries[index], boundaries[index + 1]
+                if start < end:
+                    self._get_sketches(group)[position].update(sorted_values[start:end])
+    
+    def merge(self, other):
+        """
+        別の部分的な集計結果を統合する
+        
+        Args:
+            other: 統合する GroupQuantiles（同じカラム・同じ k のもの）
+        
+        Returns:
+            GroupQuantiles: 自身（統合後）
+        """
+        for group, sketches in other.sketches.items():
+            for sketch, added in zip(self._get_sketches(group), sketches):
+                sketch.merge(added)
+        return self
+    
+    def map_groups(self, mapping, default=None):
+        """
+        グループをマッピングに従って変換し、同じグループになったものを統合する
+        
+        Args:
+            mapping: {変換前のグループ: 変換後のグループ} の形式の辞書
+            default: マッピングにないグループの変換先（Noneの場合は変換しない）
+        
+        Returns:
+            GroupQuantiles: 変換後の集計結果
+        """
+        mapped = GroupQuantiles(self.columns, self.k)
+        for group, sketches in self.sketches.items():
+            target = mapping.get(group, group if default is None else default)
+            for sketch, added in zip(mapped._get_sketches(target), sketches):
+                sketch.merge(added)
+        return mapped
+    
+    def summary(self, group, percentiles=DEFAULT_PERCENTILES):
+        """
+        グループの分位数を取得する
+        
+        Args:
+            group: グループ
+            percentiles: 求めるパーセンタイル（0〜100）のリスト
+        
+        Returns:
+            dict: {カラム名: {パーセンタイル: 近似値}} の形式の辞書（値がない場合はNone）
+        """
+        sketches = self.sketches.get(group) or [KllSketch(self.k) for _ in self.columns]
+        fractions = [percentile / 100 for percentile in percentiles]
+        return {column: dict(zip(percentiles, sketch.quantiles(fractions)))
+                for column, sketch in zip(self.columns, sketches)}
+    
+    def to_dict(self):
+        """
+        JSONに変換可能な辞書に変換する（キャッシュへの保存用）
+        
+        Returns:
+            dict: 集計結果
+        """
+        return {
+            'columns': self.columns,
+            'k': self.k,
+            'groups': [[str(group), [sketch.to_dict() for sketch in sketches]]
+                       for group, sketches in self.sketches.items()],
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        to_dict() で変換した辞書から復元する
+        
+        Args:
+            data: to_dict() で変換した辞書
+        
+        Returns:
+            GroupQuantiles: 復元した集計結果
+        """
+        quantiles = cls(data['columns'], data['k'])
+        for group, sketches in data['groups']:
+            quantiles.sketches[group] = [KllSketch.from_dict(sketch) for sketch in sketches]
+        return quantiles
+
+def hash_values(values):
+    """
+    値をベクトル演算で64ビットのハッシュ値に変換する
+    
+    pandas のハッシュ関数は固定の鍵を使うため、プロセスやファイルが異なっても同じ値は同じハッシュ値になる。
+    文字列型とカテゴリ型のように型が異なっても、同じ値であれば同じハッシュ値になる。
+    文字列のハッシュ値の計算は重いため、値の種類ごとに1回だけ計算する（カテゴリ型は pandas が同様に処理する）。
+    
+    Args:
+        values: 値の pd.Series（欠損値を含まないこと）
+    
+    Returns:
+        np.ndarray: 値ごとのハッシュ値（uint64）
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return pd.util.hash_pandas_object(values, index=False).to_numpy()
+    codes, uniques = pd.factorize(values)
+    return pd.util.hash_pandas_object(pd.Series(uniques), index=False).to_numpy()[codes]
+
+def hll_buckets_and_ranks(hashes, precision):
+    """
+    ハッシュ値を HyperLogLog のレジスタの番号と、残りのビットの先頭の0の数 + 1 に分ける
+    
+    Args:
+        hashes: ハッシュ値の配列（uint64）
+        precision: HyperLogLog の精度
+    
+    Returns:
+        tuple: (レジスタの番号の配列, 先頭の0の数 + 1 の配列)
+    """
+    remaining_bits = 64 - precision
+    buckets = (hashes >> np.uint64(remaining_bits)).astype(np.intp)
+    rest = hashes & np.uint64((1 << remaining_bits) - 1)
+    
+    # 残りのビットのビット長を二分探索で求める（浮動小数点数に変換すると丸め誤差が出るため）
+    bit_length = np.zeros(len(hashes), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = rest >= np.uint64(1 << shift)
+        bit_length[mask] += shift
+        rest[mask] >>= np.uint64(shift)
+    bit_length += (rest > 0)
+    return buckets, (remaining_bits - bit_length + 1).astype(np.uint8)
+
+class HyperLogLog:
+    """
+    重複を除いた件数を近似的に求める HyperLogLog（Flajolet ら）
+    
+    2^精度 個の1バイトのレジスタのみを保持するため、メモリ使用量は件数によらず一定で、
+    同じ精度の HyperLogLog 同士はレジスタごとの最大値をとることで統合できる。
+    """
+    
+    def __init__(self, precision=DEFAULT_HLL_PRECISION):
+        """
+        Args:
+            precision: 精度（MIN_HLL_PRECISION〜MAX_HLL_PRECISION）
+        
+        Raises:
+            ValueError: 範囲外の精度が指定された場合
+        """
+        if not MIN_HLL_PRECISION <= precision <= MAX_HLL_PRECISION:
+            raise ValueError(f"HyperLogLog の精度は{MIN_HLL_PRECISION}以上{MAX_HLL_PRECISION}以下の整数を指定してください")
+        self.precision = int(precision)
+        self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+    
+    @property
+    def standard_error(self):
+        """推定値の相対標準誤差"""
+        return 1.04 / math.sqrt(len(self.registers))
+    
+    def update_hashes(self, hashes):
+        """
+        ハッシュ値をまとめて追加する
+        
+        Args:
+            hashes: hash_values() で求めたハッシュ値の配列
+        """
+        buckets, ranks = hll_buckets_and_ranks(np.asarray(hashes, dtype=np.uint64), self.precision)
+        np.maximum.at(self.registers, buckets, ranks)
+    
+    def merge(self, other):
+        """
+        別の HyperLogLog を統合する
+        
+        Args:
+            other: 統合する HyperLogLog（同じ精度のもの）
+        
+        Returns:
+            HyperLogLog: 自身（統合後）
+        """
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+    
+    def estimate(self):
+        """
+        重複を除いた件数を推定する
+        
+        Returns:
+            int: 推定値
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # 件数が少ない場合は、値が入っていないレジスタの割合から求める（Linear Counting）
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+    
+    def to_dict(self):
+        """
+        JSONに変換可能な辞書に変換する（キャッシュへの保存用、レジスタは Base64 で符号化する）
+        
+        Returns:
+            dict: HyperLogLog の状態
+        """
+        return {'precision': self.precision, 'registers': base64.b64encode(self.registers.tobytes()).decode('ascii')}
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        to_dict() で変換した辞書から復元する
+        
+        Args:
+            data: to_dict() で変換した辞書
+        
+        Returns:
+            HyperLogLog: 復元した HyperLogLog
+        """
+        sketch = cls(data['precision'])
+        sketch.registers = np.frombuffer(base64.b64decode(data['registers']), dtype=np.uint8).copy()
+        return sketch
+
+class ExactDistinct:
+    """
+    重複を除いた件数を正確に求める（HyperLogLog の誤差の確認や、小さな入力の集計用）
+    
+    値のハッシュ値をすべて保持するため、メモリ使用量は重複を除いた件数に比例する。
+    インターフェースは HyperLogLog と同じ。
+    """
+    
+    standard_error = 0.0
+    
+    def __init__(self):
+        self.hashes = np.empty(0, dtype=np.uint64)
+    
+    def update_hashes(self, hashes):
+        """
+        ハッシュ値をまとめて追加する
+        
+        Args:
+            hashes: hash_values() で求めたハッシュ値の配列
+        """
+        self.hashes = np.union1d(self.hashes, np.asarray(hashes, dtype=np.uint64))
+    
+    def merge(self, other):
+        """
+        別の集計結果を統合する
+        
+        Args:
+            other: 統合する ExactDistinct
+        
+        Returns:
+            ExactDistinct: 自身（統合後）
+        """
+        self.hashes = np.union1d(self.hashes, other.hashes)
+        return self
+    
+    def estimate(self):
+        """
+        重複を除いた件数を求める
+        
+        Returns:
+            int: 重複を除いた件数
+        """
+        return len(self.hashes)
+    
+    def to_dict(self):
+        """
+        JSONに変換可能な辞書に変換する（キャッシュへの保存用）
+        
+        Returns:
+            dict: 集計結果
+        """
+        return {'hashes': self.hashes.tolist()}
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        to_dict() で変換した辞書から復元する
+        
+        Args:
+            data: to_dict() で変換した辞書
+        
+        Returns:
+            ExactDistinct: 復元した集計結果
+        """
+        distinct = cls()
+        distinct.hashes = np.asarray(data['hashes'], dtype=np.uint64)
+        return distinct
+
+class GroupDistinct:
+    """
+    グループ（国・地域など）ごと・カラムごとの重複を除いた件数
+    
+    既定では HyperLogLog で近似し、グループごとのメモリ使用量は件数によらず一定になる。
+    exact=True の場合は値のハッシュ値をすべて保持して正確に数える。
+    チャンクやワーカープロセス、ファイルごとの部分的な結果は merge() で統合できる。インターフェースは GroupStats と同じ。
+    """
+    
+    def __init__(self, columns=DISTINCT_COLUMNS, precision=DEFAULT_HLL_PRECISION, exact=False):
+        """
+        Args:
+            columns: 重複を除いた件数を求めるカラム名のリスト
+            precision: HyperLogLog の精度
+            exact: Trueの場合は近似せずに正確に数える
+        
+        Raises:
+            ValueError: 範囲外の精度が指定された場合
+        """
+        if not MIN_HLL_PRECISION <= precision <= MAX_HLL_PRECISION:
+            raise ValueError(f"HyperLogLog の精度は{MIN_HLL_PRECISION}以上{MAX_HLL_PRECISION}以下の整数を指定してください")
+        self.columns = list(columns)
+        self.precision = int(precision)
+        self.exact = bool(exact)
+        self.counters = {}
+    
+    @property
+    def standard_error(self):
+        """推定値の相対標準誤差（正確に数える場合は0）"""
+        return 0.0 if self.exact else 1.04 / math.sqrt(1 << self.precision)
+    
+    def _create_counter(self):
+        return ExactDistinct() if self.exact else HyperLogLog(self.precision)
+    
+    def _get_counters(self, group):
+        if group not in self.counters:
+            self.counters[group] = [self._create_counter() for _ in self.columns]
+        return self.counters[group]
+    
+    def update(self, keys, values):
+        """
+        1チャンク分の行の値をグループごとに加える
+        
+        ハッシュ値の計算はチャンク全体に対して1回だけ行い、HyperLogLog の場合は
+        （グループ, レジスタ）の組ごとの最大値を一度に求めてから各グループのレジスタに反映する。
+        
+        Args:
+            keys: 各行のグループ（pd.Series や配列、欠損値の行は集計しない）
+            values: {カラム名: 各行の値の配列} の形式の辞書（欠損値は数えない）
+        """
+        codes, uniques = factorize_groups(keys)
+        if not uniques:
+            return
+        num_groups = len(uniques)
+        for position, column in enumerate(self.columns):
+            column_values = pd.Series(values[column]).reset_index(drop=True)
+            mask = (codes >= 0) & column_values.notna().to_numpy()
+            hashes = hash_values(column_values[mask])
+            group_codes = codes[mask]
+            
+            if self.exact:
+                order = np.argsort(group_codes, kind='stable')
+                boundaries = np.concatenate([[0], np.cumsum(np.bincount(group_codes, minlength=num_groups))])
+                sorted_hashes = hashes[order]
+                for index, group in enumerate(uniques):
+                    if boundaries[index] < boundaries[index + 1]:
+                        self._get_counters(group)[position].update_hashes(
+                            sorted_hashes[boundaries[index]:boundaries[index + 1]])
+                continue
+            
+            registers_per_group = 1 << self.precision
+            buckets, ranks = hll_buckets_and_ranks(hashes, self.precision)
+            table = np.zeros(num_groups * registers_per_group, dtype=np.uint8)
+            np.maximum.at(table, group_codes * registers_per_group + buckets, ranks)
+            table = table.reshape(num_groups, registers_per_group)
+            group_rows = np.bincount(group_codes, minlength=num_groups)
+            for index, group in enumerate(uniques):
+                if group_rows[index]:
+                    counter = self._get_counters(group)[position]
+                    np.maximum(counter.registers, table[index], out=counter.registers)
+    
+    def merge(self, other):
+        """
+        別の部分的な集計結果を統合する
+        
+        Args:
+            other: 統合する GroupDistinct（同じカラム・同じ精度のもの）
+        
+        Returns:
+            GroupDistinct: 自身（統合後）
+        """
+        for group, counters in other.counters.items():
+            for counter, added in zip(self._get_counters(group), counters):
+                counter.merge(added)
+        return self
+    
+    def map_groups(self, mapping, default=None):
+        """
+        グループをマッピングに従って変換し、同じグループになったものを統合する
+        
+        Args:
+            mapping: {変換前のグループ: 変換後のグループ} の形式の辞書
+            default: マッピングにないグループの変換先（Noneの場合は変換しない）
+        
+        Returns:
+            GroupDistinct: 変換後の集計結果
+        """
+        mapped = GroupDistinct(self.columns, self.precision, self.exact)
+        for group, counters in self.counters.items():
+            target = mapping.get(group, group if default is None else default)
+            for counter, added in zip(mapped._get_counters(target), counters):
+                counter.merge(added)
+        return mapped
+    
+    def summary(self, group):
+        """
+        グループの重複を除いた件数を取得する
+        
+        Args:
+            group: グループ
+        
+        Returns:
+            dict: {カラム名: 重複を除いた件数（推定値）} の形式の辞書
+        """
+        counters = self.counters.get(group)
+        if counters is None:
+            return {column: 0 for column in self.columns}
+        return {column: counter.estimate() for column, counter in zip(self.columns, counters)}
+    
+    def to_dict(self):
+        """
+        JSONに変換可能な辞書に変換する（キャッシュへの保存用）
+        
+        Returns:
+            dict: 集計結果
+        """
+        return {
+            'columns': self.columns,
+            'precision': self.precision,
+            'exact': self.exact,
+            'groups': [[str(group), [counter.to_dict() for counter in counters]]
+                       for group, counters in self.counters.items()],
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        to_dict() で変換した辞書から復元する
+        
+        Args:
+            data: to_dict() で変換した辞書
+        
+        Returns:
+            GroupDistinct: 復元した集計結果
+        """
+        distinct = cls(data['columns'], data['precision'], data['exact'])
+        counter_class = ExactDistinct if distinct.exact else HyperLogLog
+        for group, counters in data['groups']:
+            distinct.counters[group] = [counter_class.from_dict(counter) for counter in counters]
+        return distinct
+
+class SpaceSaving:
+    """
+    出現回数の多い値（ヘビーヒッター）を近似的に求める Space-Saving（Metwally ら）
+    
+    最大 capacity 個の値について、出現回数の上限値と誤差を保持する。監視している値の実際の出現回数は
+    「上限値 - 誤差」以上「上限値」以下で、監視していない値の出現回数は floor 以下になる（floor は 総件数 / capacity 以下）。
+    値の種類数によらずメモリ使用量は一定で、部分的な結果は merge() で統合できる（Agarwal らの統合可能な要約）。
+    チャンク単位の更新では、チャンク内の出現回数を正確に数えてから統合する。
+    """
+    
+    def __init__(self, capacity=DEFAULT_TOP_K * TOP_K_CAPACITY_FACTOR):
+        """
+        Args:
+            capacity: 監視する値の最大数（大きいほど誤差が小さい）
+        
+        Raises:
+            ValueError: capacity が1未満の場合
+        """
+        if capacity < 1:
+            raise ValueError("Space-Saving の監視数は1以上の整数を指定してください")
+        self.capacity = int(capacity)
+        self.keys = np.empty(0, dtype=object)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.errors = np.empty(0, dtype=np.int64)
+        self.floor = 0
+        self.total = 0
+    
+    def update(self, values):
+        """
+        1チャンク分の値を加える
+        
+        Args:
+            values: 値の pd.Series（欠損値は数えない）
+        """
+        self.update_counts(pd.Series(values).value_counts(sort=False, dropna=True))
+    
+    def update_counts(self, counts):
+        """
+        1チャンク分の値ごとの出現回数を加える
+        
+        Args:
+            counts: 値ごとの正確な出現回数の pd.Series（インデックスが値）
+        """
+        if counts.empty:
+            return
+        self.total += int(counts.sum())
+        self._combine(counts.index.to_numpy(dtype=object), counts.to_numpy(dtype=np.int64),
+                      np.zeros(len(counts), dtype=np.int64), 0)
+    
+    def merge(self, other):
+        """
+        別の部分的な集計結果を統合する
+        
+        Args:
+            other: 統合する SpaceSaving
+        
+        Returns:
+            SpaceSaving: 自身（統合後）
+        """
+        self.total += other.total
+        self._combine(other.keys, other.counts, other.errors, other.floor)
+        return self
+    
+    def _combine(self, keys, counts, errors, floor):
+        # 一方にしかない値は、もう一方での出現回数を floor（監視していない値の上限）とみなす
+        index = pd.Index(self.keys).union(pd.Index(keys), sort=False)
+        combined_counts = np.full(len(index), self.floor + floor, dtype=np.int64)
+        combined_errors = combined_counts.copy()
+        own_positions = index.get_indexer(self.keys)
+        combined_counts[own_positions] += self.counts - self.floor
+        combined_errors[own_positions] += self.errors - self.floor
+        other_positions = index.get_indexer(keys)
+        combined_counts[other_positions] += counts - floor
+        combined_errors[other_positions] += errors - floor
+        
+        # 上限値の大きい順に capacity 個を残し、残さなかった値の上限値も floor に含める
+        order = np.argsort(-combined_counts, kind='stable')
+        new_floor = self.floor + floor
+        if len(order) > self.capacity:
+            new_floor = max(new_floor, int(combined_counts[order[self.capacity]]))
+            order = order[:self.capacity]
+        self.keys = index.to_numpy(dtype=object)[order]
+        self.counts = combined_counts[order]
+        self.errors = combined_errors[order]
+        self.floor = new_floor
+    
+    def top(self, k):
+        """
+        上限値の大きい順に k 個の値を取得する
+        
+        Args:
+            k: 取得する値の数
+        
+        Returns:
+            list: (値, 上限値, 誤差, 上位 k 個に入ることが確定しているか) のリスト
+        """
+        k = min(k, len(self.keys))
+        # k+1 番目の値（または監視していない値）の上限値を下回らない下限値を持つ値は、上位 k 個に確定する
+        threshold = max(self.floor, int(self.counts[k])) if k < len(self.keys) else self.floor
+        return [(self.keys[i], int(self.counts[i]), int(self.errors[i]),
+                 bool(self.counts[i] - self.errors[i] >= threshold)) for i in range(k)]
+    
+    def to_dict(self):
+        """
+        JSONに変換可能な辞書に変換する（キャッシュへの保存用）
+        
+        Returns:
+            dict: 集計結果
+        """
+        return {
+            'capacity': self.capacity,
+            'floor': self.floor,
+            'total': self.total,
+            'items': [[key, int(count), int(error)] for key, count, error in zip(self.keys, self.counts, self.errors)],
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        to_dict() で変換した辞書から復元する
+        
+        Args:
+            data: to_dict() で変換した辞書
+        
+        Returns:
+            SpaceSaving: 復元した集計結果
+        """
+        summary = cls(data['capacity'])
+        summary.floor = data['floor']
+        summary.total = data['total']
+        items = data['items']
+        summary.keys = np.array([key for key, _, _ in items], dtype=object)
+        summary.counts = np.array([count for _, count, _ in items], dtype=np.int64)
+        summary.errors = np.array([error for _, _, error in items], dtype=np.int64)
+        return summary
@@ -0,0 +1,543 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import csv
+import json
+import time
+import argparse
+from functools import partial
+
+try:
+    from src.lazy_import import LazyModule
+    from src.profiling import create_profiler, NULL_PROFILER
+    from src.sketches import SpaceSaving, DEFAULT_TOP_K, TOP_K_CAPACITY_FACTOR
+    from src.count_by_country import (
+        COUNTRY_CODE_COLUMN,
+        DEFAULT_RANGE_BYTES,
+        PARQUET_BATCH_SIZE,
+        get_country_code_map,
+        get_country_column,
+        read_csv_columns,
+        split_byte_ranges,
+        get_input_format,
+        resolve_input_paths,
+        format_table_lines,
+        get_cache_state,
+        create_cache_states,
+        scan_files,
+        print_report,
+        add_input_arguments,
+        add_profile_arguments,
+        check_input_arguments,
+        create_result_cache
+    )
+except ImportError:
+    # スクリプトとして直接実行された場合
+    from lazy_import import LazyModule
+    from profiling import create_profiler, NULL_PROFILER
+    from sketches import SpaceSaving, DEFAULT_TOP_K, TOP_K_CAPACITY_FACTOR
+    from count_by_country import (
+        COUNTRY_CODE_COLUMN,
+        DEFAULT_RANGE_BYTES,
+        PARQUET_BATCH_SIZE,
+        get_country_code_map,
+        get_country_column,
+        read_csv_columns,
+        split_byte_ranges,
+        get_input_format,
+        resolve_input_paths,
+        format_table_lines,
+        get_cache_state,
+        create_cache_states,
+        scan_files,
+        print_report,
+        add_input_arguments,
+        add_profile_arguments,
+        check_input_arguments,
+        create_result_cache
+    )
+
+# 起動時間を短縮するため、pandas は使用する時点でインポートする
+pd = LazyModule('pandas')
+concurrent_futures = LazyModule('concurrent.futures')
+
+# 上位の値を数える際にチャンクサイズを指定しない場合の1チャンクあたりの行数
+TOP_K_CHUNKSIZE = 1000000
+
+def read_top_column(source, column, **kwargs):
+    """
+    CSVから上位の値を求めるカラムのみを文字列として読み込む
+    
+    数値のカラムもチャンクやファイルによって型が変わらないように文字列として読み込む。
+    
+    Args:
+        source: CSVファイルのパスまたはファイルオブジェクト
+        column: カラム名
+        **kwargs: pd.read_csv に渡す追加の引数（chunksize など）
+        
+    Returns:
+        pd.DataFrame: 読み込んだカラム（chunksize指定時はチャンクのイテレータ）
+    """
+    return pd.read_csv(source, usecols=[column], dtype={column: str}, **kwargs)
+
+def get_top_column(file_columns, column=None):
+    """
+    上位の値を求めるカラムを決定する
+    
+    Args:
+        file_columns: ファイルのカラム名のリスト
+        column: 指定されたカラム名（Noneの場合は「国」または「国コード」カラム）
+        
+    Returns:
+        str: カラム名
+        
+    Raises:
+        KeyError: カラムが存在しない場合
+    """
+    if column is None:
+        return get_country_column(file_columns)
+    if column not in file_columns:
+        raise KeyError(f"CSVファイルに「{column}」カラムが存在しません")
+    return column
+
+def count_top_values(summary, values):
+    """
+    1チャンク分の値を数え、Space-Saving の集計結果に加える
+    
+    「国コード」カラムの値はマスタデータの国名に置き換えてから数えるため、
+    「国」カラムのファイルと「国コード」カラムのファイルの結果を統合できる。
+    
+    Args:
+        summary: 集計結果を加える SpaceSaving
+        values: 値の pd.Series（name がカラム名）
+    """
+    counts = values.value_counts(sort=False, dropna=True)
+    if values.name == COUNTRY_CODE_COLUMN and not counts.empty:
+        country_code_map = get_country_code_map()
+        counts = counts.groupby(counts.index.map(lambda code: country_code_map.get(code, code)), sort=False).sum()
+    summary.update_counts(counts)
+
+def top_k_byte_range(file_path, header, start, end, column, capacity):
+    """
+    CSVファイルの指定したバイト範囲の値を Space-Saving で数える（並列集計のワーカー処理）
+    
+    Args:
+        file_path: CSVファイルのパス
+        header: ヘッダー行のバイト列
+        start: 範囲の開始位置（行頭）
+        end: 範囲の終了位置（行頭またはファイル末尾）
+        column: 数えるカラム名
+        capacity: Space-Saving の監視数
+        
+    Returns:
+        SpaceSaving: 範囲内の集計結果
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    
+    summary = SpaceSaving(capacity)
+    count_top_values(summary, read_top_column(io.BytesIO(header + data), column)[column])
+    return summary
+
+def aggregate_top_k_parallel(file_path, workers, column, capacity, range_bytes=DEFAULT_RANGE_BYTES):
+    """
+    CSVファイルを行の境界に揃えたバイト範囲に分割し、値の出現回数をプロセスプールで並列に数える
+    
+    各ワーカーは監視数分の集計結果のみを返し、親プロセスでそれらを統合する。
+    
+    Args:
+        file_path: CSVファイルのパス
+        workers: ワーカープロセス数
+        column: 数えるカラム名
+        capacity: Space-Saving の監視数
+        range_bytes: 1タスクが担当するバイト範囲の上限
+        
+    Returns:
+        SpaceSaving: 集計結果
+    """
+    data_size = os.path.getsize(file_path)
+    num_ranges = max(workers, -(-data_size // range_bytes))
+    header, ranges = split_byte_ranges(file_path, num_ranges)
+    
+    summary = SpaceSaving(capacity)
+    with concurrent_futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(top_k_byte_range, file_path, header, start, end, column, capacity)
+                   for start, end in ranges]
+        for future in futures:
+            summary.merge(future.result())
+    
+    return summary
+
+def aggregate_top_k_parquet(file_path, column, capacity, batch_size=PARQUET_BATCH_SIZE):
+    """
+    Parquet形式のファイルから1つのカラムのみをバッチ単位で読み込み、値の出現回数を Space-Saving で数える
+    
+    Args:
+        file_path: Parquetファイルのパス
+        column: 数えるカラム名（Noneの場合は「国」または「国コード」カラム）
+        capacity: Space-Saving の監視数
+        batch_size: 一度に読み込む行数
+        
+    Returns:
+        SpaceSaving: 集計結果
+        
+    Raises:
+        ImportError: pyarrow がインストールされていない場合
+        KeyError: カラムが存在しない場合
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet形式を扱うには pyarrow をインストールしてください（pip install pyarrow）")
+    
+    parquet_file = pq.ParquetFile(file_path)
+    column = get_top_column(parquet_file.schema_arrow.names, column)
+    
+    summary = SpaceSaving(capacity)
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=[column]):
+        # CSVと同じく値を文字列として数える
+        values = batch.column(0).to_pandas()
+        count_top_values(summary, values.astype(str).where(values.notna()).rename(column))
+    
+    return summary
+
+def scan_top_k(file_path, chunksize=None, workers=None, column=None, capacity=DEFAULT_TOP_K * TOP_K_CAPACITY_FACTOR):
+    """
+    ファイルを1回だけ走査して、カラムの値の出現回数を Space-Saving で数える
+    
+    値の種類数によらず、メモリ使用量は監視数と1チャンク分のデータの大きさで決まる。
+    チャンクサイズを指定しない場合も TOP_K_CHUNKSIZE 行ずつ読み込む。
+    
+    Args:
+        file_path: CSVファイルまたはParquetファイルのパス
+        chunksize: 1チャンクあたりの行数（CSVのみ）
+        workers: 2以上を指定した場合はバイト範囲に分割して並列に数える（CSVのみ）
+        column: 数えるカラム名（Noneの場合は「国」または「国コード」カラムで、国コードは国名に置き換える）
+        capacity: Space-Saving の監視数
+        
+    Returns:
+        SpaceSaving: 集計結果
+        
+    Raises:
+        KeyError: カラムが存在しない場合
+        ValueError: 無効なチャンクサイズが指定された場合
+    """
+    if get_input_format(file_path) == 'parquet':
+        return aggregate_top_k_parquet(file_path, column, capacity)
+    
+    column = get_top_column(read_csv_columns(file_path), column)
+    
+    if workers is not None and workers > 1:
+        return aggregate_top_k_parallel(file_path, workers, column, capacity)
+    
+    if chunksize is None:
+        chunksize = TOP_K_CHUNKSIZE
+    if chunksize <= 0:
+        raise ValueError("チャンクサイズは1以上の整数を指定してください")
+    summary = SpaceSaving(capacity)
+    for chunk in read_top_column(file_path, column, chunksize=chunksize):
+        count_top_values(summary, chunk[column])
+    return summary
+
+def get_top_k_cache_kind(column, capacity):
+    """
+    上位の値の集計結果をキャッシュに保存する際の種類を取得する
+    
+    Args:
+        column: 数えるカラム名（Noneの場合は「国」または「国コード」カラム）
+        capacity: Space-Saving の監視数（異なる監視数の結果は別に保存する）
+        
+    Returns:
+        str: ResultCache の集計結果の種類
+    """
+    return 'top_k:' + json.dumps({'column': column, 'capacity': capacity}, sort_keys=True, ensure_ascii=False)
+
+def load_cached_top_k(cache, file_path, column, capacity, state=None):
+    """
+    キャッシュからファイル単位の上位の値の集計結果を取得する
+    
+    Args:
+        cache: ResultCache（Noneの場合はキャッシュを使用しない）
+        file_path: ファイルのパス
+        column: 数えるカラム名
+        capacity: Space-Saving の監視数
+        state: get_cache_state() で取得したファイルの状態（Noneの場合はキャッシュが取得する）
+        
+    Returns:
+        SpaceSaving: 集計結果（キャッシュにない場合はNone）
+    """
+    if cache is None:
+        return None
+    cached = cache.get(file_path, kind=get_top_k_cache_kind(column, capacity), state=state)
+    return SpaceSaving.from_dict(cached) if cached is not None else None
+
+def store_cached_top_k(cache, file_path, column, capacity, summary, state=None):
+    """
+    ファイル単位の上位の値の集計結果をキャッシュに保存する
+    
+    Args:
+        cache: ResultCache（Noneの場合は何もしない）
+        file_path: ファイルのパス
+        column: 数えるカラム名
+        capacity: Space-Saving の監視数
+        summary: 集計結果（SpaceSaving）
+        state: get_cache_state() で取得したファイルの状態（Noneの場合はキャッシュが取得する）
+    """
+    if cache is not None:
+        cache.put(file_path, summary.to_dict(), kind=get_top_k_cache_kind(column, capacity), state=state)
+
+def aggregate_top_k_files(file_paths, column=None, capacity=DEFAULT_TOP_K * TOP_K_CAPACITY_FACTOR, workers=None,
+                          chunksize=None, cache=None):
+    """
+    複数のファイルの値の出現回数をファイル単位で並列に数え、結果を統合する
+    
+    Args:
+        file_paths: ファイルパスのリスト
+        column: 数えるカラム名（Noneの場合は「国」または「国コード」カラム）
+        capacity: Space-Saving の監視数
+        workers: ワーカープロセス数（省略時はCPUコア数、1の場合は逐次処理）
+        chunksize: 1チャンクあたりの行数
+        cache: ファイル単位の集計結果のキャッシュ（ResultCache）
+        
+    Returns:
+        SpaceSaving: 統合した集計結果
+        
+    Raises:
+        ValueError: 無効なワーカー数が指定された場合
+        Exception: いずれかのファイルの集計に失敗した場合（file_path属性に失敗したファイルを設定する）
+    """
+    state = create_cache_states(cache)
+    file_summaries = scan_files(file_paths, partial(scan_top_k, column=column, capacity=capacity), workers, chunksize,
+                                lambda file_path: load_cached_top_k(cache, file_path, column, capacity,
+                                                                    state(file_path)),
+                                lambda file_path, summary: store_cached_top_k(cache, file_path, column, capacity,
+                                                                              summary, state(file_path)))
+    
+    summary = SpaceSaving(capacity)
+    for file_summary in file_summaries.values():
+        summary.merge(file_summary)
+    return summary
+
+class TopKResult:
+    """
+    出現回数の多い上位 k 個の値の集計結果
+    
+    件数は Space-Saving による上限値で、実際の件数は「件数 - 誤差」以上「件数」以下になる。
+    上位に含まれない値の件数は「その他」にまとめ、上位に含まれない個々の値の件数は max_unlisted 以下になる。
+    """
+    
+    def __init__(self, column, summary, k, timings=None):
+        """
+        Args:
+            column: 数えたカラム名
+            summary: 集計結果（SpaceSaving）
+            k: 上位の値の数
+            timings: {処理の段階: 処理時間（秒）} の形式の辞書
+        """
+        self.column = column
+        self.k = k
+        self.capacity = summary.capacity
+        self.total = summary.total
+        self.items = [{'name': key, 'count': count, 'error': error, 'guaranteed': guaranteed}
+                      for key, count, error, guaranteed in summary.top(k)]
+        self.other = max(0, self.total - sum(item['count'] for item in self.items))
+        self.other_error = sum(item['error'] for item in self.items)
+        self.max_unlisted = summary.floor
+        self.timings = dict(timings or {})
+    
+    def to_dict(self):
+        """
+        JSONに変換可能な辞書に変換する
+        
+        Returns:
+            dict: 集計結果
+        """
+        return {
+            'column': self.column,
+            'k': self.k,
+            'capacity': self.capacity,
+            'total': self.total,
+            'items': self.items,
+            'other': {'count': self.other, 'error': self.other_error},
+            'max_unlisted': self.max_unlisted,
+            'timings': self.timings,
+        }
+
+def aggregate_top_k(file_path, k=DEFAULT_TOP_K, column=None, capacity=None, chunksize=None, workers=None, cache=None,
+                    profiler=NULL_PROFILER):
+    """
+    ファイルを1回だけ走査し、カラムの値の出現回数の上位 k 個を Space-Saving で求める（表示は行わない）
+    
+    値の種類数が多いカラム（自由記述の「国」や「名前」など）でも、すべての値の件数を保持・並び替えせずに、
+    監視数分のメモリで上位の値とその誤差を求める。
+    
+    Args:
+        file_path: CSVファイル（またはParquetファイル）のパス、または複数のファイルパスのリスト
+        k: 上位の値の数
+        column: 数えるカラム名（Noneの場合は「国」または「国コード」カラム）
+        capacity: Space-Saving の監視数（省略時は k の TOP_K_CAPACITY_FACTOR 倍、大きいほど誤差が小さい）
+        chunksize: 1チャンクあたりの行数（省略時は TOP_K_CHUNKSIZE）
+        workers: 2以上を指定した場合は複数プロセスで並列に数える
+        cache: ファイル単位の集計結果のキャッシュ（ResultCache、Noneの場合は使用しない）
+        profiler: 処理段階（scan・rank）ごとの計測に使用するプロファイラ
+        
+    Returns:
+        TopKResult: 集計結果
+        
+    Raises:
+        FileNotFoundError: ファイルが存在しない場合
+        KeyError: カラムが存在しない場合
+        ValueError: k または監視数が1未満、または監視数が k 未満の場合
+    """
+    if capacity is None:
+        capacity = k * TOP_K_CAPACITY_FACTOR
+    if k < 1 or capacity < k:
+        raise ValueError("上位の値の数は1以上、監視数は上位の値の数以上の整数を指定してください")
+    
+    start = time.perf_counter()
+    single_file = isinstance(file_path, (str, os.PathLike))
+    with profiler.phase('scan') as phase:
+        if single_file:
+            state = get_cache_state(cache, file_path)
+            summary = load_cached_top_k(cache, file_path, column, capacity, state)
+            if summary is None:
+                summary = scan_top_k(file_path, chunksize, workers, column, capacity)
+                store_cached_top_k(cache, file_path, column, capacity, summary, state)
+        else:
+            summary = aggregate_top_k_files(file_path, column, capacity, workers, chunksize, cache)
+        if profiler.enabled:
+            phase.rows = summary.total
+    scanned = time.perf_counter()
+    
+    with profiler.phase('rank'):
+        label = column if column is not None else '国'
+        result = TopKResult(label, summary, k)
+    result.timings = {'scan': scanned - start, 'rank': time.perf_counter() - scanned}
+    result.timings['total'] = result.timings['scan'] + result.timings['rank']
+    return result
+
+def render_top_k_text(result):
+    """
+    上位の値の集計結果を表示用のテキストに変換する
+    
+    Args:
+        result: 集計結果（TopKResult）
+        
+    Returns:
+        str: 表示用のテキスト
+    """
+    rows = [[str(item['name']), f"{item['count']:,}", f"{item['error']:,}", '確定' if item['guaranteed'] else '推定']
+            for item in result.items]
+    rows.append(['その他', f"{result.other:,}", f"{result.other_error:,}", ''])
+    rows.append(['合計', f"{result.total:,}", '', ''])
+    lines = format_table_lines(f'【{result.column}の上位{result.k}件】', [result.column, '件数', '誤差', '区分'], rows)
+    
+    # 件数は推定値のため、誤差の読み方を注記する（確定は誤差を含めても順位が変わらない値）
+    lines = [line.rstrip() for line in lines]
+    lines.append('')
+    lines.append(f"※ 上位の値の実際の件数は「件数 - 誤差」以上「件数」以下、その他は「件数」以上「件数 + 誤差」以下です。"
+                 f"上位に含まれない値の件数はそれぞれ最大{result.max_unlisted:,}件です。")
+    return "\n".join(lines) + "\n"
+
+def render_top_k_csv(result):
+    """
+    上位の値の集計結果を「区分,名前,件数,誤差」のCSV形式に変換する
+    
+    Args:
+        result: 集計結果（TopKResult）
+        
+    Returns:
+        str: CSV形式の文字列
+    """
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(["区分", "名前", "件数", "誤差"])
+    writer.writerows(["上位", item['name'], item['count'], item['error']] for item in result.items)
+    writer.writerow(["その他", "", result.other, result.other_error])
+    writer.writerow(["合計", "", result.total, 0])
+    return output.getvalue()
+
+# 上位の値の集計結果の表示形式と変換関数
+TOP_K_RENDERERS = {
+    'text': render_top_k_text,
+    'json': lambda result: json.dumps(result.to_dict(), ensure_ascii=False, indent=2) + "\n",
+    'csv': render_top_k_csv,
+}
+
+def render_top_k(result, output_format='text'):
+    """
+    上位の値の集計結果を指定した表示形式の文字列に変換する
+    
+    Args:
+        result: 集計結果（TopKResult）
+        output_format: 表示形式（TOP_K_RENDERERS に登録した形式）
+        
+    Returns:
+        str: 変換した文字列
+        
+    Raises:
+        ValueError: 登録されていない表示形式が指定された場合
+    """
+    if output_format not in TOP_K_RENDERERS:
+        raise ValueError(f"表示形式は {list(TOP_K_RENDERERS)} のいずれかを指定してください")
+    return TOP_K_RENDERERS[output_format](result)
+
+def count_top_k(file_path, output_format='text', profiler=NULL_PROFILER, **options):
+    """
+    ファイルのカラムの値の出現回数の上位 k 個を Space-Saving で求めて表示する
+    
+    集計結果をプログラムから利用する場合は aggregate_top_k() を使用すること。
+    
+    Args:
+        file_path: CSVファイル（またはParquetファイル）のパス、または複数のファイルパスのリスト
+        output_format: 表示形式（"text"、"json"、"csv"）
+        profiler: 処理段階ごとの計測に使用するプロファイラ（計測結果は処理の終了時に出力する）
+        **options: aggregate_top_k() に渡す集計の指定（k・column・capacity・chunksize・workers・cache）
+        
+    Returns:
+        None
+    """
+    print_report(file_path,
+                 lambda: aggregate_top_k(file_path, profiler=profiler, **options),
+                 lambda result: render_top_k(result, output_format),
+                 profiler)
+
+
+if __name__ == "__main__":
+    try:
+        # コマンドラインからパラメータを受け取る
+        parser = argparse.ArgumentParser(description='CSVファイルのカラムの値の出現回数の上位K個と誤差を Space-Saving で求めます'
+                                                     '（値の種類数が多いカラムでもメモリ使用量が一定）。')
+        add_input_arguments(parser, '集計するCSV/Parquetファイル、globパターン、またはディレクトリ')
+        parser.add_argument('-k', '--top-k', type=int, default=DEFAULT_TOP_K, metavar='K',
+                            help=f'求める上位の値の数 (デフォルト: {DEFAULT_TOP_K})')
+        parser.add_argument('--column', type=str, default=None, metavar='カラム',
+                            help='数えるカラム (デフォルト: 「国」または「国コード」)')
+        parser.add_argument('--capacity', type=int, default=None,
+                            help=f'監視する値の数 (デフォルト: Kの{TOP_K_CAPACITY_FACTOR}倍、大きいほど誤差が小さい)')
+        parser.add_argument('--format', type=str, choices=list(TOP_K_RENDERERS), default='text',
+                            help='出力形式 (text: 整形した表, json: JSON形式, csv: 「区分,名前,件数,誤差」のCSV形式) '
+                                 '(デフォルト: text)')
+        add_profile_arguments(parser)
+        args = parser.parse_args()
+        
+        # 入力指定を集計対象のファイルに展開する
+        file_paths = resolve_input_paths(args.inputs)
+        error = check_input_arguments(args, file_paths)
+        
+        if error is not None:
+            print(error)
+        elif args.top_k <= 0 or (args.capacity is not None and args.capacity < args.top_k):
+            print("エラー: -k は1以上、--capacity は -k 以上の整数を指定してください")
+        else:
+            # 単一ファイルはそのまま、複数ファイルはリストとして集計する
+            target = file_paths[0] if len(file_paths) == 1 else file_paths
+            count_top_k(target, output_format=args.format,
+                        profiler=create_profiler('top_k', args.profile, args.profile_tracemalloc),
+                        k=args.top_k, column=args.column, capacity=args.capacity, chunksize=args.chunksize,
+                        workers=args.workers, cache=create_result_cache(args))
+    except Exception as e:
+        print(f"プログラムの実行中にエラーが発生しました: {str(e)}")
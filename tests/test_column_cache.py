@@ -0,0 +1,91 @@
+import os
+import numpy as np
+import tempfile
+from src.column_cache import (
+    get_cache_paths,
+    select_code_dtype,
+    load_column_codes,
+    count_column_codes,
+    build_column_cache
+)
+
+
+class TestColumnCache:
+    """列キャッシュ（辞書と符号配列）のテスト"""
+    
+    def _write(self, file_path, content):
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    
+    def test_select_code_dtype(self):
+        """辞書の要素数に応じた符号の型の選択のテスト"""
+        # 欠損値の符号1つ分を残して選ばれる
+        assert select_code_dtype(0) == np.uint8
+        assert select_code_dtype(254) == np.uint8
+        assert select_code_dtype(255) == np.uint16
+        assert select_code_dtype(70000) == np.uint32
+    
+    def test_build_and_load(self):
+        """列キャッシュを作成して読み込めることのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_path = os.path.join(temp_dir, 'data.csv')
+            self._write(data_path, "ID,国\n1,日本\n2,アメリカ\n3,日本\n4,\n5,インド\n")
+            
+            # 機能のテスト - チャンクをまたいで辞書が共有される
+            dictionary, codes = build_column_cache(data_path, ['国'], chunksize=2)['国']
+            
+            # 結果の検証 - 欠損値は辞書の要素数と等しい符号になる
+            assert dictionary == ['日本', 'アメリカ', 'インド']
+            assert codes.dtype == np.uint8
+            assert codes.tolist() == [0, 1, 0, 3, 2]
+            assert all(os.path.exists(path) for path in get_cache_paths(data_path, '国'))
+            
+            loaded_dictionary, loaded_codes = load_column_codes(data_path, '国')
+            assert loaded_dictionary == dictionary
+            assert isinstance(loaded_codes, np.memmap)
+            assert loaded_codes.tolist() == codes.tolist()
+            
+            # 一時ファイルが残らない
+            assert sorted(os.listdir(temp_dir)) == ['data.csv', 'data.csv.国.codes.npy', 'data.csv.国.dict.json']
+    
+    def test_count_column_codes(self):
+        """符号配列から値ごとの件数を求めるテスト"""
+        dictionary = ['日本', 'アメリカ', 'インド', 'ドイツ']
+        codes = np.array([0, 1, 0, 4, 2, 0, 2], dtype=np.uint8)
+        
+        # 機能のテスト - ブロックに分けても結果は同じ
+        result = count_column_codes(dictionary, codes, block_size=3)
+        
+        # 結果の検証 - 欠損値と件数0の値は除かれ、件数の降順に並ぶ
+        assert list(result.items()) == [('日本', 3), ('インド', 2), ('アメリカ', 1)]
+    
+    def test_invalidated_when_file_changes(self):
+        """元のファイルが変更された場合にキャッシュが無効になることのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_path = os.path.join(temp_dir, 'data.csv')
+            
+            # キャッシュがない場合
+            self._write(data_path, "ID,国\n1,日本\n")
+            assert load_column_codes(data_path, '国') is None
+            
+            build_column_cache(data_path, ['国'])
+            assert load_column_codes(data_path, '国') is not None
+            
+            # ファイルに行を追加する（サイズと更新日時が変わる）
+            self._write(data_path, "ID,国\n1,日本\n2,インド\n")
+            
+            # 結果の検証
+            assert load_column_codes(data_path, '国') is None
+    
+    def test_multiple_columns(self):
+        """複数のカラムを1回の走査でキャッシュできることのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_path = os.path.join(temp_dir, 'data.csv')
+            self._write(data_path, "ID,名前,国\n1,山田,日本\n2,Smith,アメリカ\n3,山田,日本\n")
+            
+            # 機能のテスト
+            result = build_column_cache(data_path, ['名前', '国'])
+            
+            # 結果の検証
+            assert count_column_codes(*result['名前']).to_dict() == {'山田': 2, 'Smith': 1}
+            assert count_column_codes(*load_column_codes(data_path, '国')).to_dict() == {'日本': 2, 'アメリカ': 1}
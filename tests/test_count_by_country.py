@@ -1,10 +1,16 @@
 import os
+import json
+import numpy as np
 import pandas as pd
 import pytest
 import tempfile
-import io
 from unittest.mock import patch
+from src.result_cache import ResultCache
 from src.count_by_country import (
+    count_csv_light,
+    resolve_country_names,
+    aggregate_country_codes,
+    aggregate_with_column_cache,
     get_east_asian_width_count, 
     aggregate_by_country,
     get_ordered_countries,
@@ -18,7 +24,24 @@ from src.count_by_country import (
     aggregate_by_region,
     get_ordered_regions,
     create_ordered_region_counts,
-    display_region_results
+    display_region_results,
+    merge_counts,
+    aggregate_in_chunks,
+    aggregate_region_from_country_counts,
+    rollup_counts,
+    rollup_country_counts,
+    get_hierarchy_mappings,
+    scan_country_counts,
+    split_byte_ranges,
+    aggregate_parallel,
+    resolve_input_paths,
+    aggregate_files,
+    aggregate_parquet,
+    get_input_format,
+    display_report,
+    aggregate_report,
+    render_result,
+    CountResult
 )
 
 
@@ -32,6 +55,12 @@ class TestCountByCountry:
         assert get_east_asian_width_count('ABC') == 3
         assert get_east_asian_width_count('日本') == 4
         assert get_east_asian_width_count('Hello日本') == 9
+        
+        # 計算結果は保持され、同じラベルの2回目以降は再計算しない
+        get_east_asian_width_count.cache_clear()
+        assert get_east_asian_width_count('ブラジル') == 8
+        assert get_east_asian_width_count('ブラジル') == 8
+        assert get_east_asian_width_count.cache_info().hits == 1
     
     def test_aggregate_by_country(self):
         """国別に集計する機能のテスト"""
@@ -411,6 +440,29 @@ class TestCountByCountry:
         assert '合計' in output
         assert '20件' in output
     
+    def test_display_writes_once(self, capsys):
+        """表全体を1回の書き込みで出力し、従来の1行ずつの表示と同じ形式となることのテスト"""
+        # テストデータの作成
+        region_counts = {'アジア': 1000, 'ヨーロッパ': 5, 'Other': 3}
+        
+        # 機能のテスト
+        with patch('sys.stdout') as mock_stdout:
+            display_region_results(region_counts, region_counts)
+            display_results(region_counts, region_counts)
+        display_region_results(region_counts, region_counts)
+        output = capsys.readouterr().out
+        
+        # 結果の検証
+        assert mock_stdout.write.call_count == 2
+        assert output == mock_stdout.write.call_args_list[0].args[0]
+        assert output.splitlines() == [
+            '【地域別集計結果】',
+            'アジア    ：1,000件',
+            'ヨーロッパ：    5件',
+            'Other     ：    3件',
+            '合計      ：1,008件',
+        ]
+    
     def test_count_by_country_with_regions(self, capsys):
         """国別・地域別集計機能の統合テスト"""
         # テスト用のCSVファイルを作成
@@ -455,4 +507,785 @@ class TestCountByCountry:
         finally:
             # テスト終了後にファイルを削除
             if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
\ No newline at end of file
+                os.unlink(temp_file_path)
+    
+    def test_merge_counts(self):
+        """部分集計結果を統合する機能のテスト"""
+        first = pd.Series({'日本': 2, 'アメリカ': 1})
+        second = pd.Series({'アメリカ': 3, 'インド': 1})
+        
+        # 機能のテスト
+        result = merge_counts([first, None, second, pd.Series(dtype='int64')])
+        
+        # 結果の検証 - 件数の降順で統合される
+        assert list(result.index) == ['アメリカ', '日本', 'インド']
+        assert list(result) == [4, 2, 1]
+        
+        # すべて空の場合は空のシリーズを返す
+        assert merge_counts([None]).empty
+    
+    def test_aggregate_in_chunks(self):
+        """チャンク単位で集計した結果が一括読み込みの結果と一致することのテスト"""
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as temp_file:
+            temp_file_path = temp_file.name
+            
+            csv_data = "ID,名前,年齢,国,スコア\n" + \
+                        "1,太郎,25,日本,80\n" + \
+                        "2,花子,30,アメリカ,75\n" + \
+                        "3,次郎,40,日本,60\n" + \
+                        "4,太郎,20,インド,90\n" + \
+                        "5,花子,35,ドイツ,85\n"
+            
+            with open(temp_file_path, 'w', encoding='utf-8') as f:
+                f.write(csv_data)
+        
+        try:
+            # 機能のテスト（2行ずつ読み込む）
+            country_counts = aggregate_in_chunks(temp_file_path, 2)
+            
+            # 結果の検証
+            df = pd.read_csv(temp_file_path)
+            assert country_counts.to_dict() == aggregate_by_country(df).to_dict()
+            assert country_counts.sum() == 5
+            
+            # 一括読み込みでも同じ結果になる
+            assert scan_country_counts(temp_file_path).to_dict() == country_counts.to_dict()
+            
+            # 無効なチャンクサイズ
+            with pytest.raises(ValueError):
+                aggregate_in_chunks(temp_file_path, 0)
+            
+        finally:
+            if os.path.exists(temp_file_path):
+                os.unlink(temp_file_path)
+    
+    def test_count_by_country_with_chunksize(self, capsys):
+        """ストリーミングモードの出力が通常モードと一致することのテスト"""
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as temp_file:
+            temp_file_path = temp_file.name
+            
+            csv_data = "ID,名前,年齢,国,スコア\n" + \
+                        "1,太郎,25,日本,80\n" + \
+                        "2,花子,30,アメリカ,75\n" + \
+                        "3,次郎,40,ドイツ,60\n" + \
+                        "4,太郎,20,インド,90\n" + \
+                        "5,花子,35,カナダ,85\n" + \
+                        "6,直子,28,日本,70\n"
+            
+            with open(temp_file_path, 'w', encoding='utf-8') as f:
+                f.write(csv_data)
+        
+        try:
+            # 通常モードの出力
+            count_by_country(temp_file_path)
+            expected = capsys.readouterr().out
+            
+            # ストリーミングモードの出力
+            count_by_country(temp_file_path, chunksize=4)
+            actual = capsys.readouterr().out
+            
+            # 結果の検証
+            assert actual == expected
+            assert '【地域別集計結果】' in actual
+            
+        finally:
+            if os.path.exists(temp_file_path):
+                os.unlink(temp_file_path)
+    
+    def test_aggregate_by_region_does_not_modify_input(self):
+        """地域別集計が入力のDataFrameを変更しないことのテスト"""
+        df = pd.DataFrame({
+            'ID': [1, 2, 3],
+            '国': ['日本', 'アメリカ', None]
+        })
+        
+        # 機能のテスト
+        result = aggregate_by_region(df, {'日本': 'アジア', 'アメリカ': '北アメリカ'})
+        
+        # 結果の検証 - 欠損値は「その他」に分類され、入力には地域カラムが追加されない
+        assert result.to_dict() == {'アジア': 1, '北アメリカ': 1, 'その他': 1}
+        assert list(df.columns) == ['ID', '国']
+    
+    def test_aggregate_region_from_country_counts(self):
+        """国別集計結果から地域別集計結果を求める機能のテスト"""
+        country_counts = pd.Series({
+            '日本': 10,
+            'アメリカ': 5,
+            'インド': 7,
+            '未知の国': 2
+        })
+        test_map = {'日本': 'アジア', 'インド': 'アジア', 'アメリカ': '北アメリカ'}
+        
+        # 機能のテスト
+        result = aggregate_region_from_country_counts(country_counts, test_map)
+        
+        # 結果の検証 - 件数の降順に並ぶ
+        assert list(result.index) == ['アジア', '北アメリカ', 'その他']
+        assert list(result) == [17, 5, 2]
+        
+        # 空の集計結果
+        assert aggregate_region_from_country_counts(pd.Series(dtype='int64'), test_map).empty
+    
+    def test_rollup_counts(self):
+        """国別集計結果から上位の階層と総計を導出する機能のテスト"""
+        country_counts = pd.Series({'JP': 10, 'CN': 4, 'DE': 3, 'US': 5, 'XX': 1})
+        country_to_region = {'JP': 'ASIA', 'CN': 'ASIA', 'DE': 'EUROPE', 'US': 'NORTH_AMERICA'}
+        region_to_super_region = {'ASIA': '東半球', 'EUROPE': '東半球', 'NORTH_AMERICA': '西半球'}
+        
+        # 機能のテスト（国 → 地域 → 独自の上位地域）
+        levels, total = rollup_counts(country_counts, [country_to_region, region_to_super_region])
+        
+        # 結果の検証
+        assert len(levels) == 3
+        assert levels[0].to_dict() == country_counts.to_dict()
+        assert levels[1].to_dict() == {'ASIA': 14, 'NORTH_AMERICA': 5, 'EUROPE': 3, 'その他': 1}
+        assert levels[2].to_dict() == {'東半球': 17, '西半球': 5, 'その他': 1}
+        assert total == 23
+        assert all(level.sum() == total for level in levels)
+    
+    def test_rollup_country_counts_master_arrays(self):
+        """マスタデータの番号の対応表による地域別集計が、辞書による集約と同じ結果になることのテスト"""
+        country_counts = pd.Series({'ドイツ': 7, '日本': 10, '不明の国': 3, 'アメリカ': 7, '中国': 4, 'カナダ': 2})
+        
+        # 機能のテスト
+        region_counts = rollup_country_counts(country_counts)
+        
+        # 結果の検証 - 同数の地域の順序と「その他」も一致する
+        expected = rollup_country_counts(country_counts, get_country_region_map())
+        assert list(region_counts.items()) == list(expected.items())
+        assert region_counts.to_dict() == {'アジア': 14, 'ヨーロッパ': 7, '北アメリカ': 9, 'その他': 3}
+        assert region_counts.dtype == 'int64'
+        assert rollup_country_counts(pd.Series(dtype='int64')).empty
+    
+    def test_get_hierarchy_mappings(self):
+        """マスタデータから階層間のマッピングを作成する機能のテスト"""
+        # 国コード → 地域コード
+        mappings = get_hierarchy_mappings(['国コード', '地域コード'])
+        assert len(mappings) == 1
+        assert mappings[0]['JP'] == 'ASIA'
+        
+        # 国名 → 地域コード → 地域名
+        mappings = get_hierarchy_mappings(['国名', '地域コード', '地域名'])
+        assert len(mappings) == 2
+        assert mappings[0]['日本'] == 'ASIA'
+        assert mappings[1]['ASIA'] == 'アジア'
+        
+        # 存在しないカラム
+        with pytest.raises(KeyError):
+            get_hierarchy_mappings(['国名', '大陸'])
+    
+    def test_split_byte_ranges(self):
+        """バイト範囲が行の境界に揃って分割されることのテスト"""
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as temp_file:
+            temp_file_path = temp_file.name
+            
+            csv_data = "ID,国\n" + "".join(f"{i},日本\n" for i in range(1, 101))
+            
+            with open(temp_file_path, 'w', encoding='utf-8') as f:
+                f.write(csv_data)
+        
+        try:
+            # 機能のテスト
+            header, ranges = split_byte_ranges(temp_file_path, 7)
+            
+            # 結果の検証 - 範囲が隙間なく連続し、すべて行頭から始まる
+            assert header == "ID,国\n".encode('utf-8')
+            assert ranges[0][0] == len(header)
+            assert ranges[-1][1] == os.path.getsize(temp_file_path)
+            with open(temp_file_path, 'rb') as f:
+                content = f.read()
+            for (start, end), (next_start, _) in zip(ranges, ranges[1:]):
+                assert end == next_start
+                assert content[next_start - 1:next_start] == b'\n'
+            
+            # 全範囲の行数の合計がデータ行数と一致する
+            assert sum(content[start:end].count(b'\n') for start, end in ranges) == 100
+            
+        finally:
+            if os.path.exists(temp_file_path):
+                os.unlink(temp_file_path)
+    
+    def test_aggregate_parallel(self):
+        """並列集計の結果が逐次集計の結果と一致することのテスト"""
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as temp_file:
+            temp_file_path = temp_file.name
+            
+            countries = ['日本', 'アメリカ', 'ドイツ', 'インド', 'カナダ']
+            csv_data = "ID,名前,年齢,国,スコア\n" + \
+                        "".join(f"{i},太郎,30,{countries[i % 7 % 5]},50\n" for i in range(1, 501))
+            
+            with open(temp_file_path, 'w', encoding='utf-8') as f:
+                f.write(csv_data)
+        
+        try:
+            # 機能のテスト（小さなバイト範囲に分割して2プロセスで集計）
+            result = aggregate_parallel(temp_file_path, workers=2, range_bytes=1024)
+            
+            # 結果の検証
+            expected = scan_country_counts(temp_file_path)
+            assert result.to_dict() == expected.to_dict()
+            assert result.sum() == 500
+            
+            # 無効なワーカー数
+            with pytest.raises(ValueError):
+                aggregate_parallel(temp_file_path, workers=0)
+            
+        finally:
+            if os.path.exists(temp_file_path):
+                os.unlink(temp_file_path)
+    
+    def test_resolve_input_paths(self):
+        """ディレクトリ・globパターンを集計対象のファイルに展開する機能のテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ['b.csv', 'a.csv', 'note.txt']:
+                with open(os.path.join(temp_dir, name), 'w', encoding='utf-8') as f:
+                    f.write("ID,国\n1,日本\n")
+            
+            a_path = os.path.join(temp_dir, 'a.csv')
+            b_path = os.path.join(temp_dir, 'b.csv')
+            
+            # ディレクトリは直下のCSVファイルに名前順で展開される
+            assert resolve_input_paths([temp_dir]) == [a_path, b_path]
+            
+            # globパターンの展開と重複の除去
+            assert resolve_input_paths([os.path.join(temp_dir, '*.csv'), a_path]) == [a_path, b_path]
+            
+            # 一致するファイルがないglobパターンは無視される
+            assert resolve_input_paths([os.path.join(temp_dir, '*.parquet')]) == []
+            
+            # 通常のパスは存在しなくてもそのまま残る
+            missing_path = os.path.join(temp_dir, 'missing.csv')
+            assert resolve_input_paths([missing_path]) == [missing_path]
+    
+    def test_aggregate_files(self, capsys):
+        """複数ファイルの並列集計と統合のテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_paths = []
+            for index, rows in enumerate([["日本", "アメリカ", "日本"], ["インド"], ["日本", "ドイツ"]]):
+                file_path = os.path.join(temp_dir, f'shard_{index}.csv')
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write("ID,国\n" + "".join(f"{i},{country}\n" for i, country in enumerate(rows)))
+                file_paths.append(file_path)
+            
+            # 機能のテスト
+            total_counts, file_counts = aggregate_files(file_paths, workers=2)
+            
+            # 結果の検証 - ファイル別の結果は入力順で返される
+            assert total_counts.to_dict() == {'日本': 3, 'アメリカ': 1, 'インド': 1, 'ドイツ': 1}
+            assert list(file_counts) == file_paths
+            assert file_counts[file_paths[1]].to_dict() == {'インド': 1}
+            
+            # 逐次処理でも同じ結果になる
+            serial_counts, _ = aggregate_files(file_paths, workers=1)
+            assert serial_counts.to_dict() == total_counts.to_dict()
+            
+            # ファイル別の件数を含めた表示
+            count_by_country(file_paths, workers=2, show_per_file=True)
+            output = capsys.readouterr().out
+            assert '【国別集計結果】' in output
+            assert '【ファイル別集計結果】' in output
+            assert '6件' in output
+            
+            # 存在しないファイルを含む場合はそのファイル名を表示する
+            missing_path = os.path.join(temp_dir, 'missing.csv')
+            count_by_country(file_paths + [missing_path])
+            output = capsys.readouterr().out
+            assert f"エラー: ファイル '{missing_path}' が見つかりません" in output
+    
+    def test_count_by_country_with_cache(self, capsys):
+        """キャッシュ済みのファイルが再走査されないことのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_paths = []
+            for index, country in enumerate(['日本', 'インド']):
+                file_path = os.path.join(temp_dir, f'shard_{index}.csv')
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(f"ID,国\n1,{country}\n2,{country}\n")
+                file_paths.append(file_path)
+            cache = ResultCache(os.path.join(temp_dir, 'cache'))
+            
+            # 1回目は全ファイルを走査してキャッシュする
+            count_by_country(file_paths, workers=1, cache=cache)
+            expected = capsys.readouterr().out
+            
+            # 2回目はすべてキャッシュから取得する
+            with patch('src.count_by_country.scan_country_counts') as mock_scan:
+                count_by_country(file_paths, workers=1, cache=cache)
+                assert not mock_scan.called
+            assert capsys.readouterr().out == expected
+            
+            # 変更したファイルのみ再走査する
+            with open(file_paths[1], 'a', encoding='utf-8') as f:
+                f.write("3,インド\n")
+            total_counts, _ = aggregate_files(file_paths, workers=1, cache=cache)
+            assert total_counts.to_dict() == {'インド': 3, '日本': 2}
+    
+    def test_get_input_format(self):
+        """入力形式の判定のテスト"""
+        assert get_input_format('data.csv') == 'csv'
+        assert get_input_format('data.parquet') == 'parquet'
+        assert get_input_format('DATA.PQ') == 'parquet'
+    
+    def test_aggregate_parquet(self):
+        """Parquet形式のファイルを国別に集計する機能のテスト"""
+        pa = pytest.importorskip("pyarrow")
+        import pyarrow.parquet as pq
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # 辞書エンコーディングされたカラム（複数の行グループ）
+            dictionary_path = os.path.join(temp_dir, 'dictionary.parquet')
+            countries = pa.array(['日本', 'アメリカ', None, '日本', 'インド']).dictionary_encode()
+            pq.write_table(pa.table({'ID': [1, 2, 3, 4, 5], '国': countries}), dictionary_path, row_group_size=2)
+            
+            # 文字列のカラム
+            plain_path = os.path.join(temp_dir, 'plain.parquet')
+            pq.write_table(pa.table({'国': ['日本', 'アメリカ', None, '日本', 'インド']}), plain_path)
+            
+            # 機能のテスト
+            for file_path in [dictionary_path, plain_path]:
+                result = aggregate_parquet(file_path, batch_size=2)
+                assert result.to_dict() == {'日本': 2, 'アメリカ': 1, 'インド': 1}
+            
+            # 「国」カラムがない場合
+            missing_path = os.path.join(temp_dir, 'missing.parquet')
+            pq.write_table(pa.table({'ID': [1]}), missing_path)
+            with pytest.raises(KeyError):
+                aggregate_parquet(missing_path)
+    
+    def test_count_by_country_parquet_matches_csv(self, capsys):
+        """Parquet形式とCSV形式で同じ集計結果が表示されることのテスト"""
+        pa = pytest.importorskip("pyarrow")
+        import pyarrow.parquet as pq
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_path = os.path.join(temp_dir, 'data.csv')
+            parquet_path = os.path.join(temp_dir, 'data.parquet')
+            countries = ['日本', 'アメリカ', 'ドイツ', 'インド', 'カナダ', '日本', 'ブラジル']
+            with open(csv_path, 'w', encoding='utf-8') as f:
+                f.write("ID,国\n" + "".join(f"{i},{country}\n" for i, country in enumerate(countries)))
+            pq.write_table(pa.table({'ID': list(range(len(countries))),
+                                     '国': pa.array(countries).dictionary_encode()}), parquet_path)
+            
+            # 機能のテスト
+            count_by_country(csv_path)
+            expected = capsys.readouterr().out
+            count_by_country(parquet_path)
+            
+            # 結果の検証
+            assert capsys.readouterr().out == expected
+            assert resolve_input_paths([temp_dir]) == [csv_path, parquet_path]
+    
+    def test_count_by_country_column_cache(self, capsys):
+        """列キャッシュを使った集計が通常の集計と同じ結果になることのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'data.csv')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write("ID,国\n1,日本\n2,アメリカ\n3,日本\n4,インド\n5,不明の国\n")
+            count_by_country(file_path)
+            expected = capsys.readouterr().out
+            
+            # 機能のテスト - 1回目は列キャッシュを作成し、2回目は列キャッシュから集計する
+            count_by_country(file_path, column_cache=True)
+            first = capsys.readouterr().out
+            with patch('src.count_by_country.build_column_cache') as build:
+                count_by_country(file_path, column_cache=True)
+                build.assert_not_called()
+            second = capsys.readouterr().out
+            
+            # 結果の検証
+            assert first == expected
+            assert second == expected
+            assert aggregate_with_column_cache(file_path).to_dict() == \
+                {'日本': 2, 'アメリカ': 1, 'インド': 1, '不明の国': 1}
+    
+    def test_aggregate_country_codes(self):
+        """国コードを番号のまま数え、表示時に国名に置き換えることのテスト"""
+        codes = pd.Series(['JP', 'US', 'JP', None, 'ZZ', 'JP'], dtype='category')
+        
+        # 機能のテスト
+        code_counts = aggregate_country_codes(codes)
+        
+        # 結果の検証 - 欠損値は除かれる
+        assert list(code_counts.items()) == [('JP', 3), ('US', 1), ('ZZ', 1)]
+        
+        # マスタデータにない国コードと国名はそのまま残り、同じ国は統合される
+        result = resolve_country_names(pd.concat([code_counts, pd.Series({'日本': 2})]),
+                                       {'JP': '日本', 'US': 'アメリカ'})
+        assert list(result.items()) == [('日本', 5), ('アメリカ', 1), ('ZZ', 1)]
+    
+    def test_count_by_country_country_codes(self, capsys):
+        """国コードのカラムを持つファイルが、国名のファイルと同じ結果で表示されることのテスト"""
+        countries = [('日本', 'JP'), ('アメリカ', 'US'), ('日本', 'JP'), ('インド', 'IN'), ('ブラジル', 'BR')]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            name_path = os.path.join(temp_dir, 'name.csv')
+            code_path = os.path.join(temp_dir, 'code.csv')
+            with open(name_path, 'w', encoding='utf-8') as f:
+                f.write("ID,国\n" + "".join(f"{i},{name}\n" for i, (name, _) in enumerate(countries)))
+            with open(code_path, 'w', encoding='utf-8') as f:
+                f.write("ID,国コード\n" + "".join(f"{i},{code}\n" for i, (_, code) in enumerate(countries)))
+            count_by_country(name_path)
+            expected = capsys.readouterr().out
+            
+            # 機能のテスト - 読み込み方法によらず同じ結果になる
+            outputs = []
+            for options in [{}, {'chunksize': 2}, {'workers': 2}, {'column_cache': True}]:
+                count_by_country(code_path, **options)
+                outputs.append(capsys.readouterr().out)
+            
+            # 結果の検証
+            assert outputs == [expected] * len(outputs)
+    
+    def test_count_csv_light(self):
+        """csv モジュールによる集計が pandas と同じ値を欠損値として除外することのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'data.csv')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write('ID,国,スコア\n1,日本,1\n2,"アメリカ",2\n\n3,NA,3\n4,,4\n5\n6,日本,6\n')
+            
+            # 機能のテスト
+            result = count_csv_light(file_path)
+            
+            # 結果の検証
+            assert result == {'日本': 2, 'アメリカ': 1}
+            assert result == scan_country_counts(file_path).to_dict()
+            
+            # pandas で集計すべきファイルの場合はNone
+            for content in ["", "ID,国\n", "ID,国\n1,日本,余分な列\n"]:
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                assert count_csv_light(file_path) is None
+            
+            # 「国」カラムがない場合
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write("ID,名前\n1,太郎\n")
+            with pytest.raises(KeyError):
+                count_csv_light(file_path)
+    
+    def test_count_by_country_light_matches_pandas(self, capsys):
+        """csv モジュールによる集計と pandas による集計で同じ結果が表示されることのテスト"""
+        contents = [
+            "ID,国\n1,日本\n2,アメリカ\n3,日本\n4,ブラジル\n5,不明の国\n6,\n",
+            "\ufeffID,国コード\n1,JP\n2,US\n3,ZZ\n4,DE\n5,JP\n",
+            "ID,名前\n1,太郎\n",
+            "ID,国\n",
+        ]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'data.csv')
+            for content in contents:
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                
+                # 機能のテスト
+                count_by_country(file_path, light_max_bytes=0)
+                expected = capsys.readouterr().out
+                with patch('src.count_by_country.scan_country_counts') as mock_scan:
+                    count_by_country(file_path)
+                    light_used = not mock_scan.called
+                if light_used:
+                    output = capsys.readouterr().out
+                else:
+                    capsys.readouterr()
+                    count_by_country(file_path)
+                    output = capsys.readouterr().out
+                
+                # 結果の検証
+                assert output == expected
+                assert light_used == (content.count("\n") > 1)
+    
+    def test_count_by_country_light_matches_pandas_numeric(self, capsys):
+        """数字のみの国の値が、csv モジュールと pandas のどちらで集計しても同じ文字列として表示されることのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'data.csv')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write("ID,国\n1,81\n2,1\n3,81\n4,044\n5,\n")
+            
+            for output_format in ['text', 'csv']:
+                # 機能のテスト
+                count_by_country(file_path, output_format=output_format)
+                light_output = capsys.readouterr().out
+                count_by_country(file_path, output_format=output_format, light_max_bytes=0)
+                pandas_output = capsys.readouterr().out
+                
+                # 結果の検証
+                assert light_output == pandas_output
+                assert '044' in pandas_output
+            
+            # 集計結果のキーも同じ文字列となる
+            light_result = aggregate_report(file_path)
+            pandas_result = aggregate_report(file_path, light_max_bytes=0)
+            assert light_result.engine == 'csv' and pandas_result.engine == 'pandas'
+            assert light_result.to_dict()['countries'] == pandas_result.to_dict()['countries'] == \
+                {'81': 2, '1': 1, '044': 1}
+    
+    def test_aggregate_report(self):
+        """集計結果を CountResult として返す機能のテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'data.csv')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write("ID,国\n1,アメリカ\n2,日本\n3,アメリカ\n4,不明の国\n")
+            
+            # 機能のテスト（csv モジュールと pandas の両方）
+            light_result = aggregate_report(file_path)
+            pandas_result = aggregate_report(file_path, light_max_bytes=0)
+            
+            # 結果の検証
+            for result, engine in [(light_result, 'csv'), (pandas_result, 'pandas')]:
+                assert result.engine == engine
+                assert result.total == 4
+                assert list(result.country_counts) == ['日本', 'アメリカ', '不明の国']
+                assert result.country_counts['アメリカ'] == 2
+                assert result.region_counts == {'アジア': 1, '北アメリカ': 2, 'その他': 1}
+                assert result.file_totals == {file_path: 4}
+                assert set(result.timings) == {'scan', 'rollup', 'total'}
+                assert json.loads(json.dumps(result.to_dict()))['countries'] == result.country_counts
+            
+            # ファイルが存在しない場合は例外を送出する
+            with pytest.raises(FileNotFoundError):
+                aggregate_report(os.path.join(temp_dir, 'missing.csv'))
+    
+    def test_render_result(self, capsys):
+        """集計結果をテキスト・JSON・CSV形式に変換する機能のテスト"""
+        country_counts = pd.Series({'アメリカ': 2, '日本': 1})
+        region_counts = pd.Series({'北アメリカ': 2, 'アジア': 1})
+        result = CountResult(country_counts, region_counts, {'a.csv': pd.Series({'日本': 1}),
+                                                             'b.csv': pd.Series({'アメリカ': 2})})
+        
+        # テキスト形式は従来の表示と同じ
+        display_report(country_counts, region_counts)
+        assert render_result(result) == capsys.readouterr().out
+        text = render_result(result, 'text', show_per_file=True)
+        assert text.endswith("【ファイル別集計結果】\na.csv：1件\nb.csv：2件\n合計 ：3件\n")
+        
+        # JSON形式
+        data = json.loads(render_result(result, 'json'))
+        assert data['total'] == 3
+        assert list(data['countries']) == ['日本', 'アメリカ']
+        assert data['regions'] == {'アジア': 1, '北アメリカ': 2}
+        assert data['files'] == {'a.csv': 1, 'b.csv': 2}
+        
+        # CSV形式
+        rows = render_result(result, 'csv', show_per_file=True).splitlines()
+        assert rows == ["区分,名前,件数", "国,日本,1", "国,アメリカ,2", "地域,アジア,1", "地域,北アメリカ,2",
+                        "合計,,3", "ファイル,a.csv,1", "ファイル,b.csv,2"]
+        
+        # 登録されていない形式
+        with pytest.raises(ValueError):
+            render_result(result, 'xml')
+    
+    def test_count_by_country_output_format(self, capsys):
+        """count_by_country の出力形式を切り替える機能のテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'data.csv')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write("ID,国\n1,日本\n2,ドイツ\n")
+            
+            # 機能のテスト
+            count_by_country(file_path, output_format='json')
+            data = json.loads(capsys.readouterr().out)
+            count_by_country(file_path, output_format='csv')
+            rows = capsys.readouterr().out.splitlines()
+            
+            # 結果の検証
+            assert data['countries'] == {'日本': 1, 'ドイツ': 1}
+            assert data['regions'] == {'アジア': 1, 'ヨーロッパ': 1}
+            assert rows[0] == "区分,名前,件数"
+            assert "合計,,2" in rows
+    
+    def test_aggregate_report_stats(self, capsys):
+        """件数と同じ1回の走査で国別・地域別の統計量を集計する機能のテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            name_path = os.path.join(temp_dir, 'names.csv')
+            code_path = os.path.join(temp_dir, 'codes.csv')
+            with open(name_path, 'w', encoding='utf-8') as f:
+                f.write("ID,年齢,国,スコア\n1,20,日本,10.0\n2,30,日本,20.0\n3,40,アメリカ,\n4,50,インド,40.0\n")
+            with open(code_path, 'w', encoding='utf-8') as f:
+                f.write("ID,年齢,国コード,スコア\n1,60,JP,30.0\n2,25,XX,5.0\n")
+            cache = ResultCache(os.path.join(temp_dir, 'cache'))
+            
+            # 機能のテスト（一括・チャンク単位・並列・複数ファイル・キャッシュ）
+            single = aggregate_report(name_path, stats=True)
+            chunked = aggregate_report(name_path, chunksize=1, stats=True)
+            parallel = aggregate_report(name_path, workers=2, stats=True)
+            multi = aggregate_report([name_path, code_path], workers=1, cache=cache, stats=True)
+            cached = aggregate_report([name_path, code_path], workers=1, cache=cache, stats=True)
+            
+            # 結果の検証 - 統計量は部分的な結果の統合方法によらず一致する
+            for result in [single, chunked, parallel]:
+                assert result.country_counts == {'日本': 2, 'アメリカ': 1, 'インド': 1}
+                assert result.country_stats['日本']['スコア']['mean'] == pytest.approx(15.0)
+                assert result.country_stats['日本']['スコア']['var'] == pytest.approx(50.0)
+                assert result.country_stats['アメリカ']['スコア']['count'] == 0
+                assert result.region_stats['アジア']['年齢'] == pytest.approx(
+                    {'count': 3, 'mean': 100 / 3, 'var': np.var([20, 30, 50], ddof=1),
+                     'std': np.std([20, 30, 50], ddof=1), 'min': 20.0, 'max': 50.0})
+            for result in [multi, cached]:
+                assert result.country_counts == {'日本': 3, 'アメリカ': 1, 'インド': 1, 'XX': 1}
+                assert result.file_totals == {name_path: 4, code_path: 2}
+                assert result.country_stats['日本']['年齢']['max'] == 60.0
+                assert result.region_stats['その他']['スコア']['mean'] == 5.0
+            data = json.loads(render_result(multi, 'json'))
+            assert data['stats']['countries']['日本']['スコア']['count'] == 3
+            
+            # 表示
+            count_by_country(name_path, stats=True)
+            output = capsys.readouterr().out
+            assert "【国別統計量：スコア】" in output
+            assert "【地域別統計量：年齢】" in output
+            
+            # 統計量を求めるカラムがない場合
+            with open(name_path, 'w', encoding='utf-8') as f:
+                f.write("ID,国\n1,日本\n")
+            with pytest.raises(KeyError):
+                aggregate_report(name_path, stats=True)
+    
+    def test_aggregate_report_percentiles(self):
+        """件数と同じ1回の走査で国別・地域別の分位数を近似する機能のテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'data.csv')
+            rows = [f"{i},{18 + i % 43},{['日本', 'アメリカ', 'ドイツ'][i % 3]},{i % 1000 / 10}" for i in range(30000)]
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write("ID,年齢,国,スコア\n" + "\n".join(rows) + "\n")
+            cache = ResultCache(os.path.join(temp_dir, 'cache'))
+            
+            # 機能のテスト（チャンク単位・並列・キャッシュ）
+            results = [aggregate_report(file_path, chunksize=4000, percentiles=[50, 90], cache=cache),
+                       aggregate_report(file_path, workers=2, percentiles=[50, 90]),
+                       aggregate_report(file_path, percentiles=[50, 90], cache=cache)]
+            
+            # 結果の検証 - スコアは0〜99.9の一様な値のため、p50は約50、p90は約90
+            for result in results:
+                assert result.country_counts == {'日本': 10000, 'アメリカ': 10000, 'ドイツ': 10000}
+                assert result.country_stats is None
+                assert result.country_quantiles['日本']['スコア'][50] == pytest.approx(50, abs=3)
+                assert result.region_quantiles['ヨーロッパ']['スコア'][90] == pytest.approx(90, abs=3)
+                assert result.country_quantiles['ドイツ']['年齢'][50] == pytest.approx(39, abs=2)
+            data = json.loads(render_result(results[0], 'json'))
+            assert set(data['quantiles']['countries']['日本']['スコア']) == {'p50', 'p90'}
+            assert "【地域別分位数：年齢】" in render_result(results[0])
+            
+            # 範囲外のパーセンタイル
+            with pytest.raises(ValueError):
+                aggregate_report(file_path, percentiles=[101])
+    
+    def test_aggregate_report_distinct(self):
+        """国別・地域別の重複を除いた件数を推定する機能のテスト（並列・複数ファイル・正確な件数との比較）"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = [os.path.join(temp_dir, f'data{i}.csv') for i in range(2)]
+            for i, path in enumerate(paths):
+                rows = [f"{i * 20000 + j},名前{j % 3000},{['日本', 'アメリカ', 'ドイツ'][j % 3]}" for j in range(20000)]
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write("ID,名前,国\n" + "\n".join(rows) + "\n")
+            
+            # 機能のテスト
+            exact = aggregate_report(paths, workers=1, distinct_columns=['名前', 'ID'], distinct_exact=True)
+            estimated = aggregate_report(paths, workers=2, distinct_columns=['名前', 'ID'])
+            parallel = aggregate_report(paths[0], workers=2, distinct_columns=['名前'], distinct_exact=True)
+            
+            # 結果の検証 - 名前は国ごとに1000種類、IDはすべて異なる
+            assert exact.country_distinct['日本'] == {'名前': 1000, 'ID': 13334}
+            assert exact.region_distinct['ヨーロッパ'] == {'名前': 1000, 'ID': 13332}
+            assert parallel.country_distinct['ドイツ'] == {'名前': 1000}
+            for country, counts in exact.country_distinct.items():
+                for column, count in counts.items():
+                    error = abs(estimated.country_distinct[country][column] - count)
+                    assert error <= 4 * estimated.distinct_error * count
+            data = json.loads(render_result(estimated, 'json'))
+            assert data['distinct']['standard_error'] == pytest.approx(1.04 / 64)
+            assert "【国別ユニーク数】（推定値" in render_result(estimated)
+            
+            # 範囲外の精度
+            with pytest.raises(ValueError):
+                aggregate_report(paths[0], distinct_columns=['名前'], hll_precision=19)
+    
+    def test_aggregate_report_grouping_sets(self):
+        """軸の組み合わせごとの行数を1回の走査で数える機能のテスト（並列・複数ファイル・国コード・キャッシュ）"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            rng = np.random.default_rng(7)
+            df = pd.DataFrame({
+                '名前': rng.choice(['太郎', '花子', '健一'], 20000),
+                '年齢': rng.integers(18, 61, 20000),
+                '国': rng.choice(['日本', 'アメリカ', 'ドイツ'], 20000),
+            })
+            paths = [os.path.join(temp_dir, f'data{i}.csv') for i in range(2)]
+            df.iloc[:12000].to_csv(paths[0], index=False)
+            df.iloc[12000:].assign(国コード=df['国'].map({'日本': 'JP', 'アメリカ': 'US', 'ドイツ': 'DE'})) \
+                .drop(columns='国').to_csv(paths[1], index=False)
+            grouping_sets = [['名前'], ['年齢:10'], ['地域', '年齢:10']]
+            cache = ResultCache(os.path.join(temp_dir, 'cache'))
+            
+            # 機能のテスト
+            result = aggregate_report(paths, workers=2, grouping_sets=grouping_sets, cache=cache)
+            cached = aggregate_report(paths, workers=1, grouping_sets=grouping_sets, cache=cache)
+            parallel = aggregate_report(paths[0], workers=2, grouping_sets=[['国', '名前']])
+            
+            # 結果の検証
+            df['年齢帯'] = (df['年齢'] // 10 * 10).map(lambda start: f"{start}〜{start + 9}")
+            df['地域'] = df['国'].map({'日本': 'アジア', 'アメリカ': '北アメリカ', 'ドイツ': 'ヨーロッパ'})
+            names, brackets, region_brackets = [dict(grouping_set['rows']) for grouping_set in result.grouping_sets]
+            assert names == {(name,): count for name, count in df['名前'].value_counts().items()}
+            assert brackets == {(bracket,): count for bracket, count in df['年齢帯'].value_counts().items()}
+            assert region_brackets == {key: count for key, count in df.groupby(['地域', '年齢帯']).size().items()}
+            assert cached.to_dict()['grouping_sets'] == result.to_dict()['grouping_sets']
+            assert dict(parallel.grouping_sets[0]['rows']) == \
+                {key: count for key, count in df.iloc[:12000].groupby(['国', '名前']).size().items()}
+            
+            # 幅で区切った軸は範囲の順、分類の軸は合計行数の降順に並べる
+            assert [values for values, _ in result.grouping_sets[1]['rows']] == \
+                [(f"{start}〜{start + 9}",) for start in range(10, 70, 10)]
+            regions = list(df['地域'].value_counts().index)
+            assert [values for values, _ in result.grouping_sets[2]['rows']] == \
+                sorted(region_brackets, key=lambda key: (regions.index(key[0]), int(key[1].split('〜')[0])))
+            
+            # 表示形式（国別集計結果と同じ「ラベル：件数」の形式）
+            text = render_result(result)
+            assert "【地域×年齢（10刻み）別集計結果】" in text
+            assert "\nアジア・10〜19    ：" in text
+            data = json.loads(render_result(result, 'json'))
+            assert data['grouping_sets'][0]['rows'][0].keys() == {'名前', 'count'}
+            assert "地域×年齢:10,アジア・" in render_result(result, 'csv')
+            
+            # 存在しないカラム
+            with pytest.raises(KeyError):
+                aggregate_report(paths[0], grouping_sets=[['身長']])
+    
+    def test_aggregate_report_grouping_sets_without_region_map(self, monkeypatch, capsys):
+        """国と地域のマッピングが取得できない場合、地域の軸を含む組み合わせを警告して除外することのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'data.csv')
+            pd.DataFrame({'名前': ['太郎', '花子', '太郎'], '国': ['日本', 'ドイツ', '日本']}).to_csv(path, index=False)
+            monkeypatch.setattr('src.count_by_country.get_country_region_map', lambda: {})
+            
+            # 機能のテスト
+            result = aggregate_report(path, grouping_sets=[['地域'], ['国', '名前'], ['地域', '名前']])
+            only_region = aggregate_report(path, grouping_sets=[['地域']])
+            
+            # 結果の検証 - 国名を地域として表示しない
+            assert [grouping_set['group_by'] for grouping_set in result.grouping_sets] == [['国', '名前']]
+            assert only_region.grouping_sets is None
+            assert "警告: 国と地域のマッピングが取得できないため、地域、地域×名前 の組み合わせ" in capsys.readouterr().out
+            assert "【地域別集計結果】" not in render_result(only_region)
+    
+    def test_aggregate_report_grouping_sets_missing_values(self):
+        """欠損値を含むチャンクがあっても、整数のカラムの値の表記がチャンクの分け方や並列数・入力形式によらないことのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            rng = np.random.default_rng(8)
+            df = pd.DataFrame({
+                '年齢': rng.integers(18, 61, 3000).astype(float),
+                '国': rng.choice(['日本', 'アメリカ', 'ドイツ'], 3000),
+            })
+            df.loc[100, '年齢'] = np.nan
+            path = os.path.join(temp_dir, 'data.csv')
+            parquet_path = os.path.join(temp_dir, 'data.parquet')
+            df.to_csv(path, index=False, float_format='%.0f')
+            df.astype({'年齢': 'Int64'}).to_parquet(parquet_path, index=False)
+            
+            # 機能のテスト - 欠損値は最初のチャンクのみに含まれる
+            results = [
+                aggregate_report(path, grouping_sets=[['年齢']]),
+                aggregate_report(path, chunksize=500, grouping_sets=[['年齢']]),
+                aggregate_report(path, workers=4, grouping_sets=[['年齢']]),
+                aggregate_report(parquet_path, grouping_sets=[['年齢']]),
+            ]
+            
+            # 結果の検証
+            expected = {(int(age),): count for age, count in df['年齢'].value_counts().items()}
+            for result in results:
+                assert dict(result.grouping_sets[0]['rows']) == expected
+                assert render_result(result) == render_result(results[0])
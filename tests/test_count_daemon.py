@@ -0,0 +1,149 @@
+import os
+import time
+import json
+import asyncio
+import tempfile
+import threading
+from src.count_by_country import count_by_country, scan_country_counts
+from src.count_daemon import CountDaemon, query_daemon, send_request
+
+
+class TestCountDaemon:
+    """集計デーモンのテスト"""
+    
+    def _write(self, file_path, content):
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    
+    def test_coalesce_and_reuse_results(self):
+        """同じファイルへの同時の要求が1回の走査にまとめられ、結果が再利用されることのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'data.csv')
+            self._write(file_path, "ID,国\n1,日本\n2,インド\n")
+            daemon = CountDaemon()
+            
+            def slow_scan(path):
+                time.sleep(0.2)
+                return scan_country_counts(path)
+            daemon.scan_file = slow_scan
+            
+            async def run():
+                # 機能のテスト - 同時に5回要求する
+                results = await asyncio.gather(*(daemon.get_counts(file_path) for _ in range(5)))
+                assert all(result.to_dict() == {'日本': 1, 'インド': 1} for result in results)
+                assert daemon.num_scans == 1
+                
+                # 変更されていないファイルは再走査しない
+                await daemon.get_counts(file_path)
+                assert daemon.num_scans == 1
+                
+                # 変更されたファイルは再走査する
+                self._write(file_path, "ID,国\n1,日本\n2,インド\n3,日本\n")
+                result = await daemon.get_counts(file_path)
+                assert result.to_dict() == {'日本': 2, 'インド': 1}
+                assert daemon.num_scans == 2
+                assert daemon.in_flight == {}
+            
+            asyncio.run(run())
+    
+    def test_query_over_socket(self, capsys):
+        """Unixソケット経由の要求に、count_by_country と同じ表示と件数で応答することのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'data.csv')
+            self._write(file_path, "ID,国コード\n1,JP\n2,US\n3,JP\n4,BR\n")
+            count_by_country(file_path)
+            expected = capsys.readouterr().out
+            
+            # デーモンを別スレッドで起動する
+            socket_path = os.path.join(temp_dir, 'daemon.sock')
+            daemon = CountDaemon()
+            ready = threading.Event()
+            thread = threading.Thread(target=lambda: asyncio.run(daemon.serve(socket_path, ready=ready.set)))
+            thread.start()
+            try:
+                assert ready.wait(10)
+                
+                # 機能のテスト
+                text_response = query_daemon([file_path], socket_path)
+                json_response = query_daemon([file_path], socket_path, output_format='json')
+                error_response = query_daemon([os.path.join(temp_dir, 'missing.csv')], socket_path)
+                
+                # 結果の検証
+                assert text_response['ok'] and text_response['text'] == expected
+                assert json_response['total'] == 4
+                assert json_response['countries'] == {'日本': 2, 'アメリカ': 1, 'ブラジル': 1}
+                assert json_response['regions'] == {'アジア': 2, '北アメリカ': 1, '南アメリカ': 1}
+                assert 'text' not in json_response
+                assert not error_response['ok'] and '見つかりません' in error_response['error']
+                assert daemon.num_scans == 1
+            finally:
+                assert send_request({'command': 'shutdown'}, socket_path) == {'ok': True}
+                thread.join(10)
+            
+            # 停止するとソケットファイルは削除される
+            assert not os.path.exists(socket_path)
+    
+    def test_invalid_request(self):
+        """不正な要求にエラーを応答することのテスト"""
+        daemon = CountDaemon()
+        
+        async def run():
+            return [await daemon.handle_request(line) for line in
+                    [b"not json", b"[1]", json.dumps({'command': 'unknown'}).encode('utf-8'),
+                     json.dumps({'files': ['x.csv'], 'format': 'xml'}).encode('utf-8'),
+                     json.dumps({'files': ['x.csv'], 'format': ['text']}).encode('utf-8'),
+                     json.dumps({'files': 'x.csv'}).encode('utf-8'),
+                     json.dumps({'files': []}).encode('utf-8'),
+                     json.dumps({'files': ['x.csv', 1]}).encode('utf-8'),
+                     json.dumps({}).encode('utf-8')]]
+        
+        # 結果の検証
+        assert all(not response['ok'] for response in asyncio.run(run()))
+    
+    def test_unexpected_error_response(self, monkeypatch):
+        """集計中の予期せぬ例外をエラーとして応答し、以降の要求にも応答できることのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'data.csv')
+            self._write(file_path, "ID,国\n1,日本\n")
+            daemon = CountDaemon()
+            request = json.dumps({'files': [file_path], 'format': 'csv'}).encode('utf-8')
+            
+            def broken(country_counts):
+                raise RuntimeError("国名に変換できません")
+            
+            async def run():
+                with monkeypatch.context() as patch:
+                    patch.setattr('src.count_daemon.resolve_country_names', broken)
+                    failed = await daemon.handle_request(request)
+                return failed, await daemon.handle_request(request)
+            
+            # 機能のテスト
+            failed, succeeded = asyncio.run(run())
+            
+            # 結果の検証
+            assert not failed['ok'] and '国名に変換できません' in failed['error']
+            assert succeeded['ok'] and '日本' in succeeded['text']
+    
+    def test_results_bounded(self):
+        """保持するファイル単位の集計結果が上限を超えると、最も古く使われたものから破棄されることのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_paths = []
+            for index in range(3):
+                file_path = os.path.join(temp_dir, f'data_{index}.csv')
+                self._write(file_path, f"ID,国\n{index},日本\n")
+                file_paths.append(file_path)
+            daemon = CountDaemon(max_results=2)
+            
+            async def run():
+                await daemon.get_counts(file_paths[0])
+                await daemon.get_counts(file_paths[1])
+                
+                # 最初のファイルを使用して最新にする
+                await daemon.get_counts(file_paths[0])
+                await daemon.get_counts(file_paths[2])
+            
+            asyncio.run(run())
+            
+            # 結果の検証 - 最も古く使われた2番目のファイルの結果が破棄される
+            assert list(daemon.results) == [os.path.abspath(file_paths[0]), os.path.abspath(file_paths[2])]
+            assert daemon.num_scans == 3
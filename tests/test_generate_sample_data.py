@@ -2,7 +2,17 @@ import os
 import csv
 import pytest
 import tempfile
-from src.generate_sample_data import generate_sample_data
+from src.master_data import load_master
+from src.generate_sample_data import (
+    generate_sample_data,
+    COUNTRIES,
+    get_country_codes,
+    SKEWED_COUNTRY_WEIGHTS,
+    format_ids,
+    get_shard_ranges,
+    generate_sharded_data,
+    get_output_format
+)
 
 
 class TestGenerateSampleData:
@@ -74,3 +84,227 @@ class TestGenerateSampleData:
         # エラーメッセージの検証
         assert "エラー: ファイル" in captured.out
         assert "への書き込み権限がありません" in captured.out
+    
+    def _read_rows(self, file_path):
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            return list(csv.reader(f))
+    
+    def test_generate_sample_data_engines(self):
+        """各生成エンジンが同じ形式・値の範囲のデータを生成することのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for engine in ['numpy', 'python']:
+                file_path = os.path.join(temp_dir, f'{engine}.csv')
+                
+                # テスト実行
+                generate_sample_data(file_path, 1200, engine=engine, seed=1)
+                
+                # 結果の検証
+                rows = self._read_rows(file_path)
+                assert rows[0] == ["ID", "名前", "年齢", "国", "スコア"]
+                assert len(rows) == 1201
+                for i, row in enumerate(rows[1:], 1):
+                    assert int(row[0]) == i
+                    assert row[1] in ["太郎", "花子", "次郎", "美咲", "健一"]
+                    assert 18 <= int(row[2]) <= 60
+                    assert row[3] in ["日本", "アメリカ", "ドイツ", "インド", "カナダ"]
+                    assert 0 <= float(row[4]) <= 100
+                    assert len(row[4].split('.')[1]) <= 2
+    
+    def test_generate_sample_data_with_seed(self):
+        """同じシードから同じデータが生成されることのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = [os.path.join(temp_dir, f'{index}.csv') for index in range(3)]
+            generate_sample_data(paths[0], 500, seed=42)
+            generate_sample_data(paths[1], 500, seed=42)
+            generate_sample_data(paths[2], 500, seed=43)
+            
+            # 結果の検証
+            contents = []
+            for path in paths:
+                with open(path, 'rb') as f:
+                    contents.append(f.read())
+            assert contents[0] == contents[1]
+            assert contents[0] != contents[2]
+    
+    def test_generate_sample_data_with_invalid_engine(self):
+        """無効な生成エンジンで例外が発生することのテスト"""
+        with tempfile.NamedTemporaryFile(suffix='.csv') as temp_file:
+            with pytest.raises(ValueError) as excinfo:
+                generate_sample_data(temp_file.name, 10, engine='unknown')
+            assert "生成エンジン" in str(excinfo.value)
+    
+    def test_format_ids(self):
+        """連番のIDのCSV表現のテスト"""
+        # 桁の繰り上がりをまたぐ範囲
+        id_high, id_low = format_ids(995, 1005)
+        
+        # 結果の検証
+        ids = [high + low for high, low in zip(id_high, id_low)]
+        assert ids == [str(i).encode('ascii') for i in range(995, 1006)]
+        
+        # 大きなID
+        id_high, id_low = format_ids(1234567, 1234568)
+        assert [high + low for high, low in zip(id_high, id_low)] == [b'1234567', b'1234568']
+    
+    def test_get_shard_ranges(self):
+        """全行が重複なく連続したIDの範囲に分割されることのテスト"""
+        ranges = get_shard_ranges(10, 3)
+        assert ranges == [(1, 4), (5, 3), (8, 3)]
+        assert sum(rows for _, rows in ranges) == 10
+    
+    def test_generate_sharded_data_is_reproducible(self):
+        """同じシードとシャード数からはワーカー数に関係なく同一の出力が得られることのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            outputs = []
+            for workers in [1, 3]:
+                file_path = os.path.join(temp_dir, f'workers_{workers}', 'data.csv')
+                
+                # テスト実行
+                shard_files = generate_sharded_data(file_path, 1000, 4, workers=workers, seed=7)
+                
+                # 結果の検証 - シャードごとにヘッダー付きのファイルが作成される
+                assert [os.path.basename(path) for path in shard_files] == \
+                    [f'data-{index:05d}-of-00004.csv' for index in range(4)]
+                contents = []
+                for path in shard_files:
+                    with open(path, 'rb') as f:
+                        contents.append(f.read())
+                outputs.append(contents)
+            
+            assert outputs[0] == outputs[1]
+            
+            # 連結した場合も同一の出力になり、IDは1から連番になる
+            concat_path = os.path.join(temp_dir, 'concat', 'data.csv')
+            assert generate_sharded_data(concat_path, 1000, 4, workers=2, seed=7, concatenate=True) == [concat_path]
+            rows = self._read_rows(concat_path)
+            assert rows[0] == ["ID", "名前", "年齢", "国", "スコア"]
+            assert [int(row[0]) for row in rows[1:]] == list(range(1, 1001))
+            with open(concat_path, 'rb') as f:
+                concatenated = f.read()
+            header_length = concatenated.index(b'\n') + 1
+            assert concatenated == outputs[0][0] + b''.join(content[header_length:] for content in outputs[0][1:])
+    
+    def test_generate_sharded_data_with_invalid_shards(self):
+        """無効なシャード数で例外が発生することのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'data.csv')
+            with pytest.raises(ValueError):
+                generate_sharded_data(file_path, 10, 0)
+            with pytest.raises(ValueError):
+                generate_sharded_data(file_path, 10, 11)
+    
+    def test_get_output_format(self):
+        """出力形式の判定のテスト"""
+        assert get_output_format('data.csv') == 'csv'
+        assert get_output_format('data.parquet') == 'parquet'
+        assert get_output_format('data.PQ') == 'parquet'
+        assert get_output_format('data.csv', 'parquet') == 'parquet'
+        with pytest.raises(ValueError):
+            get_output_format('data.csv', 'json')
+    
+    def test_generate_sample_data_parquet(self):
+        """Parquet形式で同じ内容のデータが生成されることのテスト"""
+        pq = pytest.importorskip("pyarrow.parquet")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_path = os.path.join(temp_dir, 'data.csv')
+            parquet_path = os.path.join(temp_dir, 'data.parquet')
+            
+            # テスト実行（同じシードで生成する）
+            generate_sample_data(csv_path, 300, seed=5)
+            generate_sample_data(parquet_path, 300, seed=5)
+            
+            # 結果の検証 - 国は辞書エンコーディングで保存される
+            table = pq.read_table(parquet_path)
+            assert table.column_names == ["ID", "名前", "年齢", "国", "スコア"]
+            assert str(table.schema.field("国").type).startswith("dictionary")
+            
+            # CSVと同じ値が保存される
+            rows = self._read_rows(csv_path)[1:]
+            records = table.to_pylist()
+            assert len(records) == 300
+            for row, record in zip(rows, records):
+                assert int(row[0]) == record["ID"]
+                assert row[1] == record["名前"]
+                assert int(row[2]) == record["年齢"]
+                assert row[3] == record["国"]
+                assert float(row[4]) == record["スコア"]
+            
+            # Parquet形式はpythonエンジンでは生成できない
+            with pytest.raises(ValueError):
+                generate_sample_data(parquet_path, 10, engine='python')
+    
+    def test_generate_sharded_data_parquet(self):
+        """Parquet形式のシャードを連結できることのテスト"""
+        pq = pytest.importorskip("pyarrow.parquet")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'data.parquet')
+            
+            # テスト実行
+            assert generate_sharded_data(file_path, 500, 3, workers=2, seed=1, concatenate=True) == [file_path]
+            
+            # 結果の検証
+            table = pq.read_table(file_path)
+            assert table.column("ID").to_pylist() == list(range(1, 501))
+            assert os.listdir(temp_dir) == ['data.parquet']
+    
+    def test_get_country_codes_follows_master(self, monkeypatch):
+        """国コードをマスタデータから逆引きし、マスタデータの変更に追従することのテスト"""
+        master = load_master()
+        edited = type('Master', (), {'country_code_map': dict(master.country_code_map, JPN='日本')})()
+        del edited.country_code_map['JP']
+        monkeypatch.setattr('src.generate_sample_data.load_master', lambda: edited)
+        
+        # 結果の検証
+        assert get_country_codes()[COUNTRIES.index('日本')] == 'JPN'
+        
+        # マスタデータにない国
+        del edited.country_code_map['JPN']
+        with pytest.raises(KeyError):
+            get_country_codes()
+    
+    def test_generate_sample_data_country_codes(self):
+        """国コード形式で出力した場合に、国名形式と同じ国が国コードで出力されることのテスト"""
+        # 国コードはマスタデータと一致する
+        master = load_master().get_mapping('国名', '国コード')
+        assert [master[country] for country in COUNTRIES] == get_country_codes()
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for engine in ['numpy', 'python']:
+                name_path = os.path.join(temp_dir, f'{engine}_name.csv')
+                code_path = os.path.join(temp_dir, f'{engine}_code.csv')
+                
+                # テスト実行
+                generate_sample_data(name_path, 300, engine=engine, seed=5)
+                generate_sample_data(code_path, 300, engine=engine, seed=5, country_format='code')
+                
+                # 結果の検証
+                name_rows = self._read_rows(name_path)
+                code_rows = self._read_rows(code_path)
+                assert code_rows[0] == ["ID", "名前", "年齢", "国コード", "スコア"]
+                assert [row[3] for row in code_rows[1:]] == [master[row[3]] for row in name_rows[1:]]
+                assert os.path.getsize(code_path) < os.path.getsize(name_path)
+            
+            # 無効な国の出力形式
+            with pytest.raises(ValueError):
+                generate_sample_data(code_path, 10, country_format='invalid')
+    
+    def test_generate_skewed_distribution(self):
+        """偏った国の分布で生成した場合に、各国の件数が出現確率に従うことのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for engine in ['numpy', 'python']:
+                uniform_path = os.path.join(temp_dir, f'{engine}_uniform.csv')
+                skewed_path = os.path.join(temp_dir, f'{engine}_skewed.csv')
+                
+                # テスト実行
+                generate_sample_data(uniform_path, 20000, engine=engine, seed=3)
+                generate_sample_data(skewed_path, 20000, engine=engine, seed=3, country_distribution='skewed')
+                
+                # 結果の検証 - 各国の割合は出現確率から大きく外れない
+                for path, weights in [(uniform_path, [0.2] * len(COUNTRIES)), (skewed_path, SKEWED_COUNTRY_WEIGHTS)]:
+                    countries = [row[3] for row in self._read_rows(path)[1:]]
+                    for country, weight in zip(COUNTRIES, weights):
+                        assert abs(countries.count(country) / len(countries) - weight) < 0.02
+            
+            # 無効な国の分布
+            with pytest.raises(ValueError):
+                generate_sample_data(skewed_path, 10, country_distribution='invalid')
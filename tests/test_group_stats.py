@@ -0,0 +1,112 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from src.group_stats import GroupStats, STATS_COLUMNS, combine_moments
+
+
+def make_frame(rows=5000, seed=0):
+    """テスト用に国・スコア・年齢のDataFrameを作成する（欠損値を含む）"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        '国': rng.choice(['日本', 'アメリカ', 'ドイツ', 'インド'], rows),
+        'スコア': rng.normal(50, 20, rows).round(2),
+        '年齢': rng.integers(18, 61, rows).astype(float),
+    })
+    df.loc[::13, 'スコア'] = np.nan
+    df.loc[::29, '国'] = None
+    return df
+
+
+class TestGroupStats:
+    """グループごとの統計量の集計機能のテスト"""
+    
+    def assert_matches_pandas(self, stats, df):
+        """集計結果が pandas の groupby の結果と一致することを確認する"""
+        expected = df.groupby('国')[STATS_COLUMNS].agg(['count', 'mean', 'var', 'min', 'max'])
+        assert set(stats.rows) == set(expected.index)
+        for country in expected.index:
+            summary = stats.summary(country)
+            assert stats.rows[country] == int((df['国'] == country).sum())
+            for column in STATS_COLUMNS:
+                for key in ['count', 'mean', 'var', 'min', 'max']:
+                    assert summary[column][key] == pytest.approx(expected.loc[country, (column, key)], rel=1e-9)
+                assert summary[column]['std'] == pytest.approx(np.sqrt(summary[column]['var']))
+    
+    def test_update(self):
+        """1回の更新でグループごとの統計量を求める機能のテスト"""
+        df = make_frame()
+        
+        # 機能のテスト
+        stats = GroupStats()
+        stats.update(df['国'], df)
+        
+        # 結果の検証
+        self.assert_matches_pandas(stats, df)
+        assert list(stats.row_counts()) == sorted(stats.rows.values(), reverse=True)
+    
+    def test_merge_chunks(self):
+        """チャンクごとの部分的な統計量の統合が、一括で集計した結果と一致することのテスト"""
+        df = make_frame()
+        
+        # 機能のテスト - チャンク単位で更新する場合と、別々に集計して統合する場合
+        chunked = GroupStats()
+        merged = GroupStats()
+        for start in range(0, len(df), 777):
+            chunk = df.iloc[start:start + 777]
+            chunked.update(chunk['国'].astype('category'), chunk)
+            partial = GroupStats()
+            partial.update(chunk['国'], chunk)
+            merged.merge(partial)
+        
+        # 結果の検証
+        self.assert_matches_pandas(chunked, df)
+        self.assert_matches_pandas(merged, df)
+    
+    def test_combine_moments(self):
+        """件数が0の部分集合との統合では、もう一方の統計量をそのまま使うことのテスト"""
+        empty = [0, 0.0, 0.0, float('inf'), float('-inf')]
+        moments = [2, 1.5, 0.5, 1.0, 2.0]
+        assert combine_moments(empty, moments) == moments
+        assert combine_moments(moments, empty) == moments
+        assert combine_moments([1, 1.0, 0.0, 1.0, 1.0], [1, 2.0, 0.0, 2.0, 2.0]) == moments
+    
+    def test_map_groups(self):
+        """グループを変換して統合する機能のテスト（地域別の統計量）"""
+        df = make_frame()
+        stats = GroupStats()
+        stats.update(df['国'], df)
+        
+        # 機能のテスト
+        region_stats = stats.map_groups({'日本': 'アジア', 'インド': 'アジア', 'アメリカ': '北アメリカ'},
+                                        default='その他')
+        
+        # 結果の検証
+        regions = df['国'].map({'日本': 'アジア', 'インド': 'アジア', 'アメリカ': '北アメリカ'}).fillna('その他')
+        self.assert_matches_pandas(region_stats, df.assign(国=regions.where(df['国'].notna())))
+    
+    def test_serialization(self):
+        """JSONを経由して保存・復元できることのテスト"""
+        df = make_frame(100)
+        stats = GroupStats()
+        stats.update(df['国'], df)
+        
+        # 機能のテスト
+        restored = GroupStats.from_dict(json.loads(json.dumps(stats.to_dict())))
+        
+        # 結果の検証
+        assert restored.rows == stats.rows
+        for country in stats.rows:
+            assert restored.summary(country) == stats.summary(country)
+    
+    def test_missing_values(self):
+        """値がない・1件のみのグループの統計量のテスト"""
+        stats = GroupStats()
+        stats.update(pd.Series(['日本', 'ドイツ']), {'スコア': [np.nan, 10.0], '年齢': [None, None]})
+        
+        # 結果の検証
+        assert stats.rows == {'日本': 1, 'ドイツ': 1}
+        assert stats.summary('日本')['スコア'] == {'count': 0, 'mean': None, 'std': None, 'var': None,
+                                                  'min': None, 'max': None}
+        assert stats.summary('ドイツ')['スコア']['mean'] == 10.0
+        assert stats.summary('ドイツ')['スコア']['var'] is None
@@ -0,0 +1,136 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from src.grouping_sets import GroupingSets, parse_dimension, factorize_brackets, format_dimension_label
+
+
+def make_frame(rows=6000, seed=0):
+    """テスト用に国・名前・年齢のDataFrameを作成する（欠損値を含む）"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        '国': rng.choice(['日本', 'アメリカ', 'ドイツ', 'インド'], rows),
+        '名前': rng.choice(['太郎', '花子', '健一'], rows),
+        '年齢': rng.integers(18, 61, rows).astype(float),
+    })
+    df.loc[::11, '年齢'] = np.nan
+    df.loc[::37, '国'] = None
+    return df
+
+
+def expected_counts(df, columns):
+    """pandas の groupby で組み合わせごとの行数を求める"""
+    return {key if isinstance(key, tuple) else (key,): count
+            for key, count in df.groupby(columns).size().items()}
+
+
+class TestGroupingSets:
+    """軸の組み合わせごとの行数の集計機能のテスト"""
+    
+    def test_parse_dimension(self):
+        """集計の軸の指定を解析する機能のテスト"""
+        assert parse_dimension('国') == ('国', None, None)
+        assert parse_dimension('地域') == ('地域', None, None)
+        assert parse_dimension('名前') == ('名前', '名前', None)
+        assert parse_dimension('年齢:10') == ('年齢:10', '年齢', 10)
+        assert format_dimension_label('年齢:5') == '年齢（5刻み）'
+        for spec in ['年齢:0', '年齢:x', '年齢:']:
+            with pytest.raises(ValueError):
+                parse_dimension(spec)
+        with pytest.raises(ValueError):
+            GroupingSets([])
+    
+    def test_factorize_brackets(self):
+        """数値を幅で区切った範囲の番号に変換する機能のテスト（負の値と欠損値を含む）"""
+        codes, labels = factorize_brackets(pd.Series([25, 18, None, 'x', 29.5, -3]), 10)
+        
+        # 結果の検証
+        assert [labels[code] if code >= 0 else None for code in codes] == \
+            ['20〜29', '10〜19', None, None, '20〜29', '-10〜-1']
+    
+    def test_update_matches_groupby(self):
+        """チャンク単位の更新と統合の結果が pandas の groupby と一致することのテスト"""
+        df = make_frame()
+        df['年齢帯'] = (df['年齢'] // 10 * 10).map(lambda start: f"{start:.0f}〜{start + 9:.0f}", na_action='ignore')
+        sets = [['名前'], ['年齢:10'], ['国', '名前'], ['地域', '年齢:10']]
+        
+        # 機能のテスト
+        grouping_sets = GroupingSets(sets)
+        for start in range(0, len(df), 2500):
+            chunk = df.iloc[start:start + 2500]
+            partial = GroupingSets(sets)
+            partial.update(chunk['国'], chunk)
+            grouping_sets.merge(partial)
+        regions = grouping_sets.map_regions({'日本': 'アジア', 'インド': 'アジア', 'ドイツ': 'ヨーロッパ'})
+        
+        # 結果の検証 - いずれかの軸が欠損値の行は数えない
+        df['地域'] = df['国'].map({'日本': 'アジア', 'インド': 'アジア', 'ドイツ': 'ヨーロッパ'}).fillna('その他')
+        df.loc[df['国'].isna(), '地域'] = None
+        assert dict(regions.summary(0)) == expected_counts(df, ['名前'])
+        assert dict(regions.summary(1)) == expected_counts(df, ['年齢帯'])
+        assert dict(regions.summary(2)) == expected_counts(df, ['国', '名前'])
+        assert dict(regions.summary(3)) == expected_counts(df, ['地域', '年齢帯'])
+        
+        # 分類の軸のみの組み合わせは行数の降順に並べる
+        counts = [count for _, count in regions.summary(2)]
+        assert counts == sorted(counts, reverse=True)
+    
+    def test_summary_order(self):
+        """幅で区切った軸と数値の軸は値の順、分類の軸は合計行数の降順に並べることのテスト"""
+        df = pd.DataFrame({
+            '国': ['日本', '日本', '日本', 'インド', 'インド', '日本'],
+            '年齢': [45, 25, 31, 25, 52, 8],
+            '名前': ['太郎', '花子', '太郎', '花子', '太郎', '太郎'],
+        })
+        grouping_sets = GroupingSets([['国', '年齢:10'], ['年齢'], ['年齢:20', '名前']])
+        grouping_sets.update(df['国'], df)
+        
+        # 結果の検証
+        assert grouping_sets.summary(0) == [
+            (('日本', '0〜9'), 1), (('日本', '20〜29'), 1), (('日本', '30〜39'), 1), (('日本', '40〜49'), 1),
+            (('インド', '20〜29'), 1), (('インド', '50〜59'), 1),
+        ]
+        assert [values for values, _ in grouping_sets.summary(1)] == [(8,), (25,), (31,), (45,), (52,)]
+        assert grouping_sets.summary(2) == [
+            (('0〜19', '太郎'), 1), (('20〜39', '太郎'), 1), (('20〜39', '花子'), 2), (('40〜59', '太郎'), 2),
+        ]
+    
+    def test_select(self):
+        """指定した軸の組み合わせのみを取り出す機能のテスト"""
+        df = make_frame()
+        grouping_sets = GroupingSets([['国'], ['名前'], ['地域', '名前']])
+        grouping_sets.update(df['国'], df)
+        
+        # 機能のテスト
+        selected = grouping_sets.select([2, 0])
+        
+        # 結果の検証
+        assert selected.sets == [['地域', '名前'], ['国']]
+        assert selected.summary(0) == grouping_sets.summary(2)
+        assert selected.summary(1) == grouping_sets.summary(0)
+    
+    def test_map_groups(self):
+        """国コードを国名に変換し、国と地域の軸のみを変換する機能のテスト"""
+        df = pd.DataFrame({'国コード': ['JP', 'US', 'JP', 'XX'], '名前': ['太郎', '花子', '太郎', '健一']})
+        grouping_sets = GroupingSets([['国', '名前'], ['名前']])
+        grouping_sets.update(df['国コード'].astype('category'), df)
+        
+        # 機能のテスト
+        mapped = grouping_sets.map_groups({'JP': '日本', 'US': 'アメリカ'})
+        
+        # 結果の検証
+        assert mapped.summary(0) == [(('日本', '太郎'), 2), (('XX', '健一'), 1), (('アメリカ', '花子'), 1)]
+        assert mapped.summary(1) == grouping_sets.summary(1)
+    
+    def test_serialization(self):
+        """JSONを経由して保存・復元できることのテスト"""
+        df = make_frame()
+        grouping_sets = GroupingSets([['国', '年齢:5'], ['名前']])
+        grouping_sets.update(df['国'], df)
+        
+        # 機能のテスト
+        restored = GroupingSets.from_dict(json.loads(json.dumps(grouping_sets.to_dict())))
+        
+        # 結果の検証
+        for index in range(2):
+            assert restored.summary(index) == grouping_sets.summary(index)
@@ -0,0 +1,195 @@
+import io
+import os
+import tempfile
+from src.incremental import (
+    aggregate_incremental,
+    aggregate_incremental_report,
+    count_incremental,
+    iter_line_blocks,
+    CsvFollower,
+    watch_csv
+)
+
+
+class TestIncremental:
+    """追記型CSVの増分集計と監視のテスト"""
+    
+    def test_iter_line_blocks(self):
+        """範囲が行の境界に揃ったブロックに分割されることのテスト"""
+        content = b"".join(f"{i},日本\n".encode('utf-8') for i in range(50))
+        
+        # 機能のテスト
+        blocks = list(iter_line_blocks(io.BytesIO(content), 0, len(content), block_bytes=32))
+        
+        # 結果の検証 - 隙間なく連続し、各ブロックは行末で終わる
+        assert blocks[0][0] == 0
+        assert blocks[-1][1] == len(content)
+        for (_, end), (next_start, _) in zip(blocks, blocks[1:]):
+            assert end == next_start
+            assert content[end - 1:end] == b'\n'
+    
+    def test_aggregate_incremental(self):
+        """追記型CSVの増分集計のテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'log.csv')
+            state_path = os.path.join(temp_dir, 'state', 'log.json')
+            header = "ID,国\n"
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(header + "1,日本\n2,インド\n")
+            
+            # 1回目は全体を走査する
+            counts, scanned_bytes = aggregate_incremental(file_path, state_path)
+            assert counts.to_dict() == {'日本': 1, 'インド': 1}
+            assert scanned_bytes == os.path.getsize(file_path) - len(header.encode('utf-8'))
+            
+            # 追記分のみを走査する
+            appended = "3,日本\n4,ドイツ\n"
+            with open(file_path, 'a', encoding='utf-8') as f:
+                f.write(appended)
+            counts, scanned_bytes = aggregate_incremental(file_path, state_path)
+            assert counts.to_dict() == {'日本': 2, 'インド': 1, 'ドイツ': 1}
+            assert scanned_bytes == len(appended.encode('utf-8'))
+            
+            # 改行のない末尾の行は集計に含めるが、次回あらためて集計する
+            with open(file_path, 'a', encoding='utf-8') as f:
+                f.write("5,日本")
+            counts, _ = aggregate_incremental(file_path, state_path)
+            assert counts['日本'] == 3
+            with open(file_path, 'a', encoding='utf-8') as f:
+                f.write("\n6,日本\n")
+            counts, _ = aggregate_incremental(file_path, state_path)
+            assert counts['日本'] == 4
+            assert counts.sum() == 6
+            
+            # ファイルが書き換えられた場合は全体を再走査する
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(header + "1,カナダ\n2,カナダ\n3,カナダ\n4,カナダ\n5,カナダ\n6,カナダ\n7,カナダ\n")
+            counts, scanned_bytes = aggregate_incremental(file_path, state_path)
+            assert counts.to_dict() == {'カナダ': 7}
+            assert scanned_bytes == os.path.getsize(file_path) - len(header.encode('utf-8'))
+            
+            # ファイルが切り詰められた場合も全体を再走査する
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(header + "1,日本\n")
+            counts, _ = aggregate_incremental(file_path, state_path)
+            assert counts.to_dict() == {'日本': 1}
+    
+    def test_csv_follower(self):
+        """追記されたCSVの完全な行のみを集計する機能のテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'log.csv')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write("ID,国\n1,日本\n2,イン")
+            
+            # 書き込み途中の行は集計しない
+            follower = CsvFollower(file_path, batch_bytes=8)
+            assert follower.poll() == 1
+            assert follower.country_counts.to_dict() == {'日本': 1}
+            
+            # 追記がない場合は何もしない
+            assert follower.poll() == 0
+            
+            # 行の残りが追記されると集計される
+            with open(file_path, 'a', encoding='utf-8') as f:
+                f.write("ド\n3,日本\n")
+            assert follower.poll() == 2
+            assert follower.country_counts.to_dict() == {'日本': 2, 'インド': 1}
+            
+            # 切り詰められた場合は先頭から集計し直す
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write("ID,国\n1,ドイツ\n")
+            assert follower.poll() == 1
+            assert follower.country_counts.to_dict() == {'ドイツ': 1}
+    
+    def test_csv_follower_rewritten(self):
+        """切り詰めた後に前回の位置を超えて書き込まれた場合や、置き換えられた場合に先頭から集計し直すことのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'log.csv')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write("ID,国\n1,日本\n2,日本\n")
+            follower = CsvFollower(file_path)
+            assert follower.poll() == 2
+            
+            # 切り詰めてから前回より長く書き込む（サイズの比較だけでは検出できない）
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write("ID,国\n1,ドイツ\n2,ドイツ\n3,ドイツ\n")
+            assert follower.poll() == 3
+            assert follower.country_counts.to_dict() == {'ドイツ': 3}
+            
+            # 先頭部分が同じ別のファイルに置き換える（ログのローテーションなど）
+            rotated_path = os.path.join(temp_dir, 'rotated.csv')
+            with open(rotated_path, 'w', encoding='utf-8') as f:
+                f.write("ID,国\n1,ドイツ\n2,ドイツ\n3,ドイツ\n4,インド\n")
+            os.replace(rotated_path, file_path)
+            assert follower.poll() == 4
+            assert follower.country_counts.to_dict() == {'ドイツ': 3, 'インド': 1}
+            
+            # 追記のみの場合は続きから集計する
+            with open(file_path, 'a', encoding='utf-8') as f:
+                f.write("5,日本\n")
+            assert follower.poll() == 1
+            assert follower.country_counts.to_dict() == {'ドイツ': 3, 'インド': 1, '日本': 1}
+    
+    def test_watch_csv(self, capsys):
+        """CSVファイルの監視と再表示のテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'log.csv')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write("ID,国\n1,日本\n")
+            
+            sleeps = []
+            def fake_sleep(seconds):
+                # 2回目のポーリングの前に行を追記する
+                if not sleeps:
+                    with open(file_path, 'a', encoding='utf-8') as f:
+                        f.write("2,アメリカ\n")
+                sleeps.append(seconds)
+            
+            # 機能のテスト（時刻を進めずに再表示間隔を0とする）
+            follower = watch_csv(file_path, refresh_interval=0, max_polls=5,
+                                 sleep=fake_sleep, clock=lambda: 0.0)
+            output = capsys.readouterr().out
+            
+            # 結果の検証 - 更新があった2回だけ再表示される
+            assert follower.country_counts.to_dict() == {'日本': 1, 'アメリカ': 1}
+            assert output.count('【国別集計結果】') == 2
+            assert '【地域別集計結果】' in output
+            assert '2件' in output
+    
+    def test_watch_csv_backoff(self):
+        """追記がない間はポーリング間隔が延びることのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'log.csv')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write("ID,国\n")
+            
+            sleeps = []
+            watch_csv(file_path, refresh_interval=10, min_poll_interval=0.1, max_poll_interval=0.5,
+                      max_polls=5, sleep=sleeps.append, clock=lambda: 0.0)
+            
+            # 結果の検証 - 最大値まで倍々に延びる
+            assert sleeps == [0.2, 0.4, 0.5, 0.5, 0.5]
+    
+    def test_count_incremental(self, capsys):
+        """追記分のみを集計し、国名と地域に変換して表示することのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'log.csv')
+            state_path = os.path.join(temp_dir, 'log.state.json')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write("ID,国コード\n1,JP\n2,US\n")
+            count_incremental(file_path, state_path)
+            with open(file_path, 'a', encoding='utf-8') as f:
+                f.write("3,JP\n")
+            
+            # 機能のテスト
+            result = aggregate_incremental_report(file_path, state_path)
+            count_incremental(file_path, state_path, output_format='csv')
+            count_incremental(os.path.join(temp_dir, 'missing.csv'), state_path)
+            output = capsys.readouterr().out
+            
+            # 結果の検証
+            assert result.country_counts == {'日本': 2, 'アメリカ': 1}
+            assert result.region_counts == {'アジア': 2, '北アメリカ': 1}
+            assert '【地域別集計結果】' in output
+            assert '国,日本,2' in output
+            assert "が見つかりません" in output
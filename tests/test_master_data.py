@@ -0,0 +1,77 @@
+import os
+import time
+import pytest
+import tempfile
+import numpy as np
+from src.master_data import load_master, clear_master_cache, DEFAULT_MASTER_PATH
+
+
+class TestMasterData:
+    """国と地域のマスタデータのテスト"""
+    
+    def _write(self, file_path, content):
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    
+    def test_load_master_memoized(self, monkeypatch):
+        """マスタデータが一度だけ読み込まれ、カレントディレクトリに依存しないことのテスト"""
+        clear_master_cache()
+        master = load_master()
+        
+        # 別のディレクトリから実行しても同じインスタンスを返す
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monkeypatch.chdir(temp_dir)
+            assert load_master() is master
+            assert load_master(DEFAULT_MASTER_PATH) is master
+        
+        # 結果の検証
+        assert master.country_region_map['日本'] == 'アジア'
+        assert master.country_code_map['JP'] == '日本'
+        assert master.country_code_region_map['US'] == 'NAMERICA'
+    
+    def test_lookup_arrays(self):
+        """国コードから地域への変換を配列の添字で行えることのテスト"""
+        master = load_master()
+        
+        # 機能のテスト
+        country_index = master.encode_country_codes(['JP', 'DE', 'XX', 'BR'])
+        
+        # 結果の検証 - マスタデータにない国コードは-1
+        assert country_index[2] == -1
+        region_index = master.lookup_region_index(country_index[country_index >= 0])
+        assert list(master.region_codes[region_index]) == ['ASIA', 'EUROPE', 'SAMERICA']
+        assert list(master.region_names[region_index]) == ['アジア', 'ヨーロッパ', '南アメリカ']
+        assert list(master.encode_country_names(['カナダ', '不明'])) == [list(master.country_codes).index('CA'), -1]
+        
+        # すべての国について辞書と同じ結果になる
+        all_regions = master.region_names[master.lookup_region_index(np.arange(len(master.country_names)))]
+        assert dict(zip(master.country_names, all_regions)) == master.country_region_map
+    
+    def test_reload_when_file_changes(self):
+        """マスタデータのファイルが変更された場合に再読み込みされることのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            master_path = os.path.join(temp_dir, 'master.csv')
+            self._write(master_path, "国コード,国名,地域コード,地域名\nJP,日本,ASIA,アジア\n")
+            first = load_master(master_path)
+            assert load_master(master_path) is first
+            
+            # ファイルを更新する（サイズと更新日時が変わる）
+            time.sleep(0.01)
+            self._write(master_path, "国コード,国名,地域コード,地域名\nJP,日本,ASIA,アジア\nFR,フランス,EUROPE,ヨーロッパ\n")
+            
+            # 結果の検証
+            second = load_master(master_path)
+            assert second is not first
+            assert second.country_region_map == {'日本': 'アジア', 'フランス': 'ヨーロッパ'}
+    
+    def test_load_master_errors(self):
+        """マスタデータが存在しない、またはカラムが不足している場合のテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            master_path = os.path.join(temp_dir, 'master.csv')
+            
+            with pytest.raises(FileNotFoundError):
+                load_master(master_path)
+            
+            self._write(master_path, "国名,地域名\n日本,アジア\n")
+            with pytest.raises(KeyError):
+                load_master(master_path)
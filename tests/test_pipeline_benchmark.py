@@ -0,0 +1,71 @@
+import os
+import tempfile
+from src.generate_sample_data import generate_sample_data
+from benchmarks.pipeline_benchmark import measure_stages, merge_repeats, compare_results, make_entry
+
+
+class TestPipelineBenchmark:
+    """生成・集計の各段階の性能計測のテスト"""
+    
+    def _results(self, seconds, rss=100 * 1024 * 1024):
+        return {'results': [{'rows': 1000, 'distribution': 'uniform', 'stage': 'read',
+                             'seconds': seconds, 'peak_rss_bytes': 500 * 1024 * 1024, 'rss_growth_bytes': rss}]}
+    
+    def test_measure_stages(self, capsys):
+        """集計の各段階を計測する機能のテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'data.csv')
+            generate_sample_data(file_path, 1000, seed=0, country_distribution='skewed')
+            capsys.readouterr()
+            
+            # 機能のテスト（DataFrameに読み込む場合とチャンク単位で集計する場合）
+            staged = measure_stages(file_path)
+            scanned = measure_stages(file_path, chunksize=300)
+            
+            # 結果の検証
+            assert [phase['name'] for phase in staged['phases']] == \
+                ['import', 'read', 'country_agg', 'region_agg', 'ordering', 'display']
+            assert [phase['name'] for phase in scanned['phases']] == \
+                ['import', 'scan', 'region_agg', 'ordering', 'display']
+            assert staged['rows'] == scanned['rows'] == 1000
+            assert staged['phases'][1]['rows'] == 1000
+            assert make_entry(1000, 'skewed', staged['phases'][1])['rows_per_sec'] > 0
+            
+            # ピークRSSの増加量は段階ごとに記録する
+            assert all(phase['rss_growth_bytes'] >= 0 for phase in staged['phases'])
+    
+    def test_merge_repeats(self):
+        """繰り返し計測した結果から、処理時間の最小値とメモリ使用量の最大値を選ぶ機能のテスト"""
+        reports = [
+            {'phases': [{'name': 'read', 'wall_seconds': 0.3, 'cpu_seconds': 0.3, 'peak_rss_bytes': 10}]},
+            {'phases': [{'name': 'read', 'wall_seconds': 0.2, 'cpu_seconds': 0.1, 'peak_rss_bytes': 30}]},
+        ]
+        
+        # 機能のテスト
+        merged = merge_repeats(reports)
+        
+        # 結果の検証
+        assert merged == [{'name': 'read', 'wall_seconds': 0.2, 'cpu_seconds': 0.1, 'peak_rss_bytes': 30}]
+    
+    def test_compare_results(self):
+        """ベースラインとの比較で、閾値を超えた劣化のみを検出する機能のテスト"""
+        baseline = self._results(1.0)
+        
+        # 閾値以内の増加は劣化としない
+        assert compare_results(baseline, self._results(1.05))[0]['regressions'] == []
+        
+        # 処理時間とメモリ使用量の劣化
+        assert compare_results(baseline, self._results(1.5))[0]['regressions'] == ['time']
+        assert compare_results(baseline, self._results(1.0, 300 * 1024 * 1024))[0]['regressions'] == ['memory']
+        
+        # 誤差とみなす短い処理時間の差は無視する
+        assert compare_results(self._results(0.001), self._results(0.003))[0]['regressions'] == []
+        
+        # 累積のピークRSSが増えても、その段階での増加量が変わらなければ劣化としない
+        current = self._results(1.0)
+        current['results'][0]['peak_rss_bytes'] *= 2
+        assert compare_results(baseline, current)[0]['regressions'] == []
+        
+        # ベースラインにない段階は比較しない
+        current = {'results': [dict(self._results(9.0)['results'][0], stage='display')]}
+        assert compare_results(baseline, current) == []
@@ -0,0 +1,89 @@
+import os
+import json
+import tempfile
+from src.profiling import create_profiler, PhaseProfiler, NULL_PROFILER, PROFILE_ENV_VAR
+from src.count_by_country import count_by_country
+from src.generate_sample_data import generate_sample_data
+
+
+class TestProfiling:
+    """処理段階ごとの計測機能のテスト"""
+    
+    def test_create_profiler(self, monkeypatch):
+        """コマンドライン引数と環境変数から計測の有効・無効を判定する機能のテスト"""
+        monkeypatch.delenv(PROFILE_ENV_VAR, raising=False)
+        assert create_profiler('test') is NULL_PROFILER
+        
+        # 環境変数で有効にする
+        monkeypatch.setenv(PROFILE_ENV_VAR, '1')
+        profiler = create_profiler('test')
+        assert profiler.enabled
+        assert profiler.output == '-'
+        monkeypatch.setenv(PROFILE_ENV_VAR, '0')
+        assert create_profiler('test') is NULL_PROFILER
+        
+        # 引数の指定は環境変数より優先する
+        assert create_profiler('test', 'profile.jsonl', trace_memory=False).output == 'profile.jsonl'
+    
+    def test_phase_profiler(self, capsys):
+        """処理段階ごとの計測結果を1行のJSONとして出力する機能のテスト"""
+        profiler = PhaseProfiler('test', trace_memory=True)
+        
+        # 機能のテスト
+        with profiler.phase('build', rows=1000):
+            data = list(range(100000))
+        with profiler.phase('sum') as phase:
+            phase.rows = len(data)
+            sum(data)
+        profiler.emit(inputs=['a.csv'])
+        
+        # 結果の検証
+        captured = capsys.readouterr()
+        assert captured.out == ''
+        lines = captured.err.splitlines()
+        assert len(lines) == 1
+        report = json.loads(lines[0])
+        assert report['program'] == 'test'
+        assert report['inputs'] == ['a.csv']
+        assert [phase['name'] for phase in report['phases']] == ['build', 'sum']
+        build = report['phases'][0]
+        assert build['rows'] == 1000
+        assert build['wall_seconds'] >= 0
+        assert build['cpu_seconds'] >= 0
+        assert build['tracemalloc_peak_bytes'] > 0
+        assert report['phases'][1]['rows'] == 100000
+    
+    def test_null_profiler(self, capsys):
+        """計測が無効な場合は何も出力しないことのテスト"""
+        with NULL_PROFILER.phase('scan') as phase:
+            phase.rows = 10
+        NULL_PROFILER.emit()
+        
+        # 結果の検証
+        assert capsys.readouterr().err == ''
+    
+    def test_count_by_country_profile(self, capsys):
+        """集計と生成の処理段階の計測結果をファイルに追記する機能のテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'data.csv')
+            profile_path = os.path.join(temp_dir, 'profile.jsonl')
+            
+            # 機能のテスト
+            generator_profiler = create_profiler('generate_sample_data', profile_path, False)
+            generate_sample_data(file_path, 100, seed=0, profiler=generator_profiler)
+            generator_profiler.emit()
+            profiler = create_profiler('count_by_country', profile_path, False)
+            count_by_country(file_path, light_max_bytes=0, profiler=profiler)
+            capsys.readouterr()
+            
+            # 結果の検証 - 1回の実行ごとに1行を追記する
+            with open(profile_path, 'r', encoding='utf-8') as f:
+                reports = [json.loads(line) for line in f]
+            assert [report['program'] for report in reports] == ['generate_sample_data', 'count_by_country']
+            assert reports[0]['phases'][0]['name'] == 'generate'
+            assert reports[0]['phases'][0]['rows'] == 100
+            assert reports[1]['inputs'] == [file_path]
+            phases = {phase['name']: phase for phase in reports[1]['phases']}
+            assert list(phases) == ['scan', 'resolve', 'rollup', 'render', 'write']
+            assert phases['scan']['rows'] == 100
+            assert phases['scan']['rows_per_sec'] > 0
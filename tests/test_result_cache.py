@@ -0,0 +1,122 @@
+import os
+import time
+import tempfile
+from src.result_cache import ResultCache, compute_file_hash
+
+
+class TestResultCache:
+    """ファイル単位の集計結果キャッシュのテスト"""
+    
+    def _write(self, file_path, content):
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    
+    def test_put_and_get(self):
+        """保存した集計結果を取得できることのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_path = os.path.join(temp_dir, 'data.csv')
+            self._write(data_path, "ID,国\n1,日本\n")
+            cache = ResultCache(os.path.join(temp_dir, 'cache'))
+            
+            # 保存前は取得できない
+            assert cache.get(data_path) is None
+            
+            # 機能のテスト
+            cache.put(data_path, {'日本': 1})
+            
+            # 結果の検証 - 種類が異なる集計結果とは区別される
+            assert cache.get(data_path) == {'日本': 1}
+            assert cache.get(data_path, kind='other') is None
+    
+    def test_invalidated_when_file_changes(self):
+        """ファイルが変更された場合にキャッシュが無効になることのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_path = os.path.join(temp_dir, 'data.csv')
+            self._write(data_path, "ID,国\n1,日本\n")
+            cache = ResultCache(os.path.join(temp_dir, 'cache'))
+            cache.put(data_path, {'日本': 1})
+            
+            # ファイルに行を追加する（サイズと更新日時が変わる）
+            self._write(data_path, "ID,国\n1,日本\n2,インド\n")
+            
+            # 結果の検証
+            assert cache.get(data_path) is None
+    
+    def test_content_hash_key(self):
+        """内容のハッシュ値をキーに含めた場合のテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_path = os.path.join(temp_dir, 'data.csv')
+            self._write(data_path, "ID,国\n1,日本\n")
+            cache = ResultCache(os.path.join(temp_dir, 'cache'), use_content_hash=True)
+            cache.put(data_path, {'日本': 1})
+            stat = os.stat(data_path)
+            
+            # サイズと更新日時を維持したまま内容を書き換える
+            self._write(data_path, "ID,国\n1,中国\n")
+            os.utime(data_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            
+            # 結果の検証
+            assert cache.get(data_path) is None
+            assert len(compute_file_hash(data_path)) == 64
+    
+    def test_lru_eviction(self):
+        """上限サイズを超えた場合に最も古く使われたエントリから削除されることのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_paths = []
+            for index in range(3):
+                data_path = os.path.join(temp_dir, f'data_{index}.csv')
+                self._write(data_path, f"ID,国\n{index},日本\n")
+                data_paths.append(data_path)
+            
+            # 2エントリ分の上限を設定する（1エントリは12バイト）
+            cache = ResultCache(os.path.join(temp_dir, 'cache'), max_bytes=30)
+            cache.put(data_paths[0], {'日本': 1})
+            time.sleep(0.01)
+            cache.put(data_paths[1], {'日本': 2})
+            time.sleep(0.01)
+            
+            # 最初のエントリを使用して最新にする
+            assert cache.get(data_paths[0]) == {'日本': 1}
+            time.sleep(0.01)
+            cache.put(data_paths[2], {'日本': 3})
+            
+            # 結果の検証 - 最も古く使われた2番目のエントリが削除される
+            assert cache.get(data_paths[1]) is None
+            assert cache.get(data_paths[2]) == {'日本': 3}
+    
+    def test_put_failure_only_warns(self, capsys):
+        """キャッシュに書き込めない場合も例外にならず、警告を1回だけ表示することのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_path = os.path.join(temp_dir, 'data.csv')
+            self._write(data_path, "ID,国\n1,日本\n")
+            
+            # 通常のファイルの下にはディレクトリを作成できない
+            cache = ResultCache(os.path.join(data_path, 'cache'))
+            
+            # 機能のテスト
+            cache.put(data_path, {'日本': 1})
+            cache.put(data_path, {'日本': 1}, kind='other')
+            
+            # 結果の検証
+            assert capsys.readouterr().out.count("警告: 集計結果をキャッシュに保存できませんでした") == 1
+            assert cache.get(data_path) is None
+    
+    def test_file_state_hashes_once(self, monkeypatch):
+        """ファイルの状態を使い回すと、取得と保存で内容のハッシュ値を1回だけ計算することのテスト"""
+        calls = []
+        monkeypatch.setattr('src.result_cache.compute_file_hash',
+                            lambda file_path: calls.append(file_path) or 'hash')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            data_path = os.path.join(temp_dir, 'data.csv')
+            self._write(data_path, "ID,国\n1,日本\n")
+            cache = ResultCache(os.path.join(temp_dir, 'cache'), use_content_hash=True)
+            
+            # 機能のテスト
+            state = cache.file_state(data_path)
+            assert cache.get(data_path, state=state) is None
+            cache.put(data_path, {'日本': 1}, state=state)
+            cache.put(data_path, {'日本': 1}, kind='other', state=state)
+            
+            # 結果の検証 - 状態を渡さない場合と同じキーになる
+            assert len(calls) == 1
+            assert cache.get(data_path) == {'日本': 1}
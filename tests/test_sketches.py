@@ -0,0 +1,290 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from src.sketches import (KllSketch, GroupQuantiles, DEFAULT_KLL_K, HyperLogLog, ExactDistinct, GroupDistinct,
+                          SpaceSaving, hash_values)
+
+
+def rank_error(sorted_values, estimate, fraction):
+    """近似値の順位と指定した分位の差（全件数に対する割合）を求める"""
+    return abs(np.searchsorted(sorted_values, estimate) / len(sorted_values) - fraction)
+
+
+class TestKllSketch:
+    """KLLスケッチによる分位数の近似のテスト"""
+    
+    FRACTIONS = [0.01, 0.1, 0.5, 0.9, 0.99]
+    
+    def test_quantiles(self):
+        """近似値の順位の誤差が一定以内で、保持する値の数が件数によらないことのテスト"""
+        rng = np.random.default_rng(0)
+        values = rng.lognormal(0, 2, 500000)
+        
+        # 機能のテスト - 小さなバッチに分けて追加する
+        sketch = KllSketch()
+        for start in range(0, len(values), 1000):
+            sketch.update(values[start:start + 1000])
+        
+        # 結果の検証
+        sorted_values = np.sort(values)
+        for fraction, estimate in zip(self.FRACTIONS, sketch.quantiles(self.FRACTIONS)):
+            assert rank_error(sorted_values, estimate, fraction) < 0.03
+        assert sum(len(items) for items in sketch.levels) <= 3 * DEFAULT_KLL_K
+        assert sketch.count == len(values)
+        assert sketch.quantiles([0, 1]) == [values.min(), values.max()]
+    
+    def test_merge(self):
+        """部分ごとのスケッチを統合しても誤差が一定以内であることのテスト"""
+        rng = np.random.default_rng(1)
+        values = rng.normal(50, 20, 300000)
+        
+        # 機能のテスト
+        merged = KllSketch()
+        for part in np.array_split(values, 7):
+            sketch = KllSketch()
+            sketch.update(part)
+            merged.merge(sketch)
+        
+        # 結果の検証
+        sorted_values = np.sort(values)
+        for fraction, estimate in zip(self.FRACTIONS, merged.quantiles(self.FRACTIONS)):
+            assert rank_error(sorted_values, estimate, fraction) < 0.03
+        assert merged.count == len(values)
+    
+    def test_small_input(self):
+        """上限以下の件数では正確な分位数になることのテスト"""
+        sketch = KllSketch()
+        assert sketch.quantiles([0.5]) == [None]
+        sketch.update([5.0, 1.0, 3.0, 2.0, 4.0])
+        assert sketch.quantiles([0.2, 0.5, 1.0]) == [1.0, 3.0, 5.0]
+        
+        # 無効な精度パラメータ
+        with pytest.raises(ValueError):
+            KllSketch(1)
+    
+    def test_serialization(self):
+        """JSONを経由して保存・復元したスケッチが同じ結果になることのテスト"""
+        sketch = KllSketch(50)
+        sketch.update(np.arange(10000, dtype=float))
+        
+        # 機能のテスト
+        restored = KllSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+        
+        # 結果の検証
+        assert restored.quantiles(self.FRACTIONS) == sketch.quantiles(self.FRACTIONS)
+        restored.update([1.0])
+        sketch.update([1.0])
+        assert restored.to_dict() == sketch.to_dict()
+
+
+class TestGroupQuantiles:
+    """グループごとの分位数の近似のテスト"""
+    
+    def test_update_and_merge(self):
+        """グループごとの分位数を、チャンク単位の更新と統合で求める機能のテスト"""
+        rng = np.random.default_rng(2)
+        df = pd.DataFrame({
+            '国': rng.choice(['日本', 'アメリカ', 'ドイツ'], 60000),
+            'スコア': rng.uniform(0, 100, 60000),
+            '年齢': rng.integers(18, 61, 60000),
+        })
+        df.loc[::11, 'スコア'] = np.nan
+        
+        # 機能のテスト
+        merged = GroupQuantiles()
+        for start in range(0, len(df), 7000):
+            chunk = df.iloc[start:start + 7000]
+            partial = GroupQuantiles()
+            partial.update(chunk['国'], chunk)
+            merged.merge(partial)
+        regions = merged.map_groups({'日本': 'アジア'}, default='その他')
+        
+        # 結果の検証
+        for country, group in df.groupby('国'):
+            summary = merged.summary(country, [50, 90])
+            scores = np.sort(group['スコア'].dropna().to_numpy())
+            assert rank_error(scores, summary['スコア'][50], 0.5) < 0.03
+            assert rank_error(scores, summary['スコア'][90], 0.9) < 0.03
+            assert abs(summary['年齢'][50] - group['年齢'].median()) <= 1
+        other = np.sort(df.loc[df['国'] != '日本', 'スコア'].dropna().to_numpy())
+        assert rank_error(other, regions.summary('その他', [50])['スコア'][50], 0.5) < 0.03
+        assert merged.summary('不明の国') == {'スコア': {50: None, 90: None, 99: None},
+                                            '年齢': {50: None, 90: None, 99: None}}
+    
+    def test_serialization(self):
+        """JSONを経由して保存・復元できることのテスト"""
+        quantiles = GroupQuantiles(k=20)
+        quantiles.update(pd.Series(['日本', 'ドイツ'] * 500), {'スコア': np.arange(1000.0), '年齢': np.ones(1000)})
+        
+        # 機能のテスト
+        restored = GroupQuantiles.from_dict(json.loads(json.dumps(quantiles.to_dict())))
+        
+        # 結果の検証
+        assert restored.k == 20
+        for country in ['日本', 'ドイツ']:
+            assert restored.summary(country) == quantiles.summary(country)
+
+
+class TestHyperLogLog:
+    """HyperLogLog による重複を除いた件数の推定のテスト"""
+    
+    def test_estimate(self):
+        """推定値の誤差が標準誤差の数倍以内であることのテスト（少ない件数から多い件数まで）"""
+        rng = np.random.default_rng(3)
+        for distinct in [10, 1000, 50000, 300000]:
+            values = pd.Series(rng.permutation(distinct)).astype(str)
+            
+            # 機能のテスト - 重複を含めて2回に分けて追加する
+            sketch = HyperLogLog(12)
+            sketch.update_hashes(hash_values(values))
+            sketch.update_hashes(hash_values(values[:distinct // 2]))
+            
+            # 結果の検証
+            assert abs(sketch.estimate() - distinct) <= max(1, 4 * sketch.standard_error * distinct)
+    
+    def test_merge_and_serialization(self):
+        """レジスタの統合と、JSONを経由した保存・復元のテスト"""
+        values = pd.Series([f"名前{i}" for i in range(20000)])
+        first, second, whole = HyperLogLog(10), HyperLogLog(10), HyperLogLog(10)
+        first.update_hashes(hash_values(values[:12000]))
+        second.update_hashes(hash_values(values[8000:]))
+        whole.update_hashes(hash_values(values))
+        
+        # 機能のテスト
+        merged = HyperLogLog.from_dict(json.loads(json.dumps(first.to_dict()))).merge(second)
+        
+        # 結果の検証 - 統合した結果は一括で追加した結果と同じレジスタになる
+        assert (merged.registers == whole.registers).all()
+        assert merged.estimate() == whole.estimate()
+        
+        # 範囲外の精度
+        with pytest.raises(ValueError):
+            HyperLogLog(3)
+    
+    def test_hash_values(self):
+        """同じ値は型によらず同じハッシュ値になることのテスト"""
+        values = pd.Series(['日本', 'ドイツ', '日本'])
+        assert (hash_values(values) == hash_values(values.astype('category'))).all()
+        assert hash_values(values)[0] == hash_values(values)[2]
+        assert hash_values(values)[0] != hash_values(values)[1]
+
+
+class TestGroupDistinct:
+    """グループごとの重複を除いた件数のテスト"""
+    
+    def make_frame(self):
+        """グループごとの名前の種類数が異なるDataFrameを作成する"""
+        rng = np.random.default_rng(4)
+        df = pd.DataFrame({
+            '国': rng.choice(['日本', 'アメリカ', 'ドイツ'], 60000),
+            '名前': rng.integers(0, 20000, 60000).astype(str),
+        })
+        df.loc[df['国'] == 'ドイツ', '名前'] = df['名前'].str[:2]
+        df.loc[::17, '名前'] = None
+        return df
+    
+    def test_estimate_matches_exact(self):
+        """推定値が正確な件数（exactモード）との誤差の範囲内で、チャンク単位の統合でも変わらないことのテスト"""
+        df = self.make_frame()
+        
+        # 機能のテスト
+        estimated = GroupDistinct(precision=14)
+        exact = GroupDistinct(exact=True)
+        for start in range(0, len(df), 9000):
+            chunk = df.iloc[start:start + 9000]
+            partial = GroupDistinct(precision=14)
+            partial.update(chunk['国'], chunk)
+            estimated.merge(partial)
+            exact.update(chunk['国'].astype('category'), chunk)
+        regions = estimated.map_groups({'日本': 'アジア'}, default='その他')
+        
+        # 結果の検証
+        expected = df.groupby('国')['名前'].nunique()
+        for country, count in expected.items():
+            assert exact.summary(country) == {'名前': count}
+            assert abs(estimated.summary(country)['名前'] - count) <= 4 * estimated.standard_error * count
+        other = df.loc[df['国'] != '日本', '名前'].nunique()
+        assert abs(regions.summary('その他')['名前'] - other) <= 4 * estimated.standard_error * other
+        assert exact.standard_error == 0.0
+        assert estimated.summary('不明の国') == {'名前': 0}
+    
+    def test_serialization(self):
+        """JSONを経由して保存・復元できることのテスト（推定・正確の両方）"""
+        df = self.make_frame()
+        for distinct in [GroupDistinct(precision=8), GroupDistinct(exact=True)]:
+            distinct.update(df['国'], df)
+            
+            # 機能のテスト
+            restored = GroupDistinct.from_dict(json.loads(json.dumps(distinct.to_dict())))
+            
+            # 結果の検証
+            for country in ['日本', 'アメリカ', 'ドイツ']:
+                assert restored.summary(country) == distinct.summary(country)
+
+
+class TestSpaceSaving:
+    """出現回数の多い値の近似（Space-Saving）のテスト"""
+    
+    def make_values(self):
+        """出現回数が Zipf 分布に従う値の pd.Series を作成する"""
+        rng = np.random.default_rng(5)
+        return pd.Series(rng.zipf(1.3, 100000).astype(str))
+    
+    def check_bounds(self, summary, values, k):
+        """上位の値の件数の上限・下限と、上位に含まれない値の件数の上限が正しいことを検証する"""
+        expected = values.value_counts()
+        top = summary.top(k)
+        unlisted = expected[~expected.index.isin([key for key, _, _, _ in top])].max()
+        for key, count, error, guaranteed in top:
+            assert count - error <= expected[key] <= count
+            if guaranteed:
+                assert expected[key] >= unlisted
+        assert unlisted <= max(summary.floor, top[-1][1])
+        assert summary.total == len(values)
+    
+    def test_chunked_and_merged(self):
+        """チャンク単位の更新と、分割した結果の統合のいずれでも誤差の範囲内であることのテスト"""
+        values = self.make_values()
+        
+        # 機能のテスト
+        chunked = SpaceSaving(100)
+        for start in range(0, len(values), 7000):
+            chunked.update(values.iloc[start:start + 7000])
+        merged = SpaceSaving(100)
+        for start in range(0, len(values), 25000):
+            partial = SpaceSaving(100)
+            partial.update(values.iloc[start:start + 25000])
+            merged.merge(partial)
+        
+        # 結果の検証 - 監視数を超える値は保持しない
+        for summary in [chunked, merged]:
+            assert len(summary.keys) <= 100
+            self.check_bounds(summary, values, 10)
+            assert [key for key, _, _, _ in summary.top(3)] == ['1', '2', '3']
+    
+    def test_exact_when_capacity_suffices(self):
+        """値の種類数が監視数以下の場合は誤差なく数えることのテスト"""
+        values = pd.Series(['a'] * 5 + ['b'] * 3 + ['c'] + [None])
+        
+        # 機能のテスト
+        summary = SpaceSaving(5)
+        summary.update(values)
+        
+        # 結果の検証 - 欠損値は数えない
+        assert summary.top(2) == [('a', 5, 0, True), ('b', 3, 0, True)]
+        assert summary.floor == 0
+        assert summary.total == 9
+    
+    def test_serialization(self):
+        """JSONを経由して保存・復元できることのテスト"""
+        summary = SpaceSaving(50)
+        summary.update(self.make_values())
+        
+        # 機能のテスト
+        restored = SpaceSaving.from_dict(json.loads(json.dumps(summary.to_dict())))
+        
+        # 結果の検証
+        assert restored.top(20) == summary.top(20)
+        assert restored.floor == summary.floor
+        assert restored.total == summary.total
@@ -0,0 +1,83 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+import pytest
+import tempfile
+from src.result_cache import ResultCache
+from src.top_k import aggregate_top_k, render_top_k, count_top_k
+
+
+class TestTopK:
+    """出現回数の多い上位の値の集計のテスト"""
+    
+    def test_aggregate_top_k(self):
+        """出現回数の多い上位の値を Space-Saving で求める機能のテスト（並列・複数ファイル・国コード・キャッシュ）"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            rng = np.random.default_rng(6)
+            countries = ['日本', 'アメリカ', 'ドイツ', 'インド']
+            names = rng.zipf(1.5, 40000).astype(str)
+            country_indices = rng.choice(4, 40000, p=[0.4, 0.3, 0.2, 0.1])
+            name_path = os.path.join(temp_dir, 'names.csv')
+            code_path = os.path.join(temp_dir, 'codes.csv')
+            pd.DataFrame({'名前': names[:30000], '国': np.array(countries)[country_indices[:30000]]}).to_csv(
+                name_path, index=False)
+            pd.DataFrame({'名前': names[30000:], '国コード': np.array(['JP', 'US', 'DE', 'IN'])[country_indices[30000:]]
+                          }).to_csv(code_path, index=False)
+            cache = ResultCache(os.path.join(temp_dir, 'cache'))
+            
+            # 機能のテスト
+            top_names = aggregate_top_k([name_path, code_path], k=5, column='名前', capacity=50, workers=2,
+                                        chunksize=3000)
+            top_countries = aggregate_top_k([name_path, code_path], k=2, workers=1, cache=cache)
+            cached = aggregate_top_k([name_path, code_path], k=2, workers=1, cache=cache)
+            parallel = aggregate_top_k(name_path, k=3, column='名前', capacity=50, workers=2)
+            
+            # 結果の検証 - 件数は上限値で、誤差の範囲内に実際の件数がある
+            expected = pd.Series(names).value_counts()
+            assert [item['name'] for item in top_names.items[:3]] == ['1', '2', '3']
+            for item in top_names.items:
+                assert item['count'] - item['error'] <= expected[item['name']] <= item['count']
+            assert top_names.total == 40000
+            assert top_names.other <= 40000 - expected.iloc[:5].sum() <= top_names.other + top_names.other_error
+            assert [item['name'] for item in parallel.items] == ['1', '2', '3']
+            
+            # 国コードは国名に置き換えてから数える（種類数が監視数以下のため誤差はない）
+            expected_countries = pd.Series(np.array(countries)[country_indices]).value_counts()
+            assert top_countries.column == '国'
+            assert [(item['name'], item['count'], item['error']) for item in top_countries.items] == \
+                [(country, expected_countries[country], 0) for country in ['日本', 'アメリカ']]
+            assert top_countries.other == expected_countries[['ドイツ', 'インド']].sum()
+            assert cached.to_dict()['items'] == top_countries.to_dict()['items']
+            
+            # 表示形式
+            text = render_top_k(top_countries)
+            assert "【国の上位2件】" in text
+            assert "その他" in text
+            data = json.loads(render_top_k(top_names, 'json'))
+            assert data['total'] == 40000
+            assert render_top_k(top_countries, 'csv').splitlines()[1] == \
+                f"上位,日本,{expected_countries['日本']},0"
+            
+            # 存在しないカラムと無効な監視数
+            with pytest.raises(KeyError):
+                aggregate_top_k(name_path, k=3, column='年齢')
+            with pytest.raises(ValueError):
+                aggregate_top_k(name_path, k=3, capacity=2)
+    
+    def test_count_top_k(self, capsys):
+        """上位の値を表示し、エラーは対象のファイルを含むメッセージとして表示することのテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'data.csv')
+            pd.DataFrame({'名前': ['太郎', '花子', '太郎'], '国': ['日本', 'ドイツ', '日本']}).to_csv(file_path, index=False)
+            
+            # 機能のテスト
+            count_top_k(file_path, k=1, column='名前')
+            count_top_k(file_path, output_format='csv', k=1)
+            count_top_k(file_path, k=1, column='年齢')
+            output = capsys.readouterr().out
+            
+            # 結果の検証
+            assert "【名前の上位1件】" in output
+            assert "上位,日本,2,0" in output
+            assert "エラー: 'CSVファイルに「年齢」カラムが存在しません'" in output